@@ -7,14 +7,23 @@ from dotenv import load_dotenv
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from functools import lru_cache
+from itertools import islice
 import time
 
+from Databases.event_store import EventStore
+
 load_dotenv()
 
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 EVENTS_TABLE = os.getenv("DYNAMODB_TABLE", "Events")
+EVENT_STORE_TTL_SECONDS = float(os.getenv("EVENT_STORE_TTL_SECONDS", "300"))
+EVENT_STORE_RETRY_SECONDS = float(os.getenv("EVENT_STORE_RETRY_SECONDS", "30"))
+
+# In-memory catalog used for candidate retrieval; refreshed from DynamoDB after the TTL
+_event_store = EventStore()
+_event_store_failed_at = 0.0
 
 # Boto3 configuration with connection pooling and retries
 BOTO3_CONFIG = Config(
@@ -62,6 +71,7 @@ def create_event(data: dict):
     }
 
     table.put_item(Item=item)
+    _event_store.add(item)
     return item
 
 
@@ -80,25 +90,58 @@ def get_event_by_name(event_name: str):
         return None
 
 
-def get_all_events():
-    """Get all events from the database"""
+def _scan_all_events():
+    """Scan every event from the database; raises on DynamoDB errors"""
     dynamodb = get_dynamodb_resource()
     table = dynamodb.Table(EVENTS_TABLE)
+    response = table.scan()
+    events = response.get("Items", [])
+
+    # Handle pagination if there are more items
+    while "LastEvaluatedKey" in response:
+        response = table.scan(ExclusiveStartKey=response["LastEvaluatedKey"])
+        events.extend(response.get("Items", []))
+
+    return events
+
+
+def get_all_events():
+    """Get all events from the database"""
     try:
-        response = table.scan()
-        events = response.get("Items", [])
-        
-        # Handle pagination if there are more items
-        while "LastEvaluatedKey" in response:
-            response = table.scan(ExclusiveStartKey=response["LastEvaluatedKey"])
-            events.extend(response.get("Items", []))
-        
-        return events
+        return _scan_all_events()
     except Exception as e:
         print(f"Error fetching events: {str(e)}")
         return []
 
 
+def get_event_store(refresh: bool = False) -> EventStore:
+    """
+    Get the in-memory event store, (re)loading it from DynamoDB when stale.
+
+    A failed scan keeps the previous catalog (and its load time) and is not
+    retried for EVENT_STORE_RETRY_SECONDS, so one DynamoDB error never
+    empties recommendations or the scraper's known URLs.
+    """
+    global _event_store_failed_at
+    loaded_at = _event_store.loaded_at
+    stale = loaded_at is None or time.time() - loaded_at > EVENT_STORE_TTL_SECONDS
+    if not refresh and (not stale or time.time() - _event_store_failed_at < EVENT_STORE_RETRY_SECONDS):
+        return _event_store
+    try:
+        events = _scan_all_events()
+    except Exception as e:
+        _event_store_failed_at = time.time()
+        print(f"Error refreshing event store, keeping {len(_event_store)} cached events: {str(e)}")
+        return _event_store
+    _event_store.load(events)
+    return _event_store
+
+
+def get_known_event_urls() -> set:
+    """Event page URLs of every stored event, so the scraper can skip events already imported"""
+    return {event["event_url"] for event in get_event_store().all_events() if event.get("event_url")}
+
+
 def add_user_to_event_rsvp(event_name: str, username: str):
     """Add user to event's RSVP list"""
     dynamodb = get_dynamodb_resource()
@@ -120,6 +163,7 @@ def add_user_to_event_rsvp(event_name: str, username: str):
             UpdateExpression="SET rsvp_users = :rsvp_users",
             ExpressionAttributeValues={":rsvp_users": rsvp_users}
         )
+        _event_store.add({**event, "rsvp_users": rsvp_users})
         
         return {
             "success": True,
@@ -151,28 +195,41 @@ def check_event_exists(event_name: str, event_date: str, event_url: str = None):
         return False
 
 
-def add_scraped_event(event_data: dict, event_tasks: list = None):
-    """Add a scraped event to database with generated tasks, avoiding duplicates"""
+def _scraped_event_date(event_data: dict) -> str:
+    """YYYY-MM-DD of a scraped event's start time, as stored in the Events table"""
+    start_time = event_data.get("start_time", "")
+    if not start_time:
+        return ""
+    try:
+        if 'T' in start_time:
+            dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+            return dt.strftime("%Y-%m-%d")
+        return start_time.split()[0]
+    except:
+        return start_time.split()[0]
+
+
+def scraped_event_exists(event_data: dict) -> bool:
+    """Whether a scraped event is already stored, by URL or by name and date"""
+    return check_event_exists(event_data.get("name", ""), _scraped_event_date(event_data), event_data.get("url", ""))
+
+
+def add_scraped_event(event_data: dict, event_tasks: list = None, checked: bool = False):
+    """
+    Add a scraped event to database with generated tasks, avoiding duplicates.
+
+    Pass `checked=True` when scraped_event_exists was already called for it.
+    """
+    if not checked and scraped_event_exists(event_data):
+        return None
+
     dynamodb = get_dynamodb_resource()
     table = dynamodb.Table(EVENTS_TABLE)
     
     event_name = event_data.get("name", "")
     event_url = event_data.get("url", "")
     start_time = event_data.get("start_time", "")
-    
-    event_date = ""
-    if start_time:
-        try:
-            if 'T' in start_time:
-                dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                event_date = dt.strftime("%Y-%m-%d")
-            else:
-                event_date = start_time.split()[0] if start_time else ""
-        except:
-            event_date = start_time.split()[0] if start_time else ""
-    
-    if check_event_exists(event_name, event_date, event_url):
-        return None
+    event_date = _scraped_event_date(event_data)
     
     event_id = event_url.split('/')[-1].split('?')[0] if event_url else "e-" + str(uuid.uuid4())
     if not event_id.startswith('e-'):
@@ -206,34 +263,110 @@ def add_scraped_event(event_data: dict, event_tasks: list = None):
     
     try:
         table.put_item(Item=item)
+        _event_store.add(item)
         return item
     except Exception as e:
         raise Exception(f"Failed to add event: {e}")
 
 
-def bulk_add_scraped_events(events: list, generate_tasks_func=None):
-    """Add multiple scraped events with generated tasks, avoiding duplicates"""
+def iter_add_scraped_events(events, generate_tasks_func=None, on_event_added=None, generate_tasks_batch_func=None, batch_size=None):
+    """
+    Add scraped events one at a time, yielding each outcome as soon as it is stored.
+
+    `events` may be any iterable (e.g. a scraper generator); only `batch_size`
+    events are held at once, and `generate_tasks_batch_func` is called once per
+    batch. Without `batch_size` the whole iterable is one batch. Duplicates are
+    skipped before tasks are generated, so no Gemini work is spent on them.
+
+    Yields:
+        {"status": "added" | "skipped" | "error", "name": str, "event": dict | None, "error": str | None}
+    """
+    iterator = iter(events)
+    while True:
+        batch = list(islice(iterator, batch_size)) if batch_size else list(iterator)
+        if not batch:
+            return
+
+        outcomes = {}
+        new_events = []
+        seen = set()
+        for position, event in enumerate(batch):
+            name = event.get("name", "Unknown")
+            key = event.get("url") or (event.get("name", ""), _scraped_event_date(event))
+            try:
+                if key in seen or scraped_event_exists(event):
+                    outcomes[position] = {"status": "skipped", "name": name, "event": None, "error": None}
+                    continue
+            except Exception as e:
+                outcomes[position] = {"status": "error", "name": name, "event": None, "error": str(e)}
+                continue
+            seen.add(key)
+            new_events.append((position, event))
+
+        batch_tasks = None
+        if generate_tasks_batch_func and new_events:
+            try:
+                batch_tasks = generate_tasks_batch_func([event for _, event in new_events])
+            except Exception as e:
+                print(f"Batch task generation failed, generating per event: {e}")
+
+        task_index = {position: index for index, (position, _) in enumerate(new_events)}
+        for position, event in enumerate(batch):
+            if position in outcomes:
+                yield outcomes[position]
+                continue
+
+            name = event.get("name", "Unknown")
+            try:
+                event_tasks = []
+                if batch_tasks is not None:
+                    event_tasks = batch_tasks[task_index[position]]
+                elif generate_tasks_func:
+                    event_tasks = generate_tasks_func(
+                        event.get("name", ""),
+                        event.get("description", ""),
+                        event.get("venue", {}).get("name", "") if isinstance(event.get("venue"), dict) else ""
+                    )
+
+                result = add_scraped_event(event, event_tasks, checked=True)
+                if result:
+                    if on_event_added:
+                        try:
+                            on_event_added(result)
+                        except Exception as e:
+                            print(f"Error in on_event_added for {result.get('name')}: {e}")
+                    yield {"status": "added", "name": result["name"], "event": result, "error": None}
+                else:
+                    yield {"status": "skipped", "name": name, "event": None, "error": None}
+            except Exception as e:
+                yield {"status": "error", "name": name, "event": None, "error": str(e)}
+
+        if not batch_size:
+            return
+
+
+def bulk_add_scraped_events(events: list, generate_tasks_func=None, on_event_added=None, generate_tasks_batch_func=None):
+    """
+    Add multiple scraped events with generated tasks, avoiding duplicates.
+
+    `generate_tasks_batch_func`, when given, is called once with all events and
+    returns task lists aligned with them; `generate_tasks_func` is the per-event
+    fallback if the batch call fails.
+
+    `on_event_added` is called with each stored item right after it is written,
+    e.g. to percolate the new event against stored user profiles.
+    """
     added = []
     skipped = []
     errors = []
-    
-    for event in events:
-        try:
-            event_tasks = []
-            if generate_tasks_func:
-                event_tasks = generate_tasks_func(
-                    event.get("name", ""),
-                    event.get("description", ""),
-                    event.get("venue", {}).get("name", "") if isinstance(event.get("venue"), dict) else ""
-                )
-            
-            result = add_scraped_event(event, event_tasks)
-            if result:
-                added.append(result)
-            else:
-                skipped.append(event.get("name", "Unknown"))
-        except Exception as e:
-            errors.append({"event": event.get("name", "Unknown"), "error": str(e)})
+
+    for outcome in iter_add_scraped_events(events, generate_tasks_func, on_event_added, generate_tasks_batch_func):
+        if outcome["status"] == "added":
+            added.append(outcome["event"])
+        elif outcome["status"] == "skipped":
+            skipped.append(outcome["name"])
+        else:
+            errors.append({"event": outcome["name"], "error": outcome["error"]})
     
     return {
         "added": len(added),
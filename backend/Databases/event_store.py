@@ -0,0 +1,157 @@
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Event fields that are searchable; the corpus matchmaking scores against.
+INDEXED_FIELDS = ("name", "about", "venue", "category", "tags", "language", "date")
+
+# Keywords match as substrings of the corpus, so the index is keyed by
+# character trigrams; shorter keywords fall back to scanning the corpora.
+NGRAM_SIZE = 3
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text) -> List[str]:
+    """Lowercase alphanumeric tokens, shared by semantic scoring and task templates."""
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+def listify(value) -> List[str]:
+    """A list field, or a comma-separated string, as a list of non-empty stripped strings."""
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    if isinstance(value, str) and value.strip():
+        return [part.strip() for part in value.split(",") if part.strip()]
+    return []
+
+
+def event_corpus(event: Dict) -> Tuple[str, Dict[str, str]]:
+    """Lowercased searchable text of an event, plus the raw text of each indexed field."""
+    fields = {
+        field: " ".join(listify(event.get(field, []))) if field == "tags" else str(event.get(field, ""))
+        for field in INDEXED_FIELDS
+    }
+    corpus = " ".join(fields.values()).lower()
+    return corpus, fields
+
+
+def _event_key(event: Dict) -> str:
+    return str(event.get("event_id") or event.get("name") or "")
+
+
+def ngrams(text: str) -> Set[str]:
+    """Character trigrams of `text`; empty when it is shorter than NGRAM_SIZE."""
+    return {text[start:start + NGRAM_SIZE] for start in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class EventStore:
+    """In-memory copy of the Events table with a trigram -> event_id inverted index"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._events: Dict[str, Dict] = {}
+        self._corpora: Dict[str, str] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self.loaded_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def load(self, events: Iterable[Dict]) -> None:
+        """Replace the whole catalog (e.g. after a table scan)."""
+        with self._lock:
+            self._events.clear()
+            self._corpora.clear()
+            self._grams.clear()
+            self._postings.clear()
+            for event in events:
+                self._add_locked(event)
+            self.loaded_at = time.time()
+
+    def add(self, event: Dict) -> None:
+        """Insert or replace a single event and update its postings."""
+        with self._lock:
+            self._add_locked(event)
+
+    def remove(self, event_id: str) -> None:
+        with self._lock:
+            self._remove_locked(event_id)
+
+    def get(self, event_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._events.get(event_id)
+
+    def all_events(self) -> List[Dict]:
+        with self._lock:
+            return list(self._events.values())
+
+    def postings(self, gram: str) -> Set[str]:
+        with self._lock:
+            return set(self._postings.get(gram, ()))
+
+    def retrieve(self, keywords: Iterable[str], limit: Optional[int] = None) -> List[Dict]:
+        """
+        Events whose corpus contains any of the keywords.
+
+        Uses the same rule as matchmaking's scorer (`keyword in corpus`), so
+        "tech" finds "technology". Posting lists narrow the candidates and the
+        substring test confirms them.
+
+        Args:
+            keywords: Keywords or phrases to look up
+            limit: Maximum number of events to return (None for all)
+
+        Returns:
+            Matching events, without duplicates
+        """
+        with self._lock:
+            matched: List[str] = []
+            seen: Set[str] = set()
+            for keyword in keywords:
+                keyword = str(keyword).lower()
+                if not keyword:
+                    continue
+                if len(keyword) < NGRAM_SIZE:
+                    candidates: Iterable[str] = self._corpora
+                else:
+                    lists = sorted((self._postings.get(gram, set()) for gram in ngrams(keyword)), key=len)
+                    candidates = set(lists[0]).intersection(*lists[1:]) if lists[0] else set()
+                hits = [event_id for event_id in candidates if keyword in self._corpora[event_id]]
+                for event_id in hits:
+                    if event_id not in seen:
+                        seen.add(event_id)
+                        matched.append(event_id)
+                if limit is not None and len(matched) >= limit:
+                    break
+
+            if limit is not None:
+                matched = matched[:limit]
+            return [self._events[event_id] for event_id in matched]
+
+    def _add_locked(self, event: Dict) -> None:
+        event_id = _event_key(event)
+        if not event_id:
+            return
+        if event_id in self._events:
+            self._remove_locked(event_id)
+
+        corpus = event_corpus(event)[0]
+        grams = ngrams(corpus)
+        self._events[event_id] = event
+        self._corpora[event_id] = corpus
+        self._grams[event_id] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(event_id)
+
+    def _remove_locked(self, event_id: str) -> None:
+        self._events.pop(event_id, None)
+        self._corpora.pop(event_id, None)
+        for gram in self._grams.pop(event_id, ()):
+            posting = self._postings.get(gram)
+            if posting:
+                posting.discard(event_id)
+                if not posting:
+                    del self._postings[gram]
@@ -257,6 +257,41 @@ def remove_task_from_user(username: str, task_description: str):
         print(f"[DEBUG] Exception: {str(e)}")
         return {"success": False, "error": str(e)}
 
+def remove_tasks_from_user(username: str, task_descriptions: list):
+    """Remove several tasks from user's tasks list with a single write"""
+    dynamodb = get_dynamodb_resource()
+    table = dynamodb.Table(USERS_TABLE)
+    
+    try:
+        user = get_user_by_username_scan(username)
+        
+        if not user:
+            return {"success": False, "error": "User not found"}
+        
+        tasks = user.get("tasks", [])
+        removed = [task for task in dict.fromkeys(task_descriptions) if task in tasks]
+        not_found = [task for task in dict.fromkeys(task_descriptions) if task not in tasks]
+        
+        if removed:
+            remaining = [task for task in tasks if task not in removed]
+            table.update_item(
+                Key={"user_id": user["user_id"]},
+                UpdateExpression="SET tasks = :tasks",
+                ExpressionAttributeValues={":tasks": remaining}
+            )
+        else:
+            remaining = tasks
+        
+        return {
+            "success": True,
+            "removed": removed,
+            "not_found": not_found,
+            "remaining_tasks": len(remaining)
+        }
+    
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
 # Helper: hash password
 def hash_password(password: str) -> str:
     salt = bcrypt.gensalt()
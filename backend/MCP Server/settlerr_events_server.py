@@ -29,7 +29,7 @@ async def get_recommended_events(username: str, min_score: float = 50.0, top_n:
                     "min_score": min_score,
                     "top_n": top_n
                 },
-                timeout=60.0  # Longer timeout for AI matching
+                timeout=15.0  # Server answers within its latency budget
             )
             
             if response.status_code == 200:
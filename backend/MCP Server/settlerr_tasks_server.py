@@ -1,8 +1,13 @@
+import asyncio
+import os
+
 import httpx
 from fastmcp import FastMCP
 
 # Configuration
 API_BASE_URL = "http://localhost:8000"
+JOB_POLL_INTERVAL_SECONDS = 1.0
+JOB_WAIT_TIMEOUT_SECONDS = 120.0
 
 # Initialize FastMCP server
 mcp = FastMCP("settlerr-tasks")
@@ -66,37 +71,49 @@ async def generate_admin_tasks(username: str) -> str:
     """
     async with httpx.AsyncClient() as client:
         try:
+            # Queue the generation as a background job, then poll until it finishes
             response = await client.post(
-                f"{API_BASE_URL}/api/GenerateAdminTasks",
+                f"{API_BASE_URL}/api/GenerateAdminTasks/async",
                 data={"username": username},
-                timeout=30.0  # Longer timeout for AI generation
+                timeout=10.0
             )
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get("success"):
-                    tasks = data.get("response", [])
-                    tasks_added = data.get("tasks_added", 0)
-                    total_tasks = data.get("total_tasks", 0)
-                    
-                    task_list = "\n".join(tasks)
-                    
-                    return f"""✅ Generated {tasks_added} personalized settling-in tasks for {username}!
+            if response.status_code == 404:
+                return f"❌ User '{username}' not found"
+            if response.status_code != 202:
+                return f"❌ Error: HTTP {response.status_code}"
+            
+            job = response.json()
+            deadline = asyncio.get_running_loop().time() + JOB_WAIT_TIMEOUT_SECONDS
+            while job.get("status") not in ("succeeded", "failed"):
+                if asyncio.get_running_loop().time() > deadline:
+                    return f"⏳ Task generation is still running (job {job.get('job_id')}). Check again shortly."
+                await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+                poll = await client.get(
+                    f"{API_BASE_URL}{job['status_url']}",
+                    timeout=10.0
+                )
+                if poll.status_code != 200:
+                    return f"❌ Error: HTTP {poll.status_code}"
+                job = poll.json()
+            
+            if job["status"] == "failed":
+                return f"❌ Error: {job.get('error') or 'Task generation failed'}"
+            
+            data = job.get("result") or {}
+            tasks = data.get("response", [])
+            tasks_added = data.get("tasks_added", 0)
+            total_tasks = data.get("total_tasks", 0)
+            
+            task_list = "\n".join(tasks)
+            
+            return f"""✅ Generated {tasks_added} personalized settling-in tasks for {username}!
 Total tasks now: {total_tasks}
 
 📝 New Tasks:
 {task_list}
 
 These tasks are tailored to your profile (interests, occupation, status, location)."""
-                else:
-                    return f"❌ Error: {data.get('error', 'Unknown error')}"
-            
-            elif response.status_code == 404:
-                return f"❌ User '{username}' not found"
-            
-            else:
-                return f"❌ Error: HTTP {response.status_code}"
         
         except Exception as e:
             return f"❌ Error: {str(e)}"
@@ -114,20 +131,20 @@ async def check_task_completion(username: str, task_description: str, image_path
     """
     async with httpx.AsyncClient() as client:
         try:
-            # Read image file
-            with open(image_path, "rb") as f:
-                image_data = f.read()
+            # Stream the image file from disk instead of reading it into memory
+            with open(image_path, "rb") as image_file:
+                response = await client.post(
+                    f"{API_BASE_URL}/api/checkTaskCompletion",
+                    data={
+                        "username": username,
+                        "task_description": task_description
+                    },
+                    files={"image": (os.path.basename(image_path), image_file)},
+                    timeout=30.0
+                )
             
-            # Send request
-            response = await client.post(
-                f"{API_BASE_URL}/api/checkTaskCompletion",
-                data={
-                    "username": username,
-                    "task_description": task_description
-                },
-                files={"image": (image_path.split("/")[-1], image_data)},
-                timeout=30.0
-            )
+            if response.status_code == 413:
+                return f"❌ Error: {response.json().get('error', 'Image is too large')}"
             
             if response.status_code == 200:
                 data = response.json()
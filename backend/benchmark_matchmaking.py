@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Benchmark matchmaking on synthetic users and events with Gemini stubbed out.
+
+Examples:
+    python benchmark_matchmaking.py --sizes 1000 10000 --users 20 --output bench.json
+    python benchmark_matchmaking.py --sizes 10000 --baseline bench.json
+    python benchmark_matchmaking.py --sizes 1000 --save-baseline bench.json
+
+Reports throughput, p50/p95/p99 latency and peak traced memory per scenario as
+JSON. With --baseline, each metric is compared against a stored report and
+the script exits with status 1 if any scenario regressed past --tolerance.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add the backend directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import matchmaking
+from Databases.event_store import EventStore
+
+STATUSES = [("S", 45), ("W", 30), ("R", 10), ("P", 15)]
+LOCATIONS = [("Calgary", 40), ("Edmonton", 20), ("Toronto", 20), ("Vancouver", 15), ("Banff", 5)]
+LANGUAGES = [("english", 60), ("french", 10), ("punjabi", 8), ("hindi", 7), ("spanish", 8), ("arabic", 7)]
+INTERESTS = [
+    ("tech", 14), ("music", 12), ("sports", 10), ("food", 10), ("art", 8), ("hiking", 8),
+    ("ai", 6), ("photography", 6), ("volunteering", 5), ("entrepreneurship", 5),
+    ("dance", 4), ("gaming", 4), ("yoga", 4), ("film", 4),
+]
+OCCUPATIONS = [("student", 40), ("software developer", 15), ("nurse", 8), ("cook", 8),
+               ("accountant", 7), ("electrician", 7), ("teacher", 8), ("", 7)]
+EVENT_FORMATS = ["meetup", "workshop", "festival", "night", "networking mixer", "class", "fair", "tour"]
+EVENT_EXTRAS = ["newcomer welcome", "international students", "settlement services", "family friendly",
+                "free drinks", "alcohol served", "beginner friendly", "downtown", "live performance"]
+FILLER = ("join us for an evening of community connection great conversation and fun activities "
+          "with local organizers volunteers and friends bring your questions and curiosity").split()
+
+PERCENTILES = (50, 95, 99)
+
+# Metrics where a larger value is worse, used by the baseline comparison
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "peak_memory_bytes")
+
+
+def _weighted(rng: random.Random, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights, k=1)[0]
+
+
+def generate_users(count: int, rng: random.Random) -> list:
+    users = []
+    for i in range(count):
+        interests = {_weighted(rng, INTERESTS) for _ in range(rng.randint(1, 4))}
+        languages = {"english"} | {_weighted(rng, LANGUAGES) for _ in range(rng.randint(0, 1))}
+        users.append({
+            "user_id": f"u-bench-{i}",
+            "username": f"bench_user_{i}",
+            "status": _weighted(rng, STATUSES),
+            "location": _weighted(rng, LOCATIONS),
+            "interests": sorted(interests),
+            "language": sorted(languages),
+            "occupation": _weighted(rng, OCCUPATIONS),
+            "events_attending": [],
+        })
+    return users
+
+
+def generate_events(count: int, rng: random.Random) -> list:
+    now = datetime.utcnow()
+    events = []
+    for i in range(count):
+        topic = _weighted(rng, INTERESTS)
+        city = _weighted(rng, LOCATIONS)
+        extras = rng.sample(EVENT_EXTRAS, k=rng.randint(0, 2))
+        about = " ".join([topic, rng.choice(EVENT_FORMATS), "in", city] + extras
+                         + rng.sample(FILLER, k=rng.randint(8, 20)))
+        when = now + timedelta(days=rng.randint(-5, 60), hours=rng.randint(0, 23))
+        events.append({
+            "event_id": f"e-bench-{i}",
+            "name": f"{city} {topic.title()} {rng.choice(EVENT_FORMATS).title()} #{i}",
+            "about": about,
+            "venue": f"{city} Community Hall",
+            "date": when.strftime("%Y-%m-%d"),
+            "time": when.isoformat(),
+            "organizer": "Bench Org",
+        })
+    return events
+
+
+def _stub_gemini(prompt, *args, **kwargs):
+    """Deterministic stand-in for Gemini that echoes the profile's interests as keywords."""
+    interests = re.search(r"- Interests: (.*)", prompt)
+    location = re.search(r"- Location: (.*)", prompt)
+    core = [item.strip().lower() for item in (interests.group(1) if interests else "").split(",")]
+    core = [item for item in core if item and item != "none listed"]
+    return json.dumps({
+        "core_keywords": core[:3],
+        "secondary_keywords": core[3:] + ["community"],
+        "avoid_keywords": ["alcohol"],
+        "preferred_location": (location.group(1) if location else "").strip().lower(),
+        "preferred_languages": ["english"],
+        "notes": "benchmark stub profile",
+    })
+
+
+def _reset_state():
+    """Drop caches that would let later users reuse earlier users' work."""
+    with matchmaking._profile_lock:
+        matchmaking._profile_cache.clear()
+    with matchmaking._cohort_lock:
+        matchmaking._cohort_profiles.clear()
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def _summarize(latencies: list, items_per_call: int, peak_memory: int) -> dict:
+    ordered = sorted(latencies)
+    total = sum(latencies)
+    summary = {
+        "calls": len(latencies),
+        "items_per_call": items_per_call,
+        "throughput_calls_per_s": round(len(latencies) / total, 3) if total else 0.0,
+        "throughput_items_per_s": round(len(latencies) * items_per_call / total, 1) if total else 0.0,
+        "peak_memory_bytes": peak_memory,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(_percentile(ordered, pct) * 1000, 3)
+    return summary
+
+
+def _measure(run_once, users: list, memory_samples: int) -> tuple:
+    latencies = []
+    for user in users:
+        _reset_state()
+        start = time.perf_counter()
+        run_once(user)
+        latencies.append(time.perf_counter() - start)
+
+    # Peak memory is traced on a few extra runs so tracing does not skew latency
+    tracemalloc.start()
+    for user in users[:memory_samples]:
+        _reset_state()
+        run_once(user)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return latencies, peak
+
+
+def run_benchmarks(sizes: list, user_count: int, seed: int, scenarios: list, memory_samples: int) -> dict:
+    matchmaking.gemini = _stub_gemini
+    rng = random.Random(seed)
+    users = generate_users(user_count, rng)
+    results = {}
+
+    for size in sizes:
+        events = generate_events(size, random.Random(seed + size))
+        store = EventStore()
+        store.load(events)
+        keyword_profiles = {u["username"]: matchmaking.build_user_keyword_profile(u) for u in users}
+
+        runners = {
+            "score_event": (
+                lambda user: [matchmaking._score_event(e, user, keyword_profiles[user["username"]]) for e in events],
+                size,
+            ),
+            "recommend_full_scan": (
+                lambda user: matchmaking.get_recommended_events_for_user(user, events, min_score=50, top_n=10),
+                size,
+            ),
+            "recommend_indexed": (
+                lambda user: matchmaking.get_recommended_events_for_user(user, min_score=50, top_n=10, event_store=store),
+                size,
+            ),
+            "batch_score_events": (
+                lambda user: matchmaking.batch_score_events(user, events),
+                size,
+            ),
+            "recommend_semantic": (
+                lambda user: matchmaking.get_recommended_events_for_user(
+                    user, events, min_score=50, top_n=10, scoring_backend="semantic"
+                ),
+                size,
+            ),
+        }
+
+        for name in scenarios:
+            run_once, items = runners[name]
+            latencies, peak = _measure(run_once, users, memory_samples)
+            results[f"{name}@{size}"] = _summarize(latencies, items, peak)
+            print(f"[bench] {name}@{size}: p50={results[f'{name}@{size}']['p50_ms']}ms", file=sys.stderr)
+
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "seed": seed,
+        "users": user_count,
+        "results": results,
+    }
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float) -> dict:
+    """Relative change per metric (positive = slower/bigger) and regressions beyond tolerance."""
+    comparison = {}
+    regressions = []
+    for key, current in report["results"].items():
+        previous = baseline.get("results", {}).get(key)
+        if not previous:
+            continue
+        deltas = {}
+        for metric in LOWER_IS_BETTER + ("throughput_items_per_s",):
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if metric == "throughput_items_per_s":
+                change = -change
+            deltas[metric] = round(change, 4)
+            if metric != "peak_memory_bytes" and change > tolerance:
+                regressions.append(f"{key}.{metric}")
+        comparison[key] = deltas
+    return {"tolerance": tolerance, "changes": comparison, "regressions": regressions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Settlerr matchmaking")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Catalog sizes")
+    parser.add_argument("--users", type=int, default=20, help="Synthetic users per catalog")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", nargs="+", default=["score_event", "recommend_full_scan", "recommend_indexed", "batch_score_events"],
+                        help="Scenarios to run (also: recommend_semantic)")
+    parser.add_argument("--memory-samples", type=int, default=3, help="Runs traced for peak memory")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Compare against a stored JSON report")
+    parser.add_argument("--save-baseline", help="Also store the report as a baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown (default 10%%)")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.users, args.seed, args.scenarios, args.memory_samples)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare_to_baseline(report, json.load(f), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                f.write(output)
+
+    if report.get("comparison", {}).get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,404 @@
+import asyncio
+import contextlib
+import hashlib
 import requests
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import httpx
+import weakref
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import AsyncIterator, Iterable, Iterator, List, Dict, Optional
 import os
+import threading
+import time
 from bs4 import BeautifulSoup
 import re
 import json
+from html import unescape
+from html.parser import HTMLParser
+from urllib.parse import urlparse
 from dateutil import parser as date_parser
 
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+MAX_LISTING_PAGES = 3
+LISTING_TIMEOUT_SECONDS = 15
+DETAIL_TIMEOUT_SECONDS = 10
+
+# Stop paginating once at least this share of a listing page is already imported
+SCRAPE_KNOWN_PAGE_RATIO = float(os.getenv("SCRAPE_KNOWN_PAGE_RATIO", "0.8"))
+
+# Shared async connection pool, and how many requests may be in flight to one host
+SCRAPE_MAX_CONNECTIONS = int(os.getenv("SCRAPE_MAX_CONNECTIONS", "20"))
+SCRAPE_PER_HOST_CONCURRENCY = int(os.getenv("SCRAPE_PER_HOST_CONCURRENCY", "6"))
+
+# httpx clients and semaphores belong to one event loop, so keep one set per loop
+_async_http_state = weakref.WeakKeyDictionary()
+
+
+def _async_http() -> Dict:
+    """The shared AsyncClient and per-host semaphores for the running event loop."""
+    loop = asyncio.get_running_loop()
+    state = _async_http_state.get(loop)
+    if state is None:
+        state = {
+            "client": httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=SCRAPE_MAX_CONNECTIONS,
+                    max_keepalive_connections=SCRAPE_MAX_CONNECTIONS,
+                ),
+            ),
+            "semaphores": {},
+        }
+        _async_http_state[loop] = state
+    return state
+
+
+async def aclose_http_clients() -> None:
+    """Close the running loop's shared scraping client (app shutdown)."""
+    state = _async_http_state.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state["client"].aclose()
+
+
+# --- Page cache ---
+#
+# Scraped pages are kept on disk with their ETag/Last-Modified validators and
+# their parsed result. Detail pages are reused without a request for
+# DETAIL_CACHE_TTL_SECONDS; after that, and always for listing pages, a
+# conditional request is sent. A 304, or a 200 with an identical body, reuses
+# the stored parse instead of parsing the page again.
+
+SCRAPE_CACHE_ENABLED = os.getenv("SCRAPE_CACHE_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+SCRAPE_CACHE_DIR = os.getenv("SCRAPE_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".scrape_cache"))
+LISTING_CACHE_TTL_SECONDS = float(os.getenv("SCRAPE_LISTING_TTL_SECONDS", "0"))
+DETAIL_CACHE_TTL_SECONDS = float(os.getenv("SCRAPE_DETAIL_TTL_SECONDS", str(6 * 3600)))
+# Pages not fetched or revalidated for this long are evicted
+SCRAPE_CACHE_RETENTION_SECONDS = float(os.getenv("SCRAPE_CACHE_RETENTION_SECONDS", str(14 * 24 * 3600)))
+
+# Bump when a parser's output changes, so stored parses are not reused
+PARSE_VERSION = 2
+
+
+class PageCache:
+    """diskcache directory of scraped pages: body digest, validators and parsed result per URL"""
+    
+    def __init__(self, directory: str = SCRAPE_CACHE_DIR, retention_seconds: float = SCRAPE_CACHE_RETENTION_SECONDS):
+        import diskcache
+        
+        self._cache = diskcache.Cache(directory)
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self.stats = {"fresh": 0, "not_modified": 0, "unchanged": 0, "fetched": 0}
+    
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict:
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+    
+    def load(self, url: str) -> Optional[Dict]:
+        entry = self._cache.get(url)
+        if entry is None or entry.get("parse_version") != PARSE_VERSION:
+            return None
+        return entry
+    
+    def is_fresh(self, entry: Dict, ttl: float) -> bool:
+        return ttl > 0 and time.time() - entry["checked_at"] < ttl
+    
+    @staticmethod
+    def digest(body: str) -> str:
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+    
+    def same_body(self, entry: Dict, body: str) -> bool:
+        return entry["sha256"] == self.digest(body)
+    
+    def reuse(self, entry: Dict, outcome: str):
+        self._count(outcome)
+        return entry["parsed"]
+    
+    def revalidate(self, url: str, entry: Dict, headers, outcome: str):
+        """The stored page is still current: refresh its validators and reuse its parse."""
+        entry = {
+            **entry,
+            "etag": headers.get("etag") or entry.get("etag"),
+            "last_modified": headers.get("last-modified") or entry.get("last_modified"),
+            "checked_at": time.time(),
+        }
+        self._cache.set(url, entry, expire=self.retention_seconds)
+        return self.reuse(entry, outcome)
+    
+    def store(self, url: str, body: str, headers, parsed) -> None:
+        """Keep the page's parse; the body itself is only needed as a digest to spot unchanged pages."""
+        self._count("fetched")
+        self._cache.set(url, {
+            "sha256": self.digest(body),
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "checked_at": time.time(),
+            "parse_version": PARSE_VERSION,
+            "parsed": parsed,
+        }, expire=self.retention_seconds)
+    
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+    
+    def snapshot(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        requests_saved = stats["fresh"] + stats["not_modified"] + stats["unchanged"]
+        total = requests_saved + stats["fetched"]
+        return {**stats, "reuse_ratio": round(requests_saved / total, 4) if total else 0.0}
+
+
+def _create_page_cache() -> Optional[PageCache]:
+    if not SCRAPE_CACHE_ENABLED:
+        return None
+    try:
+        return PageCache()
+    except Exception as e:
+        print(f"[Scraper] Page cache unavailable ({e}); fetching pages uncached")
+        return None
+
+
+page_cache = _create_page_cache()
+
+
+# --- Fast extraction ---
+#
+# JSON-LD blocks, meta tags and the few elements the detail parser reads are
+# pulled out with precompiled patterns instead of building a BeautifulSoup
+# tree of the whole page. A tree is only built for the HTML-card fallback on
+# listing pages without JSON-LD.
+
+# One piece of a start tag's attribute text: a character, or a whole quoted
+# value, so a '>' inside quotes does not end the tag. Each character starts
+# exactly one alternative, so matching stays linear.
+TAG_ATTRIBUTE_UNIT = r'''(?:[^>"']|"[^"]*"|'[^']*')'''
+LD_JSON_TYPE = r'''(?:"application/ld\+json\b[^"]*"|'application/ld\+json\b[^']*'|application/ld\+json\b)'''
+LD_JSON_PATTERN = re.compile(
+    r'<script\b' + TAG_ATTRIBUTE_UNIT + r'*?\btype\s*=\s*' + LD_JSON_TYPE + TAG_ATTRIBUTE_UNIT + r'*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+# Markup whose text BeautifulSoup's get_text() leaves out
+NON_TEXT_PATTERN = re.compile(
+    r'<script\b.*?</script\s*>|<style\b.*?</style\s*>|<!--.*?-->',
+    re.IGNORECASE | re.DOTALL
+)
+ATTRIBUTE_PATTERN = re.compile(r'''([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?''')
+DIV_TAG_PATTERN = re.compile(r'<div\b(' + TAG_ATTRIBUTE_UNIT + r'*)>', re.IGNORECASE)
+META_TAG_PATTERN = re.compile(r'<meta\b(' + TAG_ATTRIBUTE_UNIT + r'*)>', re.IGNORECASE)
+TIME_TAG_PATTERN = re.compile(r'<time\b(' + TAG_ATTRIBUTE_UNIT + r'*)>', re.IGNORECASE)
+
+# Description containers on event pages, in priority order (by class attribute)
+DESCRIPTION_DIV_MATCHERS = [
+    lambda classes: 'eds-text--left' in classes.split(),
+    lambda classes: 'description' in classes,
+    lambda classes: 'summary' in classes,
+]
+
+
+def json_ld_blocks(page: str) -> Iterator:
+    """Decoded application/ld+json blocks of a page; blocks that are not valid JSON are skipped."""
+    for match in LD_JSON_PATTERN.finditer(page):
+        try:
+            yield json.loads(match.group(1))
+        except json.JSONDecodeError:
+            continue
+
+
+def _attributes(raw: str) -> Dict[str, str]:
+    """Attributes of a start tag (the text between the tag name and '>')"""
+    attrs = {}
+    for name, double_quoted, single_quoted, bare in ATTRIBUTE_PATTERN.findall(raw):
+        attrs.setdefault(name.lower(), unescape(double_quoted or single_quoted or bare))
+    return attrs
+
+
+class _ElementClosed(Exception):
+    pass
+
+
+class _ElementTextParser(HTMLParser):
+    """Collects the text of the element whose start tag begins the fed markup"""
+    
+    def __init__(self, name: str):
+        super().__init__(convert_charrefs=True)
+        self.name = name
+        self.depth = 0
+        self.parts = []
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == self.name:
+            self.depth += 1
+    
+    def handle_startendtag(self, tag, attrs):
+        pass
+    
+    def handle_endtag(self, tag):
+        if tag == self.name:
+            self.depth -= 1
+            if self.depth <= 0:
+                raise _ElementClosed()
+    
+    def handle_data(self, data):
+        data = data.strip()
+        if data:
+            self.parts.append(data)
+
+
+def _element_text(markup: str, start: int, name: str) -> str:
+    """get_text(strip=True) of the `name` element starting at `start`; only its own subtree is tokenized."""
+    parser = _ElementTextParser(name)
+    try:
+        parser.feed(markup[start:])
+        parser.close()
+    except _ElementClosed:
+        pass
+    return "".join(parser.parts)
+
+
+# --- Date extraction ---
+#
+# Patterns are compiled once and listed in priority order: the first pattern
+# that matches anywhere in the text wins. Each list has a combined hint
+# pattern of the fragments every one of its patterns requires; text without
+# a hint (most descriptions) costs one cheap scan instead of a scan per pattern.
+
+# The leading (?<![A-Za-z]) only stops retries from inside a word: any match
+# found there has the same groups as one starting at the word (or after "on ")
+DATE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'(?<![A-Za-z])(?:on\s+)?([A-Za-z]+,?\s+[A-Za-z]+\s+\d{1,2},\s+\d{4})\s+at\s+(\d{1,2}:\d{2}\s*[AP]M)',
+    r'(?<![A-Za-z])(?:on\s+)?([A-Za-z]+\s+\d{1,2},\s+\d{4})\s+at\s+(\d{1,2}:\d{2}\s*[AP]M)',
+    r'(?<![A-Za-z])(?:on\s+)?([A-Za-z]+\s+\d{1,2},\s+\d{4})',
+    r'(\d{1,2}/\d{1,2}/\d{4})',
+    r'(\d{4}-\d{2}-\d{2})',
+    r'([A-Za-z]{3},\s+[A-Za-z]{3}\s+\d{1,2})',
+]]
+TIME_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'(\d{1,2}:\d{2}\s*[AP]M)',
+    r'(\d{1,2}\s*[AP]M)',
+]]
+DATE_HINT_PATTERN = re.compile(r'\d,\s+\d{4}|\d/\d{1,2}/\d{4}|\d{4}-\d{2}-\d{2}|,\s+[A-Za-z]{3}\s+\d', re.IGNORECASE)
+TIME_HINT_PATTERN = re.compile(r'\d\s*[AP]M', re.IGNORECASE)
+
+# Strict shapes of the strings DATE_PATTERNS and TIME_PATTERNS capture,
+# read directly before falling back to fuzzy dateutil parsing
+ISO_DATE_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+NUMERIC_DATE_PATTERN = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+NAMED_DATE_PATTERN = re.compile(r'(?:([A-Za-z]+),?\s+)?([A-Za-z]+)\s+(\d{1,2}),\s+(\d{4})')
+CLOCK_PATTERN = re.compile(r'(\d{1,2})(?::(\d{2}))?\s*([AP])M', re.IGNORECASE)
+MONTHS = {name.lower(): index for index, names in enumerate(date_parser.parserinfo.MONTHS, 1) for name in names}
+DATE_PARSE_CACHE_SIZE = 4096
+
+
+def _first_match(patterns: List, hint_pattern, text: str):
+    """Match of the highest-priority pattern found anywhere in text"""
+    if not hint_pattern.search(text):
+        return None
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match
+    return None
+
+
+def _strict_date(found_date: str) -> Optional[datetime]:
+    """
+    ISO-8601, m/d/Y or "[word,] Month d, Y" dates, or None.
+    
+    A leading word that is not a month (a weekday, "on", "Tickets", ...) is
+    dropped, as fuzzy dateutil parsing would ignore it.
+    """
+    match = ISO_DATE_PATTERN.fullmatch(found_date)
+    if match:
+        year, month, day = match.groups()
+    elif (match := NUMERIC_DATE_PATTERN.fullmatch(found_date)):
+        month, day, year = match.groups()
+    elif (match := NAMED_DATE_PATTERN.fullmatch(found_date)):
+        leading, month_name, day, year = match.groups()
+        month = MONTHS.get(month_name.lower())
+        if month is None or (leading and leading.lower() in MONTHS):
+            return None
+    else:
+        return None
+    
+    try:
+        return datetime(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _strict_clock(found_time: str) -> Optional[tuple]:
+    """(hour, minute) of a 12-hour "7:30 PM" / "7pm" time, or None"""
+    match = CLOCK_PATTERN.fullmatch(found_time)
+    if not match:
+        return None
+    hour, minute = int(match.group(1)), int(match.group(2) or 0)
+    if not 1 <= hour <= 12 or minute > 59:
+        return None
+    return hour % 12 + (12 if match.group(3).upper() == 'P' else 0), minute
+
+
+@lru_cache(maxsize=DATE_PARSE_CACHE_SIZE)
+def _parse_date_string(found_date: str, found_time: Optional[str], today: date) -> str:
+    """
+    ISO start time for an extracted date (and time), or '' if it cannot be read.
+    
+    Strict shapes (ISO-8601 first) are read before fuzzy dateutil parsing.
+    `today` is part of the cache key because dateutil fills a missing year
+    from it.
+    """
+    day = _strict_date(found_date)
+    clock = _strict_clock(found_time) if found_time else None
+    
+    if day and (clock or not found_time):
+        if clock:
+            day = day.replace(hour=clock[0], minute=clock[1])
+        return day.isoformat()
+    
+    try:
+        full_datetime = f"{found_date} {found_time}" if found_time else found_date
+        default = datetime(today.year, today.month, today.day)
+        return date_parser.parse(full_datetime, fuzzy=True, default=default).isoformat()
+    except Exception:
+        for fmt in ['%B %d, %Y', '%b %d, %Y', '%m/%d/%Y', '%Y-%m-%d']:
+            try:
+                return datetime.strptime(found_date, fmt).isoformat()
+            except ValueError:
+                continue
+        return ''
+
+
+def _event_page_key(url: str) -> str:
+    """Identity of an event page across Eventbrite domains and tracking parameters"""
+    return urlparse(url).path.rstrip('/').lower()
+
+
 class EventbriteClient:
     """Scrapes events from Eventbrite's public website"""
     
-    def __init__(self):
+    def __init__(self, known_urls: Optional[Iterable[str]] = None):
+        """
+        Args:
+            known_urls: Event page URLs already imported; those events are left
+                out of results without fetching their detail pages, and
+                pagination stops at a page that is mostly known
+        """
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
+        self.known_keys = {_event_page_key(url) for url in known_urls or () if url}
+        self.scrape_stats = {"pages": 0, "known": 0, "stopped_early": False}
     
     def _extract_date_from_text(self, text: str) -> Dict[str, str]:
         """Extract date and time from text using regex patterns"""
@@ -22,64 +407,31 @@ class EventbriteClient:
         if not text:
             return result
         
-        date_patterns = [
-            r'(?:on\s+)?([A-Za-z]+,?\s+[A-Za-z]+\s+\d{1,2},\s+\d{4})\s+at\s+(\d{1,2}:\d{2}\s*[AP]M)',
-            r'(?:on\s+)?([A-Za-z]+\s+\d{1,2},\s+\d{4})\s+at\s+(\d{1,2}:\d{2}\s*[AP]M)',
-            r'(?:on\s+)?([A-Za-z]+\s+\d{1,2},\s+\d{4})',
-            r'(\d{1,2}/\d{1,2}/\d{4})',
-            r'(\d{4}-\d{2}-\d{2})',
-            r'([A-Za-z]{3},\s+[A-Za-z]{3}\s+\d{1,2})',
-        ]
-        
         found_date = None
         found_time = None
         has_time_in_pattern = False
         
-        for pattern in date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                found_date = match.group(1).strip()
-                if match.lastindex >= 2:
-                    found_time = match.group(2).strip()
-                    has_time_in_pattern = True
-                    result['date_display'] = f"{found_date} at {found_time}"
-                else:
-                    result['date_display'] = found_date
-                break
+        match = _first_match(DATE_PATTERNS, DATE_HINT_PATTERN, text)
+        if match:
+            found_date = match.group(1).strip()
+            if match.lastindex >= 2:
+                found_time = match.group(2).strip()
+                has_time_in_pattern = True
+                result['date_display'] = f"{found_date} at {found_time}"
+            else:
+                result['date_display'] = found_date
         
         if not has_time_in_pattern:
-            time_patterns = [r'(\d{1,2}:\d{2}\s*[AP]M)', r'(\d{1,2}\s*[AP]M)']
-            
-            for pattern in time_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    found_time = match.group(1).strip()
-                    if result['date_display'] and 'at' not in result['date_display']:
-                        result['date_display'] = f"{result['date_display']} at {found_time}"
-                    elif not result['date_display']:
-                        result['date_display'] = found_time
-                    break
+            match = _first_match(TIME_PATTERNS, TIME_HINT_PATTERN, text)
+            if match:
+                found_time = match.group(1).strip()
+                if result['date_display'] and 'at' not in result['date_display']:
+                    result['date_display'] = f"{result['date_display']} at {found_time}"
+                elif not result['date_display']:
+                    result['date_display'] = found_time
         
         if found_date:
-            try:
-                if found_time:
-                    full_datetime = f"{found_date} {found_time}"
-                    dt = date_parser.parse(full_datetime, fuzzy=True)
-                else:
-                    dt = date_parser.parse(found_date, fuzzy=True)
-                result['start_time'] = dt.isoformat()
-            except:
-                try:
-                    date_only = found_date.split(' at ')[0].strip()
-                    for fmt in ['%B %d, %Y', '%b %d, %Y', '%m/%d/%Y', '%Y-%m-%d']:
-                        try:
-                            dt = datetime.strptime(date_only, fmt)
-                            result['start_time'] = dt.isoformat()
-                            break
-                        except:
-                            continue
-                except:
-                    pass
+            result['start_time'] = _parse_date_string(found_date, found_time, date.today())
         
         return result
     
@@ -100,57 +452,262 @@ class EventbriteClient:
         Returns:
             List of event dictionaries with relevant details
         """
-        location_slug = location.lower().replace(" ", "-").replace(",", "")
-        base_url = f"https://www.eventbrite.com/d/canada--{location_slug}/all-events/"
+        all_events = []
+        for page_events in self._iter_listing_pages(location, max_results):
+            all_events.extend(page_events)
         
+        filtered_events = self._filter_by_date_range(all_events)
+        return filtered_events[:max_results]
+    
+    def iter_events_next_month(
+        self,
+        location: str = "Calgary",
+        radius: str = "10km",
+        max_results: int = 100
+    ) -> Iterator[Dict]:
+        """
+        Streaming get_events_next_month: yields events page by page as they are scraped.
+        
+        The date filter runs per page, so a page with no dated events in range
+        falls back to all of that page's events rather than the whole scrape's.
+        """
+        yielded = 0
+        for page_events in self._iter_listing_pages(location, max_results):
+            for event in self._filter_by_date_range(page_events):
+                if yielded >= max_results:
+                    return
+                yield event
+                yielded += 1
+    
+    async def aget_events_next_month(
+        self,
+        location: str = "Calgary",
+        radius: str = "10km",
+        max_results: int = 100
+    ) -> List[Dict]:
+        """
+        Async get_events_next_month: each page's detail pages are fetched
+        concurrently over the shared connection pool, and the next listing
+        page is fetched while they are, so stopping early costs at most one
+        unused listing request.
+        """
         all_events = []
-        page = 1
+        async with contextlib.aclosing(self._aiter_listing_pages(location, max_results)) as pages:
+            async for page_events in pages:
+                all_events.extend(page_events)
         
-        while len(all_events) < max_results and page <= 3:
-            try:
-                url = f"{base_url}?page={page}" if page > 1 else base_url
-                
-                response = requests.get(url, headers=self.headers, timeout=15)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                script_tags = soup.find_all('script', type='application/ld+json')
-                
-                events_found = 0
-                for script in script_tags:
-                    try:
-                        data = json.loads(script.string)
-                        if isinstance(data, list):
-                            for item in data:
-                                if item.get('@type') == 'Event':
-                                    event = self._parse_json_ld_event(item)
-                                    if event:
-                                        all_events.append(event)
-                                        events_found += 1
-                        elif data.get('@type') == 'Event':
-                            event = self._parse_json_ld_event(data)
-                            if event:
-                                all_events.append(event)
-                                events_found += 1
-                    except json.JSONDecodeError:
-                        continue
-                
-                if events_found == 0:
-                    html_events = self._parse_html_events(soup)
-                    all_events.extend(html_events)
-                    events_found = len(html_events)
-                
-                if events_found == 0:
+        filtered_events = self._filter_by_date_range(all_events)
+        return filtered_events[:max_results]
+    
+    async def aiter_events_next_month(
+        self,
+        location: str = "Calgary",
+        radius: str = "10km",
+        max_results: int = 100
+    ) -> AsyncIterator[Dict]:
+        """Async iter_events_next_month, fetching pages like aget_events_next_month"""
+        yielded = 0
+        async with contextlib.aclosing(self._aiter_listing_pages(location, max_results)) as pages:
+            async for page_events in pages:
+                for event in self._filter_by_date_range(page_events):
+                    if yielded >= max_results:
+                        return
+                    yield event
+                    yielded += 1
+    
+    async def _aiter_listing_pages(self, location: str, max_results: int) -> AsyncIterator[List[Dict]]:
+        """Async _iter_listing_pages: the next listing page is prefetched while the current one's details are fetched"""
+        self.scrape_stats = {"pages": 0, "known": 0, "stopped_early": False}
+        total = 0
+        next_listing = asyncio.ensure_future(self._aget_listing(self._listing_url(location, 1)))
+        
+        try:
+            for page in range(1, MAX_LISTING_PAGES + 1):
+                listing = await next_listing
+                next_listing = None
+                if listing is None:
                     break
+                if page < MAX_LISTING_PAGES:
+                    next_listing = asyncio.ensure_future(self._aget_listing(self._listing_url(location, page + 1)))
                 
-                page += 1
-                
+                page_events, known = await self._acomplete_listing(listing)
+                more = self._record_page(page_events, known)
+                if page_events:
+                    total += len(page_events)
+                    yield page_events
+                if not more or total >= max_results:
+                    break
+        finally:
+            if next_listing is not None:
+                next_listing.cancel()
+    
+    def _iter_listing_pages(self, location: str, max_results: int) -> Iterator[List[Dict]]:
+        """Yield the new events parsed from each listing page (up to MAX_LISTING_PAGES)."""
+        self.scrape_stats = {"pages": 0, "known": 0, "stopped_early": False}
+        total = 0
+        page = 1
+        
+        while total < max_results and page <= MAX_LISTING_PAGES:
+            try:
+                page_events, known = self._fetch_listing_page(self._listing_url(location, page))
             except:
                 break
+            
+            more = self._record_page(page_events, known)
+            if page_events:
+                total += len(page_events)
+                yield page_events
+            if not more:
+                break
+            page += 1
+    
+    def _record_page(self, page_events: List[Dict], known: int) -> bool:
+        """Count a scraped page; False when pagination should stop after it (empty or mostly known)"""
+        page_total = len(page_events) + known
+        if not page_total:
+            return False
         
-        filtered_events = self._filter_by_date_range(all_events)
-        return filtered_events[:max_results]
+        self.scrape_stats["pages"] += 1
+        self.scrape_stats["known"] += known
+        if known and known >= page_total * SCRAPE_KNOWN_PAGE_RATIO:
+            self.scrape_stats["stopped_early"] = True
+            return False
+        return True
+    
+    def _is_known(self, url: str) -> bool:
+        return bool(url) and _event_page_key(url) in self.known_keys
+    
+    def _split_known(self, listing: Dict) -> tuple:
+        """A parsed listing's JSON-LD events and card fields not already known, and how many were known"""
+        events = [event for event in listing["events"] if not self._is_known(event.get("url"))]
+        cards = [fields for fields in listing["cards"] if not self._is_known(fields["url"])]
+        known = len(listing["events"]) + len(listing["cards"]) - len(events) - len(cards)
+        return events, cards, known
+    
+    def _listing_url(self, location: str, page: int) -> str:
+        location_slug = location.lower().replace(" ", "-").replace(",", "")
+        base_url = f"https://www.eventbrite.com/d/canada--{location_slug}/all-events/"
+        return f"{base_url}?page={page}" if page > 1 else base_url
+    
+    def _fetch_listing_page(self, url: str) -> tuple:
+        """
+        Fetch one listing page and parse its events (JSON-LD first, then HTML cards).
+        
+        Returns:
+            (events not already known, number of known events left out)
+        """
+        listing = self._get_page(url, LISTING_CACHE_TTL_SECONDS, LISTING_TIMEOUT_SECONDS, self._parse_listing_html)
+        page_events, cards, known = self._split_known(listing)
+        
+        for fields in cards:
+            details = self._fetch_event_details(fields["url"]) if self._card_needs_details(fields) else {}
+            event = self._complete_card_event(fields, details)
+            if event:
+                page_events.append(event)
+        return page_events, known
+    
+    async def _aget_listing(self, url: str) -> Optional[Dict]:
+        """A parsed listing page, or None if it could not be fetched"""
+        try:
+            return await self._aget_page(url, LISTING_CACHE_TTL_SECONDS, LISTING_TIMEOUT_SECONDS, self._parse_listing_html)
+        except Exception:
+            return None
+    
+    async def _acomplete_listing(self, listing: Dict) -> tuple:
+        """Async second half of _fetch_listing_page: the cards' detail pages are fetched concurrently."""
+        page_events, cards, known = self._split_known(listing)
+        
+        details = await asyncio.gather(*(
+            self._afetch_event_details(fields["url"]) if self._card_needs_details(fields)
+            else asyncio.sleep(0, result={})
+            for fields in cards
+        ))
+        
+        for fields, event_details in zip(cards, details):
+            event = self._complete_card_event(fields, event_details)
+            if event:
+                page_events.append(event)
+        return page_events, known
+    
+    def _parse_listing_html(self, html: str) -> Dict:
+        """
+        A listing page's JSON-LD events, or, when there are none, the fields
+        of its HTML cards, still to be completed from their detail pages.
+        
+        Returns:
+            {"events": [...], "cards": [...]}
+        """
+        page_events = self._parse_json_ld_events(html)
+        if page_events:
+            return {"events": page_events, "cards": []}
+        
+        soup = BeautifulSoup(html, 'html.parser')
+        cards = []
+        for card in self._find_html_cards(soup):
+            fields = self._parse_card_fields(card)
+            if fields is not None:
+                cards.append(fields)
+        return {"events": [], "cards": cards}
+    
+    def _get_page(self, url: str, ttl: float, timeout: float, parse) -> Dict:
+        """
+        GET a page through the page cache and return parse(body).
+        
+        A fresh entry is used without a request; otherwise a conditional
+        request is sent, and a 304 or an identical body reuses the stored parse.
+        """
+        entry = page_cache.load(url) if page_cache else None
+        if entry and page_cache.is_fresh(entry, ttl):
+            return page_cache.reuse(entry, "fresh")
+        
+        headers = {**self.headers, **PageCache.conditional_headers(entry)}
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if entry and response.status_code == 304:
+            return page_cache.revalidate(url, entry, response.headers, "not_modified")
+        response.raise_for_status()
+        if entry and page_cache.same_body(entry, response.text):
+            return page_cache.revalidate(url, entry, response.headers, "unchanged")
+        
+        parsed = parse(response.text)
+        if page_cache:
+            page_cache.store(url, response.text, response.headers, parsed)
+        return parsed
+    
+    async def _aget_page(self, url: str, ttl: float, timeout: float, parse) -> Dict:
+        """Async _get_page: cache reads, writes and parsing run off the event loop"""
+        entry = await asyncio.to_thread(page_cache.load, url) if page_cache else None
+        if entry and page_cache.is_fresh(entry, ttl):
+            return page_cache.reuse(entry, "fresh")
+        
+        headers = PageCache.conditional_headers(entry)
+        response = await self._aget(url, timeout, headers)
+        if entry and response.status_code == 304:
+            return await asyncio.to_thread(page_cache.revalidate, url, entry, response.headers, "not_modified")
+        response.raise_for_status()
+        if entry and page_cache.same_body(entry, response.text):
+            return await asyncio.to_thread(page_cache.revalidate, url, entry, response.headers, "unchanged")
+        
+        parsed = await asyncio.to_thread(parse, response.text)
+        if page_cache:
+            await asyncio.to_thread(page_cache.store, url, response.text, response.headers, parsed)
+        return parsed
+    
+    def _parse_json_ld_events(self, html: str) -> List[Dict]:
+        """Events from a listing page's JSON-LD script tags"""
+        page_events = []
+        for data in json_ld_blocks(html):
+            if isinstance(data, list):
+                for item in data:
+                    if item.get('@type') == 'Event':
+                        event = self._parse_json_ld_event(item)
+                        if event:
+                            page_events.append(event)
+            elif data.get('@type') == 'Event':
+                event = self._parse_json_ld_event(data)
+                if event:
+                    page_events.append(event)
+        
+        return page_events
     
     def _parse_json_ld_event(self, data: Dict) -> Optional[Dict]:
         """Parse event from JSON-LD structured data"""
@@ -183,10 +740,8 @@ class EventbriteClient:
         except:
             return None
     
-    def _parse_html_events(self, soup: BeautifulSoup) -> List[Dict]:
-        """Parse events from HTML when JSON-LD is not available"""
-        events = []
-        
+    def _find_html_cards(self, soup: BeautifulSoup) -> List:
+        """Event cards matched by the first selector that finds any"""
         selectors = [
             'article[data-event-id]',
             'div[data-event-id]',
@@ -198,16 +753,14 @@ class EventbriteClient:
         for selector in selectors:
             cards = soup.select(selector)
             if cards:
-                for card in cards:
-                    event = self._parse_html_card(card)
-                    if event:
-                        events.append(event)
-                break
-        
-        return events
+                return cards
+        return []
+    
+    def _card_needs_details(self, fields: Dict) -> bool:
+        return bool(fields["url"]) and (not fields["description"] or not fields["start_time"])
     
-    def _parse_html_card(self, card) -> Optional[Dict]:
-        """Parse individual event card from HTML"""
+    def _parse_card_fields(self, card) -> Optional[Dict]:
+        """Fields readable from the card itself, before any detail page is fetched"""
         try:
             # Extract title
             title_elem = card.find(['h2', 'h3', 'h4']) or card.find('a')
@@ -250,17 +803,41 @@ class EventbriteClient:
             img_elem = card.find('img')
             image_url = img_elem.get('src', '') if img_elem else ""
             
-            if url and (not description or not start_time):
-                event_details = self._fetch_event_details(url)
-                if event_details:
-                    if not description:
-                        description = event_details.get('description', '')
-                    if not start_time:
-                        start_time = event_details.get('start_time', '')
-                    if not end_time:
-                        end_time = event_details.get('end_time', '')
-                    if not date_str and event_details.get('date_display'):
-                        date_str = event_details.get('date_display', '')
+            return {
+                "title": title,
+                "url": url,
+                "start_time": start_time,
+                "end_time": end_time,
+                "date_str": date_str,
+                "description": description,
+                "venue_name": venue_name,
+                "image_url": image_url,
+                "card_text": card.get_text(),
+            }
+        except:
+            return None
+    
+    def _complete_card_event(self, fields: Dict, event_details: Dict) -> Optional[Dict]:
+        """Merge detail-page fields into a parsed card and build the event"""
+        try:
+            title = fields["title"]
+            url = fields["url"]
+            start_time = fields["start_time"]
+            end_time = fields["end_time"]
+            date_str = fields["date_str"]
+            description = fields["description"]
+            venue_name = fields["venue_name"]
+            image_url = fields["image_url"]
+            
+            if event_details:
+                if not description:
+                    description = event_details.get('description', '')
+                if not start_time:
+                    start_time = event_details.get('start_time', '')
+                if not end_time:
+                    end_time = event_details.get('end_time', '')
+                if not date_str and event_details.get('date_display'):
+                    date_str = event_details.get('date_display', '')
             
             if description and (not start_time or not date_str):
                 date_info = self._extract_date_from_text(description)
@@ -272,7 +849,7 @@ class EventbriteClient:
                     end_time = date_info['end_time']
             
             if not start_time or not date_str:
-                card_text = card.get_text()
+                card_text = fields["card_text"]
                 date_info = self._extract_date_from_text(card_text)
                 if not start_time and date_info.get('start_time'):
                     start_time = date_info['start_time']
@@ -287,7 +864,7 @@ class EventbriteClient:
                 "start_time": start_time or date_str,
                 "end_time": end_time,
                 "date_display": date_str,
-                "is_free": 'free' in card.get_text().lower(),
+                "is_free": 'free' in fields["card_text"].lower(),
                 "logo_url": image_url,
                 "venue": {
                     "name": venue_name,
@@ -305,61 +882,73 @@ class EventbriteClient:
     def _fetch_event_details(self, event_url: str) -> Dict:
         """Fetch full event details including description and date/time from event page"""
         try:
-            response = requests.get(event_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            return self._get_page(event_url, DETAIL_CACHE_TTL_SECONDS, DETAIL_TIMEOUT_SECONDS, self._parse_event_details)
+        except:
+            return {}
+    
+    async def _afetch_event_details(self, event_url: str) -> Dict:
+        """Async _fetch_event_details over the shared connection pool"""
+        try:
+            return await self._aget_page(event_url, DETAIL_CACHE_TTL_SECONDS, DETAIL_TIMEOUT_SECONDS, self._parse_event_details)
+        except Exception:
+            return {}
+    
+    async def _aget(self, url: str, timeout: float, headers: Optional[Dict] = None) -> httpx.Response:
+        """GET through the shared pool, with at most SCRAPE_PER_HOST_CONCURRENCY requests in flight per host"""
+        http = _async_http()
+        host = urlparse(url).netloc
+        semaphore = http["semaphores"].get(host)
+        if semaphore is None:
+            semaphore = http["semaphores"][host] = asyncio.Semaphore(SCRAPE_PER_HOST_CONCURRENCY)
+        
+        async with semaphore:
+            return await http["client"].get(url, headers={**self.headers, **(headers or {})}, timeout=timeout)
+    
+    def _parse_event_details(self, html: str) -> Dict:
+        """Description and date/time from an event page"""
+        try:
             details = {}
+            markup = NON_TEXT_PATTERN.sub('', html)
             
-            # Extract description
-            desc_selectors = [
-                'div.eds-text--left',
-                'div[class*="description"]',
-                'div[class*="summary"]',
-                'meta[name="description"]',
-                'meta[property="og:description"]'
-            ]
-            
-            for selector in desc_selectors:
-                if 'meta' in selector:
-                    elem = soup.find('meta', attrs={'name': 'description'}) or \
-                           soup.find('meta', attrs={'property': 'og:description'})
-                    if elem and elem.get('content'):
-                        details['description'] = elem.get('content', '')
+            # Extract description: the first container of each kind, then meta tags
+            divs = [(match.start(), _attributes(match.group(1)).get('class', '')) for match in DIV_TAG_PATTERN.finditer(markup)]
+            for matches in DESCRIPTION_DIV_MATCHERS:
+                start = next((position for position, classes in divs if matches(classes)), None)
+                if start is not None:
+                    text = _element_text(markup, start, 'div')
+                    if len(text) > 50:
+                        details['description'] = text
                         break
-                else:
-                    elem = soup.select_one(selector)
-                    if elem:
-                        text = elem.get_text(strip=True)
-                        if len(text) > 50:
-                            details['description'] = text
-                            break
             
-            script_tags = soup.find_all('script', type='application/ld+json')
-            for script in script_tags:
-                try:
-                    data = json.loads(script.string)
-                    if isinstance(data, dict) and data.get('@type') == 'Event':
-                        details['start_time'] = data.get('startDate', '')
-                        details['end_time'] = data.get('endDate', '')
-                        
-                        if details.get('start_time'):
-                            try:
-                                dt = datetime.fromisoformat(details['start_time'].replace('Z', '+00:00'))
-                                hour = dt.strftime('%I').lstrip('0')
-                                formatted_time = f"{hour}:{dt.strftime('%M %p')}"
-                                details['date_display'] = f"{dt.strftime('%a, %b %d, %Y')} at {formatted_time}"
-                            except:
-                                pass
-                        break
-                except:
-                    continue
+            if 'description' not in details:
+                metas = [_attributes(match.group(1)) for match in META_TAG_PATTERN.finditer(markup)]
+                elem = next((attrs for attrs in metas if attrs.get('name') == 'description'), None) or \
+                       next((attrs for attrs in metas if attrs.get('property') == 'og:description'), None)
+                if elem and elem.get('content'):
+                    details['description'] = elem['content']
+            
+            for data in json_ld_blocks(html):
+                if isinstance(data, dict) and data.get('@type') == 'Event':
+                    details['start_time'] = data.get('startDate', '')
+                    details['end_time'] = data.get('endDate', '')
+                    
+                    if details.get('start_time'):
+                        try:
+                            dt = datetime.fromisoformat(details['start_time'].replace('Z', '+00:00'))
+                            hour = dt.strftime('%I').lstrip('0')
+                            formatted_time = f"{hour}:{dt.strftime('%M %p')}"
+                            details['date_display'] = f"{dt.strftime('%a, %b %d, %Y')} at {formatted_time}"
+                        except:
+                            pass
+                    break
             
             if not details.get('start_time'):
-                time_elem = soup.find('time', {'datetime': True})
-                if time_elem:
-                    details['start_time'] = time_elem.get('datetime', '')
-                    details['date_display'] = time_elem.get_text(strip=True)
+                for match in TIME_TAG_PATTERN.finditer(markup):
+                    attrs = _attributes(match.group(1))
+                    if 'datetime' in attrs:
+                        details['start_time'] = attrs['datetime']
+                        details['date_display'] = _element_text(markup, match.start(), 'time')
+                        break
             
             return details
         except:
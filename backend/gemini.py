@@ -1,8 +1,16 @@
-import base64
+import asyncio
+import hashlib
+import heapq
+import itertools
 import json
 import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable
 
 import google.generativeai as genai
 from dotenv import load_dotenv
@@ -13,102 +21,1197 @@ load_dotenv()
 
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
-_TEXT_BACKOFF_UNTIL: datetime | None = None
-_IMAGE_BACKOFF_UNTIL: datetime | None = None
+TEXT_MODEL = os.getenv("GEMINI_TEXT_MODEL", "gemini-2.5-flash-lite")
+IMAGE_MODEL = os.getenv("GEMINI_IMAGE_MODEL", "gemini-2.0-flash-exp")
 
+# Cooldown deadlines per model name, set when the API reports
+# RESOURCE_EXHAUSTED; quotas are per model, so a fallback model stays usable.
+# Guarded by a lock since calls run on worker threads.
+_backoff_lock = threading.Lock()
+_backoff_until: dict[str, datetime] = {}
 
-def _should_backoff(backoff_until: datetime | None) -> bool:
-    if backoff_until is None:
-        return False
-    return datetime.utcnow() < backoff_until
 
+def _should_backoff(model: str) -> bool:
+    with _backoff_lock:
+        until = _backoff_until.get(model)
+    if until is None:
+        return False
+    return datetime.utcnow() < until
 
-def _schedule_backoff(kind: str, error: Exception) -> None:
-    global _TEXT_BACKOFF_UNTIL, _IMAGE_BACKOFF_UNTIL
 
+def _schedule_backoff(model: str, error: Exception) -> None:
     message = str(error)
     match = re.search(r"retry in (\d+(?:\.\d+)?)s", message, re.IGNORECASE)
     seconds = float(match.group(1)) if match else 60.0
-    backoff_until = datetime.utcnow() + timedelta(seconds=seconds)
+    until = datetime.utcnow() + timedelta(seconds=seconds)
 
-    if kind == "text":
-        _TEXT_BACKOFF_UNTIL = backoff_until
-    else:
-        _IMAGE_BACKOFF_UNTIL = backoff_until
+    with _backoff_lock:
+        current = _backoff_until.get(model)
+        if current is None or until > current:
+            _backoff_until[model] = until
 
     print(
-        f"[Gemini] Quota exhausted for {kind} model. Cooling down for {seconds:.0f}s"
+        f"[Gemini] Quota exhausted for {model}. Cooling down for {seconds:.0f}s"
     )
 
-def gemini(prompt):
-    try:
-        if _should_backoff(_TEXT_BACKOFF_UNTIL):
-            print("[Gemini] Text model on cooldown due to quota limits")
-            return None
 
-        model = genai.GenerativeModel("gemini-2.5-flash-lite")
-        response = model.generate_content(f"prompt starts =  {prompt} ")
+# --- Response cache ---
+#
+# Responses are keyed by a hash of (model, prompt, image digest), so identical
+# prompts cost no quota. Each call site has its own TTL; a TTL of 0 disables
+# caching for that site.
 
-        # Remove any "Assistant:" prefix from the response
-        answer = response.text.strip()
+CACHE_BACKEND = os.getenv("GEMINI_CACHE_BACKEND", "memory").strip().lower()
+CACHE_DIR = os.getenv("GEMINI_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".gemini_cache"))
+CACHE_MAX_ENTRIES = int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "2048"))
 
-        return answer
+CACHE_TTLS = {
+    "default": 3600,
+    "event_tasks": 7 * 24 * 3600,
+    "event_tasks_batch": 7 * 24 * 3600,
+    "admin_tasks": 24 * 3600,
+    "keyword_profile": 24 * 3600,
+    "keyword_profile_batch": 24 * 3600,
+    "task_verification": 24 * 3600,
+    "task_verification_batch": 24 * 3600,
+}
 
-    except Exception as e:
-        print(f"Error using Gemini API: {e}")
-        if "RESOURCE_EXHAUSTED" in str(e):
-            _schedule_backoff("text", e)
+
+class MemoryCacheBackend:
+    """Process-local LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+class DiskCacheBackend:
+    """diskcache directory that can be shared by several workers"""
+
+    def __init__(self, directory: str = CACHE_DIR):
+        import diskcache
+
+        self._cache = diskcache.Cache(directory)
+
+    def get(self, key: str) -> str | None:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._cache.set(key, value, expire=ttl)
+
+
+def _create_cache_backend():
+    if CACHE_BACKEND == "none":
+        return None
+    if CACHE_BACKEND == "disk":
+        try:
+            return DiskCacheBackend()
+        except Exception as e:
+            print(f"[Gemini] Disk cache unavailable ({e}); using in-memory cache")
+    return MemoryCacheBackend()
+
+
+class CacheMetrics:
+    """Hit/miss counters per call site"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: dict[str, dict[str, int]] = {}
+
+    def record(self, call_site: str, outcome: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(call_site, {"hits": 0, "misses": 0})
+            counts[outcome] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            sites = {site: dict(counts) for site, counts in self._counts.items()}
+        hits = sum(counts["hits"] for counts in sites.values())
+        misses = sum(counts["misses"] for counts in sites.values())
+        return {
+            "backend": CACHE_BACKEND,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "call_sites": sites,
+        }
+
+
+def cache_key(model: str, prompt: str, image: bytes | list[bytes] | None = None) -> str:
+    """Content address of a request: sha256 over model, prompt and image digest(s)."""
+    if isinstance(image, list):
+        image_digest = ",".join(hashlib.sha256(item).hexdigest() for item in image)
+    else:
+        image_digest = hashlib.sha256(image).hexdigest() if image else ""
+    payload = json.dumps([model, prompt, image_digest], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_ttl(call_site: str, cache_ttl: float | None) -> float:
+    if cache_ttl is not None:
+        return cache_ttl
+    return CACHE_TTLS.get(call_site, CACHE_TTLS["default"])
+
+
+# --- Single-flight coalescing ---
+#
+# Concurrent callers with the same cache key share one in-flight request.
+# Failed outcomes (None) are shared as well and remembered for a short
+# negative TTL so a burst of identical requests does not retry in lockstep.
+
+NEGATIVE_TTL_SECONDS = float(os.getenv("GEMINI_NEGATIVE_TTL_SECONDS", "5"))
+# A sync follower stops waiting after this long and issues its own request,
+# so a blocked event loop can never deadlock against an async leader.
+SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv("GEMINI_SINGLE_FLIGHT_WAIT_SECONDS", "60"))
+
+
+class SingleFlight:
+    """In-flight request registry keyed by cache key"""
+
+    def __init__(self, negative_ttl: float = NEGATIVE_TTL_SECONDS):
+        self._negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+        self._failures: dict[str, float] = {}
+        self._stats = {"leaders": 0, "coalesced": 0, "negative_hits": 0}
+
+    def recent_failure(self, key: str) -> bool:
+        with self._lock:
+            expires_at = self._failures.get(key)
+            if expires_at is None:
+                return False
+            if expires_at < time.monotonic():
+                del self._failures[key]
+                return False
+            self._stats["negative_hits"] += 1
+            return True
+
+    def begin(self, key: str) -> tuple[Future, bool]:
+        """Join the in-flight call for key, or become its leader."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self._stats["leaders"] += 1
+            return future, True
+
+    def finish(self, key: str, future: Future, result: str | None = None, error: BaseException | None = None) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+            if result is None and self._negative_ttl > 0:
+                self._failures[key] = time.monotonic() + self._negative_ttl
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def abandon(self, key: str, future: Future) -> None:
+        """Release a call whose leader was cancelled: waiters get None and no failure is recorded."""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        future.set_result(None)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
+
+
+# --- Rate governor ---
+#
+# Proactive per-model request/token budgets. Callers wait in a priority queue
+# for bucket capacity, so interactive calls are admitted before background
+# work, and give up (returning None) once their queue deadline passes.
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 5
+PRIORITY_BACKGROUND = 10
+
+CALL_SITE_PRIORITIES = {
+    "task_verification": PRIORITY_INTERACTIVE,
+    "task_verification_batch": PRIORITY_NORMAL,
+    "keyword_profile": PRIORITY_INTERACTIVE,
+    "admin_tasks": PRIORITY_NORMAL,
+    "event_tasks": PRIORITY_BACKGROUND,
+    "event_tasks_batch": PRIORITY_BACKGROUND,
+    "keyword_profile_batch": PRIORITY_BACKGROUND,
+}
+
+# Longest a request may wait for capacity, by priority
+QUEUE_DEADLINES = {
+    PRIORITY_INTERACTIVE: float(os.getenv("GEMINI_INTERACTIVE_QUEUE_SECONDS", "10")),
+    PRIORITY_NORMAL: float(os.getenv("GEMINI_NORMAL_QUEUE_SECONDS", "30")),
+    PRIORITY_BACKGROUND: float(os.getenv("GEMINI_BACKGROUND_QUEUE_SECONDS", "120")),
+}
+
+# Rough output size added to the prompt estimate when charging the TPM bucket
+ESTIMATED_OUTPUT_TOKENS = 256
+IMAGE_INPUT_TOKENS = 258
+
+
+def _parse_rate_limits(spec: str) -> dict[str, tuple[float, float]]:
+    """Parse "model=rpm:tpm,model=rpm:tpm" into {model: (rpm, tpm)}."""
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            model, budget = entry.split("=", 1)
+            rpm, tpm = budget.split(":", 1)
+            limits[model.strip()] = (float(rpm), float(tpm))
+        except ValueError:
+            print(f"[Gemini] Ignoring malformed rate limit entry: {entry}")
+    return limits
+
+
+RATE_LIMITS = _parse_rate_limits(os.getenv(
+    "GEMINI_RATE_LIMITS", f"{TEXT_MODEL}=15:250000,{IMAGE_MODEL}=10:250000"
+))
+
+
+def estimate_tokens(prompt: str, image: bytes | list[bytes] | None = None) -> int:
+    tokens = len(prompt) // 4 + ESTIMATED_OUTPUT_TOKENS
+    if image:
+        tokens += IMAGE_INPUT_TOKENS * (len(image) if isinstance(image, list) else 1)
+    return tokens
+
+
+def _wake(waker: asyncio.Future) -> None:
+    if not waker.done():
+        waker.set_result(None)
+
+
+class _TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.level = per_minute
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate) if self.rate else float("inf")
+
+
+class _ModelLane:
+    """Buckets and waiting queue for one model"""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = _TokenBucket(rpm)
+        self.tokens = _TokenBucket(tpm)
+        self.condition = threading.Condition()
+        self.queue: list[tuple[int, int]] = []
+        # Async waiters' wake-up futures by ticket; sync waiters use the condition
+        self.wakers: dict[tuple[int, int], tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self.stats = {"admitted": 0, "expired": 0}
+
+
+class RateGovernor:
+    """Token-bucket RPM/TPM budgets per model with a priority wait queue"""
+
+    def __init__(self, limits: dict[str, tuple[float, float]] = RATE_LIMITS):
+        self._lanes = {model: _ModelLane(rpm, tpm) for model, (rpm, tpm) in limits.items()}
+        self._sequence = itertools.count()
+
+    @staticmethod
+    def _try_admit(lane: _ModelLane, ticket: tuple[int, int], tokens: int) -> float | None:
+        """
+        Admit `ticket` if it heads the queue and both buckets have room.
+
+        Call with lane.condition held.
+
+        Returns:
+            None once admitted, else how long to wait before checking again
+            (infinite while another ticket is ahead)
+        """
+        now = time.monotonic()
+        lane.requests.refill(now)
+        lane.tokens.refill(now)
+        if lane.queue[0] != ticket:
+            return float("inf")
+        wait = max(lane.requests.wait_time(1), lane.tokens.wait_time(tokens))
+        if wait:
+            return wait
+        lane.requests.level -= 1
+        lane.tokens.level -= min(tokens, lane.tokens.capacity)
+        lane.stats["admitted"] += 1
         return None
 
-def geminiImage(prompt, image):
+    @staticmethod
+    def _leave(lane: _ModelLane, ticket: tuple[int, int]) -> None:
+        """Drop `ticket` from the queue and wake every waiter to re-check. Call with lane.condition held."""
+        lane.queue.remove(ticket)
+        heapq.heapify(lane.queue)
+        lane.condition.notify_all()
+        for loop, waker in lane.wakers.values():
+            loop.call_soon_threadsafe(_wake, waker)
+
+    def acquire(self, model: str, tokens: int, priority: int, timeout: float) -> bool:
+        """
+        Block until the model has budget for one request of `tokens` tokens.
+
+        Lower priority values are admitted first; equal priorities are FIFO.
+
+        Returns:
+            False if the deadline passed while waiting in the queue
+        """
+        lane = self._lanes.get(model)
+        if lane is None:
+            return True
+
+        deadline = time.monotonic() + timeout
+        ticket = (priority, next(self._sequence))
+        with lane.condition:
+            heapq.heappush(lane.queue, ticket)
+            try:
+                while True:
+                    wait = self._try_admit(lane, ticket, tokens)
+                    if wait is None:
+                        return True
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        lane.stats["expired"] += 1
+                        return False
+                    # The head waits for capacity; everyone else waits to become head
+                    lane.condition.wait(min(remaining, wait))
+            finally:
+                self._leave(lane, ticket)
+
+    async def aacquire(self, model: str, tokens: int, priority: int, timeout: float) -> bool:
+        """
+        Async acquire(): waits on the event loop rather than a worker thread.
+
+        A cancelled caller leaves the queue straight away, so it never takes
+        budget for a request nobody is waiting for.
+        """
+        lane = self._lanes.get(model)
+        if lane is None:
+            return True
+
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + timeout
+        ticket = (priority, next(self._sequence))
+        with lane.condition:
+            heapq.heappush(lane.queue, ticket)
+        try:
+            while True:
+                with lane.condition:
+                    wait = self._try_admit(lane, ticket, tokens)
+                    if wait is None:
+                        return True
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        lane.stats["expired"] += 1
+                        return False
+                    waker = loop.create_future()
+                    lane.wakers[ticket] = (loop, waker)
+                try:
+                    await asyncio.wait({waker}, timeout=min(remaining, wait))
+                finally:
+                    with lane.condition:
+                        lane.wakers.pop(ticket, None)
+        finally:
+            with lane.condition:
+                self._leave(lane, ticket)
+
+    def snapshot(self) -> dict:
+        snapshot = {}
+        for model, lane in self._lanes.items():
+            with lane.condition:
+                lane.requests.refill(time.monotonic())
+                lane.tokens.refill(time.monotonic())
+                snapshot[model] = {
+                    **lane.stats,
+                    "waiting": len(lane.queue),
+                    "requests_available": round(lane.requests.level, 2),
+                    "tokens_available": round(lane.tokens.level),
+                }
+        return snapshot
+
+
+def _resolve_priority(call_site: str, priority: int | None) -> int:
+    if priority is not None:
+        return priority
+    return CALL_SITE_PRIORITIES.get(call_site, PRIORITY_NORMAL)
+
+
+def _queue_timeout(priority: int, queue_timeout: float | None) -> float:
+    if queue_timeout is not None:
+        return queue_timeout
+    nearest = min(QUEUE_DEADLINES, key=lambda level: abs(level - priority))
+    return QUEUE_DEADLINES[nearest]
+
+
+# --- Circuit breakers ---
+#
+# One breaker per model. A breaker opens when, over a sliding window, the share
+# of failed or slow calls crosses the threshold; while open, calls skip the
+# model (trying its configured fallback model, else returning None so callers
+# take their local fallback). After the cooldown a single half-open probe
+# decides whether to close it again.
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+BREAKER_WINDOW_SECONDS = float(os.getenv("GEMINI_BREAKER_WINDOW_SECONDS", "60"))
+BREAKER_MIN_CALLS = int(os.getenv("GEMINI_BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATE = float(os.getenv("GEMINI_BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("GEMINI_BREAKER_SLOW_CALL_SECONDS", "15"))
+BREAKER_OPEN_SECONDS = float(os.getenv("GEMINI_BREAKER_OPEN_SECONDS", "30"))
+BREAKER_TRANSITION_HISTORY = 20
+
+
+def _parse_fallback_models(spec: str) -> dict[str, list[str]]:
+    """Parse "model=fallback|fallback,model=fallback" into {model: [fallbacks]}."""
+    fallbacks = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        model, sep, chain = entry.partition("=")
+        if not sep:
+            print(f"[Gemini] Ignoring malformed fallback entry: {entry}")
+            continue
+        fallbacks[model.strip()] = [m.strip() for m in chain.split("|") if m.strip()]
+    return fallbacks
+
+
+FALLBACK_MODELS = _parse_fallback_models(os.getenv("GEMINI_FALLBACK_MODELS", ""))
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a sliding window of call outcomes"""
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = BREAKER_WINDOW_SECONDS,
+        min_calls: int = BREAKER_MIN_CALLS,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self._state = BREAKER_CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._outcomes: list[tuple[float, bool]] = []
+        self._transitions: list[dict] = []
+        self.stats = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "opened": 0}
+
+    def _transition(self, state: str, reason: str) -> None:
+        print(f"[Gemini] Circuit for {self.name}: {self._state} -> {state} ({reason})")
+        self._transitions.append({
+            "from": self._state,
+            "to": state,
+            "reason": reason,
+            "at": datetime.utcnow().isoformat(),
+        })
+        del self._transitions[:-BREAKER_TRANSITION_HISTORY]
+        self._state = state
+        if state == BREAKER_OPEN:
+            self._opened_at = time.monotonic()
+            self.stats["opened"] += 1
+        elif state == BREAKER_CLOSED:
+            self._outcomes = []
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go to the model now.
+
+        When the open cooldown has passed, exactly one caller gets True as the
+        half-open probe; it must then call record() or release().
+        """
+        with self._lock:
+            if self._state == BREAKER_OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._transition(BREAKER_HALF_OPEN, "cooldown elapsed")
+            if self._state == BREAKER_CLOSED:
+                return True
+            if self._state == BREAKER_HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def release(self) -> None:
+        """Give back an allowed call that never reached the model (e.g. queue timeout)."""
+        with self._lock:
+            self._probing = False
+
+    def record(self, success: bool, elapsed: float) -> None:
+        slow = elapsed > self.slow_call_seconds
+        failed = not success or slow
+        now = time.monotonic()
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["failures"] += 0 if success else 1
+            self.stats["slow_calls"] += 1 if slow else 0
+
+            if self._state == BREAKER_HALF_OPEN:
+                self._probing = False
+                if failed:
+                    self._transition(BREAKER_OPEN, "probe slow" if success else "probe failed")
+                else:
+                    self._transition(BREAKER_CLOSED, "probe succeeded")
+                return
+
+            self._outcomes.append((now, failed))
+            cutoff = now - self.window_seconds
+            while self._outcomes and self._outcomes[0][0] < cutoff:
+                self._outcomes.pop(0)
+
+            if self._state == BREAKER_CLOSED and len(self._outcomes) >= self.min_calls:
+                rate = sum(1 for _, f in self._outcomes if f) / len(self._outcomes)
+                if rate >= self.failure_rate:
+                    self._transition(BREAKER_OPEN, f"{rate:.0%} of last {len(self._outcomes)} calls failed or slow")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            failed = sum(1 for _, f in self._outcomes if f)
+            return {
+                **self.stats,
+                "state": self._state,
+                "window_calls": len(self._outcomes),
+                "window_failure_rate": round(failed / len(self._outcomes), 3) if self._outcomes else 0.0,
+                "transitions": list(self._transitions),
+            }
+
+
+class CircuitBreakerBoard:
+    """Per-model breakers and the fallback route for each model"""
+
+    def __init__(self, fallbacks: dict[str, list[str]] = FALLBACK_MODELS):
+        self._fallbacks = fallbacks
+        self._lock = threading.Lock()
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, model: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(model)
+            if breaker is None:
+                breaker = CircuitBreaker(model)
+                self._breakers[model] = breaker
+            return breaker
+
+    def route(self, model: str) -> list[str]:
+        """The model followed by its fallbacks, without repeats."""
+        return list(dict.fromkeys([model] + self._fallbacks.get(model, [])))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {model: breaker.snapshot() for model, breaker in breakers.items()}
+
+
+class GeminiGateway:
+    """
+    Long-lived Gemini clients shared by every call site.
+
+    Text generation reuses one GenerativeModel per model name and image
+    generation reuses a single google-genai Client, so connections stay warm
+    across calls. Every method has a native async counterpart, and successful
+    responses go through the response cache.
+    """
+
+    def __init__(self, api_key: str | None = None, cache=None):
+        self._api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self._lock = threading.Lock()
+        self._models: dict[str, genai.GenerativeModel] = {}
+        self._client: genai_client.Client | None = None
+        self.cache = cache
+        self.cache_metrics = CacheMetrics()
+        self.flights = SingleFlight()
+        self.governor = RateGovernor()
+        self.breakers = CircuitBreakerBoard()
+
+    def _admit(self, model: str, tokens: int, priority: int, timeout: float) -> bool:
+        if self.governor.acquire(model, tokens, priority, timeout):
+            return True
+        print(f"[Gemini] Queue deadline exceeded for {model} (priority {priority})")
+        return False
+
+    async def _aadmit(self, model: str, tokens: int, priority: int, timeout: float) -> bool:
+        if await self.governor.aacquire(model, tokens, priority, timeout):
+            return True
+        print(f"[Gemini] Queue deadline exceeded for {model} (priority {priority})")
+        return False
+
+    def _lookup(self, key: str, call_site: str, ttl: float) -> str | None:
+        if self.cache is None or ttl <= 0:
+            return None
+        cached = self.cache.get(key)
+        self.cache_metrics.record(call_site, "hits" if cached is not None else "misses")
+        return cached
+
+    def _store(self, key: str, ttl: float, result: str | None) -> None:
+        if self.cache is not None and ttl > 0 and result is not None:
+            self.cache.set(key, result, ttl)
+
+    def _cached(
+        self, model: str, key_for: Callable[[str], str], call_site: str, ttl: float,
+        produce: Callable[[], tuple[str | None, str | None]],
+    ) -> str | None:
+        """
+        Serve `model`'s cached answer or coalesce into one `produce()` call.
+
+        `produce` returns (model that answered, answer); the answer is cached
+        under that model's key (`key_for(model)`), so a fallback model's
+        answer never poses as the requested model's.
+        """
+        key = key_for(model)
+        cached = self._lookup(key, call_site, ttl)
+        if cached is not None:
+            return cached
+        if self.flights.recent_failure(key):
+            return None
+
+        future, leader = self.flights.begin(key)
+        if not leader:
+            try:
+                return future.result(timeout=SINGLE_FLIGHT_WAIT_SECONDS)
+            except FutureTimeoutError:
+                return produce()[1]
+
+        try:
+            served, result = produce()
+        except Exception as e:
+            self.flights.finish(key, future, error=e)
+            raise
+        except BaseException:
+            self.flights.abandon(key, future)
+            raise
+        if served:
+            self._store(key_for(served), ttl, result)
+        self.flights.finish(key, future, result)
+        return result
+
+    async def _acached(
+        self, model: str, key_for: Callable[[str], str], call_site: str, ttl: float,
+        produce: Callable[[], Awaitable[tuple[str | None, str | None]]],
+    ) -> str | None:
+        """Async _cached()."""
+        key = key_for(model)
+        cached = self._lookup(key, call_site, ttl)
+        if cached is not None:
+            return cached
+        if self.flights.recent_failure(key):
+            return None
+
+        future, leader = self.flights.begin(key)
+        if not leader:
+            # Shielded so a cancelled follower does not cancel the shared future
+            return await asyncio.shield(asyncio.wrap_future(future))
+
+        try:
+            served, result = await produce()
+        except Exception as e:
+            self.flights.finish(key, future, error=e)
+            raise
+        except BaseException:
+            # A cancelled leader hands followers None rather than its CancelledError
+            self.flights.abandon(key, future)
+            raise
+        if served:
+            self._store(key_for(served), ttl, result)
+        self.flights.finish(key, future, result)
+        return result
+
+    def _text_model(self, model: str) -> genai.GenerativeModel:
+        with self._lock:
+            instance = self._models.get(model)
+            if instance is None:
+                instance = genai.GenerativeModel(model)
+                self._models[model] = instance
+            return instance
+
+    def _image_client(self) -> genai_client.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = genai_client.Client(api_key=self._api_key)
+            return self._client
+
+    @staticmethod
+    def _text_prompt(prompt: str) -> str:
+        return f"prompt starts =  {prompt} "
+
+    @staticmethod
+    def _image_contents(prompt: str, image: bytes, mime_type: str) -> list:
+        return GeminiGateway._images_contents(prompt, [(image, mime_type)])
+
+    @staticmethod
+    def _images_contents(prompt: str, images: list[tuple[bytes, str]]) -> list:
+        return [
+            types.Content(
+                role="user",
+                parts=[types.Part.from_text(text=prompt)] + [
+                    types.Part.from_bytes(data=image, mime_type=mime_type) for image, mime_type in images
+                ],
+            ),
+        ]
+
+    def generate_text(
+        self,
+        prompt: str,
+        model: str = TEXT_MODEL,
+        call_site: str = "default",
+        cache_ttl: float | None = None,
+        priority: int | None = None,
+        queue_timeout: float | None = None,
+    ) -> str | None:
+        priority = _resolve_priority(call_site, priority)
+        timeout = _queue_timeout(priority, queue_timeout)
+        return self._cached(
+            model, lambda m: cache_key(m, prompt), call_site, _cache_ttl(call_site, cache_ttl),
+            lambda: self._call_text(prompt, model, priority, timeout),
+        )
+
+    async def agenerate_text(
+        self,
+        prompt: str,
+        model: str = TEXT_MODEL,
+        call_site: str = "default",
+        cache_ttl: float | None = None,
+        priority: int | None = None,
+        queue_timeout: float | None = None,
+    ) -> str | None:
+        priority = _resolve_priority(call_site, priority)
+        timeout = _queue_timeout(priority, queue_timeout)
+        return await self._acached(
+            model, lambda m: cache_key(m, prompt), call_site, _cache_ttl(call_site, cache_ttl),
+            lambda: self._acall_text(prompt, model, priority, timeout),
+        )
+
+    def generate_image(
+        self,
+        prompt: str,
+        image: bytes,
+        mime_type: str = "image/jpeg",
+        model: str = IMAGE_MODEL,
+        call_site: str = "default",
+        cache_ttl: float | None = None,
+        priority: int | None = None,
+        queue_timeout: float | None = None,
+    ) -> str | None:
+        priority = _resolve_priority(call_site, priority)
+        timeout = _queue_timeout(priority, queue_timeout)
+        return self._cached(
+            model, lambda m: cache_key(m, prompt, image), call_site, _cache_ttl(call_site, cache_ttl),
+            lambda: self._call_image(prompt, image, mime_type, model, priority, timeout),
+        )
+
+    async def agenerate_image(
+        self,
+        prompt: str,
+        image: bytes,
+        mime_type: str = "image/jpeg",
+        model: str = IMAGE_MODEL,
+        call_site: str = "default",
+        cache_ttl: float | None = None,
+        priority: int | None = None,
+        queue_timeout: float | None = None,
+    ) -> str | None:
+        priority = _resolve_priority(call_site, priority)
+        timeout = _queue_timeout(priority, queue_timeout)
+        return await self._acached(
+            model, lambda m: cache_key(m, prompt, image), call_site, _cache_ttl(call_site, cache_ttl),
+            lambda: self._acall_image(prompt, image, mime_type, model, priority, timeout),
+        )
+
+    def generate_images(
+        self,
+        prompt: str,
+        images: list[tuple[bytes, str]],
+        model: str = IMAGE_MODEL,
+        call_site: str = "default",
+        cache_ttl: float | None = None,
+        priority: int | None = None,
+        queue_timeout: float | None = None,
+    ) -> str | None:
+        """One request with several (image bytes, mime type) parts after the prompt."""
+        priority = _resolve_priority(call_site, priority)
+        timeout = _queue_timeout(priority, queue_timeout)
+        data = [image for image, _ in images]
+
+        def invoke(candidate: str) -> str:
+            response = self._image_client().models.generate_content(
+                model=candidate, contents=self._images_contents(prompt, images),
+            )
+            return response.text.strip()
+
+        return self._cached(
+            model, lambda m: cache_key(m, prompt, data), call_site, _cache_ttl(call_site, cache_ttl),
+            lambda: self._guarded(model, estimate_tokens(prompt, data), priority, timeout, invoke),
+        )
+
+    async def agenerate_images(
+        self,
+        prompt: str,
+        images: list[tuple[bytes, str]],
+        model: str = IMAGE_MODEL,
+        call_site: str = "default",
+        cache_ttl: float | None = None,
+        priority: int | None = None,
+        queue_timeout: float | None = None,
+    ) -> str | None:
+        """Async generate_images()."""
+        priority = _resolve_priority(call_site, priority)
+        timeout = _queue_timeout(priority, queue_timeout)
+        data = [image for image, _ in images]
+
+        async def invoke(candidate: str) -> str:
+            response = await self._image_client().aio.models.generate_content(
+                model=candidate, contents=self._images_contents(prompt, images),
+            )
+            return response.text.strip()
+
+        return await self._acached(
+            model, lambda m: cache_key(m, prompt, data), call_site, _cache_ttl(call_site, cache_ttl),
+            lambda: self._aguarded(model, estimate_tokens(prompt, data), priority, timeout, invoke),
+        )
+
+    async def astream_text(
+        self,
+        prompt: str,
+        model: str = TEXT_MODEL,
+        call_site: str = "default",
+        cache_ttl: float | None = None,
+        priority: int | None = None,
+        queue_timeout: float | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield text chunks as Gemini produces them.
+
+        A cached response is yielded as one chunk. Completed streams are cached
+        like generate_text; streams are not coalesced, since followers could
+        not see the leader's partial output. Yields nothing on failure.
+        """
+        priority = _resolve_priority(call_site, priority)
+        timeout = _queue_timeout(priority, queue_timeout)
+        ttl = _cache_ttl(call_site, cache_ttl)
+        key = cache_key(model, prompt)
+
+        cached = self._lookup(key, call_site, ttl)
+        if cached is not None:
+            yield cached
+            return
+
+        candidate = next(
+            (m for m in self.breakers.route(model) if not _should_backoff(m) and self.breakers.get(m).allow()),
+            None,
+        )
+        if candidate is None:
+            print(f"[Gemini] {model} and its fallbacks are cooling down or open; using local fallback")
+            return
+        breaker = self.breakers.get(candidate)
+        if not await self._aadmit(candidate, estimate_tokens(prompt), priority, timeout):
+            breaker.release()
+            return
+
+        parts = []
+        start = time.monotonic()
+        completed = False
+        try:
+            response = await self._text_model(candidate).generate_content_async(
+                self._text_prompt(prompt), stream=True
+            )
+            async for chunk in response:
+                text = chunk.text if chunk.parts else ""
+                if text:
+                    parts.append(text)
+                    yield text
+            completed = True
+
+        except Exception as e:
+            breaker.record(False, time.monotonic() - start)
+            completed = None
+            print(f"Error streaming from Gemini API ({candidate}): {e}")
+            if "RESOURCE_EXHAUSTED" in str(e):
+                _schedule_backoff(candidate, e)
+            return
+        finally:
+            # A consumer that stops reading early leaves no outcome to record
+            if completed is False:
+                breaker.release()
+
+        breaker.record(True, time.monotonic() - start)
+        self._store(cache_key(candidate, prompt), ttl, "".join(parts).strip() or None)
+
+    def _guarded(
+        self, model: str, tokens: int, priority: int, timeout: float,
+        invoke: Callable[[str], str],
+    ) -> tuple[str | None, str | None]:
+        """
+        Run `invoke(model)` behind the quota cooldowns, circuit breakers and
+        rate governor. A model that is cooling down, has an open breaker or
+        fails is skipped for the next one in its route.
+
+        Returns:
+            (model that answered, answer), or (None, None) if none did
+        """
+        for candidate in self.breakers.route(model):
+            if _should_backoff(candidate):
+                continue
+            breaker = self.breakers.get(candidate)
+            if not breaker.allow():
+                continue
+
+            recorded = False
+            try:
+                if not self._admit(candidate, tokens, priority, timeout):
+                    return None, None
+                start = time.monotonic()
+                try:
+                    result = invoke(candidate)
+                except Exception as e:
+                    breaker.record(False, time.monotonic() - start)
+                    recorded = True
+                    print(f"Error using Gemini API ({candidate}): {e}")
+                    if "RESOURCE_EXHAUSTED" in str(e):
+                        _schedule_backoff(candidate, e)
+                    continue
+                breaker.record(True, time.monotonic() - start)
+                recorded = True
+                return candidate, result
+            finally:
+                # An allowed call that never reached the model frees its probe slot
+                if not recorded:
+                    breaker.release()
+
+        print(f"[Gemini] No answer from {model} or its fallbacks; using local fallback")
+        return None, None
+
+    async def _aguarded(
+        self, model: str, tokens: int, priority: int, timeout: float,
+        invoke: Callable[[str], Awaitable[str]],
+    ) -> tuple[str | None, str | None]:
+        """Async _guarded()."""
+        for candidate in self.breakers.route(model):
+            if _should_backoff(candidate):
+                continue
+            breaker = self.breakers.get(candidate)
+            if not breaker.allow():
+                continue
+
+            recorded = False
+            try:
+                if not await self._aadmit(candidate, tokens, priority, timeout):
+                    return None, None
+                start = time.monotonic()
+                try:
+                    result = await invoke(candidate)
+                except Exception as e:
+                    breaker.record(False, time.monotonic() - start)
+                    recorded = True
+                    print(f"Error using Gemini API ({candidate}): {e}")
+                    if "RESOURCE_EXHAUSTED" in str(e):
+                        _schedule_backoff(candidate, e)
+                    continue
+                breaker.record(True, time.monotonic() - start)
+                recorded = True
+                return candidate, result
+            finally:
+                # Also runs on cancellation, which is not an Exception
+                if not recorded:
+                    breaker.release()
+
+        print(f"[Gemini] No answer from {model} or its fallbacks; using local fallback")
+        return None, None
+
+    def _call_text(self, prompt: str, model: str, priority: int, timeout: float) -> tuple[str | None, str | None]:
+        def invoke(candidate: str) -> str:
+            response = self._text_model(candidate).generate_content(self._text_prompt(prompt))
+            return response.text.strip()
+
+        return self._guarded(model, estimate_tokens(prompt), priority, timeout, invoke)
+
+    async def _acall_text(
+        self, prompt: str, model: str, priority: int, timeout: float
+    ) -> tuple[str | None, str | None]:
+        async def invoke(candidate: str) -> str:
+            response = await self._text_model(candidate).generate_content_async(self._text_prompt(prompt))
+            return response.text.strip()
+
+        return await self._aguarded(model, estimate_tokens(prompt), priority, timeout, invoke)
+
+    def _call_image(
+        self, prompt: str, image: bytes, mime_type: str, model: str, priority: int, timeout: float
+    ) -> tuple[str | None, str | None]:
+        def invoke(candidate: str) -> str:
+            response = self._image_client().models.generate_content(
+                model=candidate,
+                contents=self._image_contents(prompt, image, mime_type),
+            )
+            return response.text.strip()
+
+        return self._guarded(model, estimate_tokens(prompt, image), priority, timeout, invoke)
+
+    async def _acall_image(
+        self, prompt: str, image: bytes, mime_type: str, model: str, priority: int, timeout: float
+    ) -> tuple[str | None, str | None]:
+        async def invoke(candidate: str) -> str:
+            response = await self._image_client().aio.models.generate_content(
+                model=candidate,
+                contents=self._image_contents(prompt, image, mime_type),
+            )
+            return response.text.strip()
+
+        return await self._aguarded(model, estimate_tokens(prompt, image), priority, timeout, invoke)
+
+
+_gateway: GeminiGateway | None = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> GeminiGateway:
+    """Process-wide gateway, created on first use."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = GeminiGateway(cache=_create_cache_backend())
+        return _gateway
+
+
+def gemini_metrics() -> dict:
+    """Cache, single-flight, rate governor and circuit breaker metrics for the process-wide gateway."""
+    gateway = get_gateway()
+    return {
+        "cache": gateway.cache_metrics.snapshot(),
+        "single_flight": gateway.flights.snapshot(),
+        "rate_governor": gateway.governor.snapshot(),
+        "circuit_breakers": gateway.breakers.snapshot(),
+    }
+
+
+def gemini(prompt, call_site="default", cache_ttl=None, priority=None, queue_timeout=None):
+    """
+    Generate text for a prompt; returns None on failure, cooldown or queue timeout.
+
+    `call_site` selects the cache TTL (CACHE_TTLS) and queue priority
+    (CALL_SITE_PRIORITIES) unless `cache_ttl` / `priority` are given.
+    """
+    return get_gateway().generate_text(
+        prompt, call_site=call_site, cache_ttl=cache_ttl, priority=priority, queue_timeout=queue_timeout
+    )
+
+
+async def agemini(prompt, call_site="default", cache_ttl=None, priority=None, queue_timeout=None):
+    """Async gemini()."""
+    return await get_gateway().agenerate_text(
+        prompt, call_site=call_site, cache_ttl=cache_ttl, priority=priority, queue_timeout=queue_timeout
+    )
+
+
+async def astream_gemini(prompt, call_site="default", cache_ttl=None, priority=None, queue_timeout=None):
+    """Stream gemini() output as text chunks."""
+    async for chunk in get_gateway().astream_text(
+        prompt, call_site=call_site, cache_ttl=cache_ttl, priority=priority, queue_timeout=queue_timeout
+    ):
+        yield chunk
+
+
+def geminiImage(
+    prompt, image, mime_type="image/jpeg", call_site="default", cache_ttl=None, priority=None, queue_timeout=None
+):
     """
     Send an image and prompt to Gemini and return the response.
     
     Args:
         prompt: Text prompt/question about the image
         image: Raw image bytes
+        mime_type: MIME type of the image bytes
+        call_site: Key for CACHE_TTLS and CALL_SITE_PRIORITIES
+        cache_ttl: Explicit cache TTL in seconds (0 disables caching)
+        priority: Queue priority (PRIORITY_INTERACTIVE ... PRIORITY_BACKGROUND)
+        queue_timeout: Max seconds to wait for rate-limit capacity
     
     Returns:
         Response text from Gemini
     """
-    try:
-        if _should_backoff(_IMAGE_BACKOFF_UNTIL):
-            print("[Gemini] Image model on cooldown due to quota limits")
-            return None
+    return get_gateway().generate_image(
+        prompt, image, mime_type=mime_type, call_site=call_site, cache_ttl=cache_ttl,
+        priority=priority, queue_timeout=queue_timeout,
+    )
 
-        client = genai_client.Client(api_key=os.getenv("GEMINI_API_KEY"))
-        
-        # Encode image to base64
-        image_data = base64.b64encode(image).decode("utf-8")
-        
-        # Create content with both text and image
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_text(text=prompt),
-                    types.Part.from_bytes(
-                        data=image,
-                        mime_type="image/jpeg"  # adjust if needed: image/png, etc.
-                    ),
-                ],
-            ),
-        ]
-        
-        # Generate response
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-exp",
-            contents=contents,
-        )
-        
-        return response.text.strip()
 
-    except Exception as e:
-        print(f"Error generating image response with Gemini API: {e}")
-        if "RESOURCE_EXHAUSTED" in str(e):
-            _schedule_backoff("image", e)
+async def ageminiImages(prompt, images, call_site="default", cache_ttl=None, priority=None, queue_timeout=None):
+    """
+    Send several images with one prompt in a single request.
+
+    Args:
+        images: List of (image bytes, mime type), in the order the prompt refers to them
+    """
+    return await get_gateway().agenerate_images(
+        prompt, images, call_site=call_site, cache_ttl=cache_ttl, priority=priority, queue_timeout=queue_timeout,
+    )
+
+
+async def ageminiImage(
+    prompt, image, mime_type="image/jpeg", call_site="default", cache_ttl=None, priority=None, queue_timeout=None
+):
+    """Async geminiImage()."""
+    return await get_gateway().agenerate_image(
+        prompt, image, mime_type=mime_type, call_site=call_site, cache_ttl=cache_ttl,
+        priority=priority, queue_timeout=queue_timeout,
+    )
+
+
+def parse_task_line(line):
+    """Task text from one '- ' prefixed response line, or None for any other line."""
+    if not line.startswith('- '):
         return None
-    
+    return line[2:].strip()
+
+
+async def astream_task_lines(chunks):
+    """
+    Yield tasks from streamed Gemini text as soon as each line is complete.
+
+    Uses the same '- ' line format as Jsonify, so a streamed response yields
+    exactly the tasks Jsonify would return for the full text.
+    """
+    buffer = ""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            task = parse_task_line(line)
+            if task is not None:
+                yield task
+    task = parse_task_line(buffer)
+    if task is not None:
+        yield task
+
+
 def Jsonify(response):
     """
     Convert Gemini response text into a JSON array format.
@@ -116,7 +1219,7 @@ def Jsonify(response):
     """
     try:
         # Split response into lines and filter for lines starting with '- '
-        tasks = [line[2:].strip() for line in response.split('\n') if line.startswith('- ')]
+        tasks = [task for task in map(parse_task_line, response.split('\n')) if task is not None]
         
         # Convert list of tasks to JSON string
         json_response = json.dumps(tasks)
@@ -125,4 +1228,25 @@ def Jsonify(response):
 
     except Exception as e:
         print(f"Error converting response to JSON: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def parse_json_response(response):
+    """
+    Parse a JSON object/array from Gemini text, tolerating ```json fences.
+    Returns None if the response is empty or not valid JSON.
+    """
+    if not response:
+        return None
+    data = response.strip()
+    if data.startswith("```json"):
+        data = data[7:]
+    if data.startswith("```"):
+        data = data[3:]
+    if data.endswith("```"):
+        data = data[:-3]
+    try:
+        return json.loads(data.strip())
+    except ValueError as e:
+        print(f"Error parsing JSON response: {e}")
+        return None
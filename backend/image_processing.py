@@ -0,0 +1,128 @@
+"""Image preprocessing for Gemini task verification uploads."""
+
+import asyncio
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Union
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+IMAGE_MAX_EDGE = int(os.getenv("IMAGE_MAX_EDGE", "1536"))
+IMAGE_OUTPUT_FORMAT = os.getenv("IMAGE_OUTPUT_FORMAT", "JPEG").strip().upper()
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "82"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+OUTPUT_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+# Formats Pillow can decode that we accept as uploads
+ACCEPTED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF", "BMP", "TIFF", "MPO"}
+
+_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image")
+
+
+class ImageProcessingError(ValueError):
+    """The upload is not an image we can read."""
+
+
+def dhash(image: Image.Image, hash_size: int = 8) -> int:
+    """
+    Difference hash: one bit per horizontally adjacent pixel pair of a tiny
+    grayscale thumbnail. Near-identical photos (re-encoded, resized, lightly
+    cropped) differ in only a few bits.
+    """
+    pixels = list(image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS).getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def preprocess_image(
+    data: Union[bytes, BinaryIO],
+    max_edge: int = IMAGE_MAX_EDGE,
+    output_format: str = IMAGE_OUTPUT_FORMAT,
+    quality: int = IMAGE_QUALITY,
+) -> Dict:
+    """
+    Normalize an uploaded photo for the vision model.
+
+    Sniffs the real format from the bytes (the upload's content type is not
+    trusted), applies the EXIF orientation, downsizes so the longest edge is
+    at most `max_edge`, and re-encodes without metadata. The perceptual hash
+    is taken from the upright image so rotation metadata does not change it.
+
+    `data` may be bytes or a seekable binary file, which is decoded in place.
+
+    Returns:
+        {
+            "data": bytes,
+            "mime_type": str,
+            "width": int,
+            "height": int,
+            "original_format": str,
+            "original_bytes": int,
+            "original_size": (int, int),
+            "dhash": int
+        }
+    """
+    output_format = output_format if output_format in OUTPUT_MIME_TYPES else "JPEG"
+    if isinstance(data, (bytes, bytearray)):
+        source, original_bytes = io.BytesIO(data), len(data)
+    else:
+        source = data
+        original_bytes = source.seek(0, io.SEEK_END)
+        source.seek(0)
+
+    try:
+        image = Image.open(source)
+        original_format = image.format or "UNKNOWN"
+        if original_format not in ACCEPTED_FORMATS:
+            raise ImageProcessingError(f"Unsupported image format: {original_format}")
+        original_size = image.size
+
+        # Let the JPEG decoder scale down by a power of two while decoding
+        if original_format in ("JPEG", "MPO"):
+            image.draft("RGB", (max_edge, max_edge))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+    except ImageProcessingError:
+        raise
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise ImageProcessingError(f"Could not read image: {e}")
+
+    if image.mode not in ("RGB", "L") and not (output_format == "WEBP" and image.mode == "RGBA"):
+        if "A" in image.getbands():
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image.convert("RGBA"), mask=image.convert("RGBA").getchannel("A"))
+            image = background
+        else:
+            image = image.convert("RGB")
+
+    # Saving without exif/icc arguments drops all metadata
+    buffer = io.BytesIO()
+    image.save(buffer, format=output_format, quality=quality, optimize=True)
+
+    return {
+        "data": buffer.getvalue(),
+        "mime_type": OUTPUT_MIME_TYPES[output_format],
+        "width": image.width,
+        "height": image.height,
+        "original_format": original_format,
+        "original_bytes": original_bytes,
+        "original_size": original_size,
+        "dhash": dhash(image),
+    }
+
+
+async def run_in_image_pool(func, *args, **kwargs):
+    """Run CPU-bound image work on the image worker pool, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, lambda: func(*args, **kwargs))
+
+
+async def apreprocess_image(data: Union[bytes, BinaryIO], **kwargs) -> Dict:
+    """preprocess_image() on the image worker pool."""
+    return await run_in_image_pool(preprocess_image, data, **kwargs)
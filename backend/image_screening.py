@@ -0,0 +1,131 @@
+"""Cheap local checks that reject obviously invalid verification photos before Gemini."""
+
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError as e:  # e.g. missing system libraries for opencv
+    print(f"[Screening] OpenCV unavailable, image pre-screen disabled: {e}")
+    cv2 = None
+
+SCREEN_MIN_EDGE = int(os.getenv("SCREEN_MIN_EDGE", "96"))
+SCREEN_MIN_CONTRAST = float(os.getenv("SCREEN_MIN_CONTRAST", "6"))
+SCREEN_MIN_BRIGHTNESS = float(os.getenv("SCREEN_MIN_BRIGHTNESS", "12"))
+SCREEN_MIN_SHARPNESS = float(os.getenv("SCREEN_MIN_SHARPNESS", "20"))
+SCREEN_PEOPLE_DETECTION = os.getenv("SCREEN_PEOPLE_DETECTION", "false").strip().lower() in ("1", "true", "yes")
+
+# Images are measured at this longest edge so thresholds do not depend on upload size
+ANALYSIS_EDGE = 512
+
+PEOPLE_TASK_PATTERN = re.compile(
+    r"\b(network|networking|meet|connect|people|person|friends?|group|selfie|colleagues?|neighbou?rs?)\b",
+    re.IGNORECASE,
+)
+
+REJECTION_MESSAGES = {
+    "too_small": "No, the image is too small to verify the task. Please upload a larger photo.",
+    "too_dark": "No, the image is almost completely black. Please retake the photo with more light.",
+    "blank": "No, the image appears to be blank. Please upload a photo that shows the task.",
+    "blurry": "No, the image is too blurry to verify the task. Please hold the camera steady and retake it.",
+    "no_people": "No, no people are visible in the image, and this task involves meeting people.",
+}
+
+_face_detector = None
+
+
+def _count_people(gray: np.ndarray) -> Optional[int]:
+    """
+    Faces (Haar cascade), else full bodies (HOG), visible in the image.
+
+    Returns None if this OpenCV build has neither detector.
+    """
+    global _face_detector
+    try:
+        if hasattr(cv2, "CascadeClassifier"):
+            if _face_detector is None:
+                _face_detector = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+            faces = _face_detector.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(24, 24))
+            if len(faces):
+                return len(faces)
+
+        hog = cv2.HOGDescriptor()
+        hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+        boxes, _ = hog.detectMultiScale(gray, winStride=(8, 8), padding=(8, 8), scale=1.05)
+        return len(boxes)
+    except (AttributeError, cv2.error) as e:
+        print(f"[Screening] People detection unavailable: {e}")
+        return None
+
+
+def task_involves_people(task_description: str) -> bool:
+    return bool(PEOPLE_TASK_PATTERN.search(task_description or ""))
+
+
+def screen_image(
+    data: bytes,
+    original_size: Optional[Tuple[int, int]] = None,
+    task_description: str = "",
+    detect_people: bool = SCREEN_PEOPLE_DETECTION,
+) -> Dict:
+    """
+    Reject tiny, black, blank or blurred images, and optionally images with
+    no visible people for people-related tasks.
+
+    Args:
+        data: Encoded (preprocessed) image bytes
+        original_size: (width, height) of the upload before downsizing
+        task_description: Task being verified, used for people detection
+
+    Returns:
+        {
+            "passed": bool,
+            "reason": str | None,
+            "message": str | None,
+            "metrics": {...}
+        }
+    """
+    if cv2 is None:
+        return {"passed": True, "reason": None, "message": None, "metrics": {}}
+
+    gray = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return {"passed": True, "reason": None, "message": None, "metrics": {}}
+
+    height, width = gray.shape
+    scale = ANALYSIS_EDGE / max(height, width)
+    if scale < 1:
+        gray = cv2.resize(gray, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+
+    width, height = original_size or (width, height)
+    metrics = {
+        "width": width,
+        "height": height,
+        "brightness": round(float(gray.mean()), 2),
+        "contrast": round(float(gray.std()), 2),
+        "sharpness": round(float(cv2.Laplacian(gray, cv2.CV_64F).var()), 2),
+    }
+
+    reason = None
+    if min(width, height) < SCREEN_MIN_EDGE:
+        reason = "too_small"
+    elif metrics["brightness"] < SCREEN_MIN_BRIGHTNESS:
+        reason = "too_dark"
+    elif metrics["contrast"] < SCREEN_MIN_CONTRAST:
+        reason = "blank"
+    elif metrics["sharpness"] < SCREEN_MIN_SHARPNESS:
+        reason = "blurry"
+    elif detect_people and task_involves_people(task_description):
+        metrics["people"] = _count_people(gray)
+        if metrics["people"] == 0:
+            reason = "no_people"
+
+    return {
+        "passed": reason is None,
+        "reason": reason,
+        "message": REJECTION_MESSAGES.get(reason),
+        "metrics": metrics,
+    }
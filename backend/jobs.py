@@ -0,0 +1,165 @@
+"""In-process background jobs for slow AI endpoints."""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED_STATES = (SUCCEEDED, FAILED)
+
+
+class IdempotencyConflict(Exception):
+    """An idempotency key was reused for a request with different parameters"""
+
+
+def _fingerprint(args: tuple, kwargs: dict) -> str:
+    return hashlib.sha256(repr((args, sorted(kwargs.items()))).encode("utf-8")).hexdigest()
+
+
+class JobManager:
+    """
+    Runs jobs on a worker pool and tracks their status.
+
+    Submitting with an idempotency key that matches a queued, running or
+    succeeded job returns that job instead of starting a new one, so client
+    retries never duplicate work. Failed jobs can be retried with the same key.
+    A key is bound to the job's arguments: reusing it with different ones
+    (e.g. another username) raises IdempotencyConflict.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, retention_seconds: float = JOB_RETENTION_SECONDS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._idempotency: Dict[Tuple[str, str], str] = {}
+        self._waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable[..., Dict],
+        *args,
+        idempotency_key: Optional[str] = None,
+        reuse_succeeded: bool = True,
+        **kwargs,
+    ) -> Tuple[Dict, bool]:
+        """
+        Queue `func(*args, **kwargs)`; its return value becomes the job result.
+
+        With reuse_succeeded=False the key only deduplicates jobs that are
+        still queued or running.
+
+        Returns:
+            (job snapshot, created) where created is False if an existing job was reused
+
+        Raises:
+            IdempotencyConflict: The key belongs to a live job with different arguments
+        """
+        fingerprint = _fingerprint(args, kwargs)
+        with self._lock:
+            self._prune_locked()
+            if idempotency_key:
+                existing_id = self._idempotency.get((kind, idempotency_key))
+                existing = self._jobs.get(existing_id) if existing_id else None
+                if existing and existing["fingerprint"] != fingerprint:
+                    raise IdempotencyConflict(f"Idempotency key already used for a different {kind} request")
+                reusable = (QUEUED, RUNNING, SUCCEEDED) if reuse_succeeded else (QUEUED, RUNNING)
+                if existing and existing["status"] in reusable:
+                    return self._snapshot(existing), False
+
+            job_id = "j-" + str(uuid.uuid4())
+            job = {
+                "job_id": job_id,
+                "kind": kind,
+                "status": QUEUED,
+                "idempotency_key": idempotency_key,
+                "fingerprint": fingerprint,
+                "created_at": datetime.utcnow().isoformat(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+            self._jobs[job_id] = job
+            if idempotency_key:
+                self._idempotency[(kind, idempotency_key)] = job_id
+
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return self._snapshot(job), True
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Wait until the job finishes (or timeout) and return its latest snapshot."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in FINISHED_STATES:
+                return self._snapshot(job) if job else None
+            self._waiters.setdefault(job_id, []).append((loop, future))
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.get(job_id)
+
+    def _run(self, job_id: str, func: Callable[..., Dict], args: tuple, kwargs: dict) -> None:
+        self._update(job_id, status=RUNNING, started_at=datetime.utcnow().isoformat())
+        try:
+            result = func(*args, **kwargs)
+            self._update(job_id, status=SUCCEEDED, result=result)
+        except Exception as e:
+            print(f"[Jobs] {job_id} failed: {e}")
+            self._update(job_id, status=FAILED, error=str(e))
+
+    def _update(self, job_id: str, **fields) -> None:
+        waiters = []
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            if job["status"] in FINISHED_STATES:
+                job["finished_at"] = datetime.utcnow().isoformat()
+                self._finished_at[job_id] = time.time()
+                waiters = self._waiters.pop(job_id, [])
+
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(lambda f=future: f.done() or f.set_result(None))
+
+    @staticmethod
+    def _snapshot(job: Dict) -> Dict:
+        return {key: value for key, value in job.items() if key != "fingerprint"}
+
+    def _prune_locked(self) -> None:
+        cutoff = time.time() - self._retention_seconds
+        expired = [job_id for job_id, finished in self._finished_at.items() if finished < cutoff]
+        for job_id in expired:
+            job = self._jobs.pop(job_id, None)
+            self._finished_at.pop(job_id, None)
+            if job and job.get("idempotency_key"):
+                key = (job["kind"], job["idempotency_key"])
+                if self._idempotency.get(key) == job_id:
+                    del self._idempotency[key]
+
+
+job_manager = JobManager()
@@ -1,14 +1,18 @@
+import asyncio
+import contextlib
 import http
 import json
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, UploadFile, Form, Header, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
 from pydantic import BaseModel
-from gemini import Jsonify, gemini, geminiImage
-from event import EventbriteClient
-from Databases.event_service import bulk_add_scraped_events, get_event_by_name, add_user_to_event_rsvp, get_all_events
+from gemini import Jsonify, ageminiImage, ageminiImages, astream_gemini, astream_task_lines, gemini, gemini_metrics, parse_json_response
+from event import EventbriteClient, aclose_http_clients, page_cache
+from Databases.event_service import bulk_add_scraped_events, iter_add_scraped_events, get_event_by_name, add_user_to_event_rsvp, get_all_events, get_event_store, get_known_event_urls
 from Databases.user_service import (
     remove_task_from_user,
+    remove_tasks_from_user,
     check_username_availability,
     get_user_by_username_scan,
     add_tasks_to_user,
@@ -19,7 +23,20 @@ from Databases.user_service import (
     list_all_users,
     list_users_by_interest,
 )
-from matchmaking import get_recommended_events_for_user
+from image_processing import ImageProcessingError, apreprocess_image, run_in_image_pool
+from image_screening import screen_image
+from jobs import FINISHED_STATES, IdempotencyConflict, job_manager
+from task_templates import ADMIN_TASKS_MODE, describe_status, get_task_library
+from uploads import MAX_UPLOAD_BYTES, UploadLimitMiddleware, UploadTooLargeError, inspect_upload
+from verification_cache import verification_cache
+from matchmaking import (
+    PROFILE_MODES,
+    SCORING_BACKENDS,
+    get_pushed_recommendations,
+    get_recommended_events_hedged,
+    percolate_event,
+    remove_standing_query,
+)
 import os
 import jwt
 import bcrypt
@@ -30,6 +47,34 @@ JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
 
+# Stored without the '- ' line marker, like generated tasks
+DEFAULT_EVENT_TASKS = [
+    "Write a brief reflection about what you learned at this event",
+    "Connect with at least 2 new people and exchange contact information",
+    "Share one key takeaway from the event on social media"
+]
+
+# Batched task generation packs events into one prompt up to this many
+# characters (~4 chars per token) or events, whichever comes first.
+EVENT_TASK_BATCH_CHAR_BUDGET = int(os.getenv("EVENT_TASK_BATCH_CHAR_BUDGET", "12000"))
+EVENT_TASK_BATCH_MAX_EVENTS = int(os.getenv("EVENT_TASK_BATCH_MAX_EVENTS", "20"))
+
+# Seconds between keep-alive comments on job event streams
+JOB_SSE_KEEPALIVE_SECONDS = float(os.getenv("JOB_SSE_KEEPALIVE_SECONDS", "15"))
+
+# Batch verification: images accepted per request and packed per Gemini call
+VERIFICATION_BATCH_MAX_ITEMS = int(os.getenv("VERIFICATION_BATCH_MAX_ITEMS", "20"))
+VERIFICATION_BATCH_IMAGES_PER_CALL = int(os.getenv("VERIFICATION_BATCH_IMAGES_PER_CALL", "6"))
+# Whole batch request body; each image is still held to MAX_UPLOAD_BYTES
+VERIFICATION_BATCH_MAX_BYTES = int(os.getenv("VERIFICATION_BATCH_MAX_BYTES", str(50 * 1024 * 1024)))
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
 def generate_event_tasks(event_name: str, event_description: str, event_venue: str) -> list:
     """Generate 3 tasks for an event using Gemini AI"""
     prompt = f"""Generate exactly 3 specific tasks for someone attending this event:
@@ -46,16 +91,91 @@ def generate_event_tasks(event_name: str, event_description: str, event_venue: s
     
     Return exactly 3 tasks, each starting with a '-' on a new line. Be specific to this event type. Keep tasks concise and actionable."""
     
-    response = gemini(prompt)
-    tasks = Jsonify(response)
-    return tasks if tasks and len(tasks) > 0 else [
-        "- Write a brief reflection about what you learned at this event",
-        "- Connect with at least 2 new people and exchange contact information",
-        "- Share one key takeaway from the event on social media"
-    ]
+    response = gemini(prompt, call_site="event_tasks")
+    tasks = json.loads(Jsonify(response) or "[]") if response else []
+    return tasks if tasks else list(DEFAULT_EVENT_TASKS)
+
+def _event_task_block(batch_id: str, event: dict) -> str:
+    venue = event.get("venue")
+    venue_name = venue.get("name", "") if isinstance(venue, dict) else ""
+    description = event.get("description", "")
+    return f"""[{batch_id}]
+    Event Name: {event.get("name", "")}
+    Description: {description[:200] if description else 'N/A'}
+    Venue: {venue_name if venue_name else 'N/A'}
+"""
+
+def _validate_event_tasks(tasks) -> list | None:
+    """Exactly 3 non-empty task strings, or None"""
+    if not isinstance(tasks, list):
+        return None
+    cleaned = [str(task).strip().lstrip("-").strip() for task in tasks if str(task).strip().lstrip("-").strip()]
+    return cleaned[:3] if len(cleaned) >= 3 else None
+
+def generate_event_tasks_batch(events: list) -> list:
+    """
+    Generate 3 tasks per event, packing as many events per Gemini call as the
+    character budget allows. Events whose result is missing or malformed get
+    the default tasks.
+
+    Returns:
+        List of task lists aligned with `events`
+    """
+    results = [None] * len(events)
+    batches = []
+    current, size = [], 0
+    for index, event in enumerate(events):
+        block = _event_task_block(f"e{index}", event)
+        if current and (size + len(block) > EVENT_TASK_BATCH_CHAR_BUDGET or len(current) >= EVENT_TASK_BATCH_MAX_EVENTS):
+            batches.append(current)
+            current, size = [], 0
+        current.append((index, block))
+        size += len(block)
+    if current:
+        batches.append(current)
+
+    for batch in batches:
+        prompt = f"""Generate exactly 3 specific tasks for someone attending each of the events below.
+    Tasks should help the attendee get the most value from the event, such as:
+    - Write a reflection or review about the event
+    - Network with a specific number of people
+    - Take photos or document key moments
+    - Share learnings on social media
+    - Collect business cards or contacts
+    Be specific to each event type. Keep tasks concise and actionable.
+
+    Return ONLY JSON (no markdown, no commentary) mapping every event id in brackets to a list of exactly 3 task strings:
+    {{"e0": ["task", "task", "task"]}}
+
+    EVENTS
+{"".join(block for _, block in batch)}"""
+
+        parsed = parse_json_response(gemini(prompt, call_site="event_tasks_batch"))
+        if not isinstance(parsed, dict):
+            parsed = {}
+        for index, _ in batch:
+            results[index] = _validate_event_tasks(parsed.get(f"e{index}"))
+
+    return [tasks if tasks else list(DEFAULT_EVENT_TASKS) for tasks in results]
 
 app = FastAPI()
 
+# Upload endpoints and the most bytes each accepts
+UPLOAD_LIMITS = {
+    "/api/checkTaskCompletion": MAX_UPLOAD_BYTES,
+    "/api/checkTaskCompletionBatch": VERIFICATION_BATCH_MAX_BYTES,
+}
+
+
+# Registered before CORS so 413 responses still get CORS headers
+app.add_middleware(UploadLimitMiddleware, limits=UPLOAD_LIMITS)
+
+
+@app.on_event("shutdown")
+async def close_scraper_clients():
+    await aclose_http_clients()
+
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -106,6 +226,17 @@ def health_check():
     return {"status": "OK"}
 
 
+@app.get("/api/metrics")
+def metrics():
+    """Gemini gateway metrics (response cache hits/misses per call site), verification and scrape cache stats"""
+    return {
+        "success": True,
+        "gemini": gemini_metrics(),
+        "verification_cache": verification_cache.snapshot(),
+        "scrape_cache": page_cache.snapshot() if page_cache else None,
+    }
+
+
 @app.post("/api/login")
 async def login(request: LoginRequest):
     """
@@ -371,6 +502,8 @@ async def api_update_user_profile(payload: dict):
         if not result.get("success"):
             return JSONResponse(status_code=400, content=result)
 
+        # The standing query was built from the old profile
+        remove_standing_query({"username": username})
         return {"success": True, "user": result.get("user")}
     except Exception as e:
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
@@ -505,7 +638,14 @@ async def get_event_by_name_endpoint(event_name: str):
 
 
 @app.get("/api/getRecommendedEvents")
-async def get_recommended_events(username: str, min_score: float = 50.0, top_n: int = 10):
+async def get_recommended_events(
+    username: str,
+    min_score: float = 50.0,
+    top_n: int = 10,
+    profile_mode: str = None,
+    latency_budget_ms: float = None,
+    scoring_backend: str = None,
+):
     """
     Get AI-powered recommended events for a user based on their profile
     Uses intelligent matchmaking to score events by interests, status, occupation, age, location
@@ -514,6 +654,11 @@ async def get_recommended_events(username: str, min_score: float = 50.0, top_n:
         - username (str): Username
         - min_score (float): Minimum match score (0-100, default: 50.0)
         - top_n (int): Maximum number of events to return (default: 10)
+        - profile_mode (str): "user" or "cohort" keyword profiles (default: MATCHMAKING_PROFILE_MODE)
+        - latency_budget_ms (float): Max time to wait for the Gemini profile before answering
+          from the local fallback profile (default: RECOMMENDATION_LATENCY_BUDGET_MS)
+        - scoring_backend (str): "keywords", "semantic" (local TF-IDF, no Gemini) or "blend"
+          (default: MATCHMAKING_SCORING_BACKEND)
     
     Example: GET /api/getRecommendedEvents?username=alaik&min_score=60&top_n=5
     
@@ -534,10 +679,22 @@ async def get_recommended_events(username: str, min_score: float = 50.0, top_n:
                     "relevance_factors": [str]
                 }
             ],
-            "total_events": int
+            "total_events": int,
+            "profile_source": "cache" | "gemini" | "fallback"
         }
     """
     try:
+        if scoring_backend and scoring_backend.lower() not in SCORING_BACKENDS:
+            return JSONResponse(
+                status_code=400,
+                content={"success": False, "error": f"scoring_backend must be one of {', '.join(SCORING_BACKENDS)}"}
+            )
+        if profile_mode and profile_mode.strip().lower() not in PROFILE_MODES:
+            return JSONResponse(
+                status_code=400,
+                content={"success": False, "error": f"profile_mode must be one of {', '.join(PROFILE_MODES)}"}
+            )
+
         user = get_user_by_username_scan(username)
         
         if not user:
@@ -546,31 +703,28 @@ async def get_recommended_events(username: str, min_score: float = 50.0, top_n:
                 content={"success": False, "error": "User not found"}
             )
         
-        # Get user's events they're attending
-        events_attending = user.get("events_attending", [])
-        
-        # Get all events from database
-        all_events = get_all_events()
-        
-        # Filter out events user has already RSVP'd to
-        available_events = [
-            event for event in all_events 
-            if event.get("name") not in events_attending
-        ]
-        
-        # Get recommended events with AI matching
-        recommended_events = get_recommended_events_for_user(
+        # Get recommended events with AI matching; candidates come from the
+        # in-memory event index and skip events the user already RSVP'd to.
+        # Runs off the event loop since it may wait on Gemini up to the budget;
+        # so does loading the store, which scans the Events table when stale.
+        event_store = await run_in_threadpool(get_event_store)
+        recommended_events, profile_source = await run_in_threadpool(
+            get_recommended_events_hedged,
             user_profile=user,
-            all_events=available_events,
             min_score=min_score,
-            top_n=top_n
+            top_n=top_n,
+            event_store=event_store,
+            profile_mode=profile_mode,
+            latency_budget_ms=latency_budget_ms,
+            scoring_backend=scoring_backend
         )
         
         return {
             "success": True,
             "username": username,
             "events": recommended_events,
-            "total_events": len(recommended_events)
+            "total_events": len(recommended_events),
+            "profile_source": profile_source
         }
     
     except Exception as e:
@@ -584,11 +738,56 @@ async def get_recommended_events(username: str, min_score: float = 50.0, top_n:
         )
 
 
+@app.get("/api/getNewMatches")
+async def get_new_matches(username: str, clear: bool = True):
+    """
+    Get events pushed to a user since new events were ingested
+    
+    Events added by /api/getNewEvents are matched against every user's stored
+    keyword profile at ingest time; matches land here without rescoring the catalog.
+    A user's profile is stored the first time they load recommendations.
+    
+    Query Parameters:
+        - username (str): Username
+        - clear (bool): Drop the returned matches from the list (default: true)
+    
+    Example: GET /api/getNewMatches?username=alaik
+    
+    Returns:
+        {
+            "success": bool,
+            "username": str,
+            "events": [...],
+            "total_events": int
+        }
+    """
+    try:
+        events = get_pushed_recommendations({"username": username}, clear=clear)
+        return {
+            "success": True,
+            "username": username,
+            "events": events,
+            "total_events": len(events)
+        }
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": "Failed to get new matches",
+                "details": str(e)
+            }
+        )
+
+
 @app.get("/api/getNewEvents")
 async def get_events(location: str = "Calgary", radius: str = "25km", max_results: int = 50):
     """
     Scrape events from Eventbrite and save to DynamoDB (prevents duplicates)
     
+    Events already in the database are recognised by URL while scraping and
+    left out without fetching their pages; they are reported as "known".
+    
     Query Parameters:
         - location (str): City name (default: "Calgary")
         - radius (str): Search radius (default: "25km")
@@ -602,6 +801,7 @@ async def get_events(location: str = "Calgary", radius: str = "25km", max_result
             "location": str,
             "count": int,
             "scraped": int,
+            "known": int,
             "added": int,
             "skipped": int,
             "errors": int,
@@ -609,8 +809,9 @@ async def get_events(location: str = "Calgary", radius: str = "25km", max_result
         }
     """
     try:
-        client = EventbriteClient()
-        events = client.get_events_next_month(
+        known_urls = await run_in_threadpool(get_known_event_urls)
+        client = EventbriteClient(known_urls=known_urls)
+        events = await client.aget_events_next_month(
             location=location,
             radius=radius,
             max_results=max_results
@@ -619,20 +820,28 @@ async def get_events(location: str = "Calgary", radius: str = "25km", max_result
         if not events:
             return {
                 "success": True,
-                "message": "No events found",
+                "message": "No new events found",
                 "scraped": 0,
+                "known": client.scrape_stats["known"],
                 "added": 0,
                 "skipped": 0,
                 "events": []
             }
         
-        result = bulk_add_scraped_events(events, generate_event_tasks)
+        result = await run_in_threadpool(
+            bulk_add_scraped_events,
+            events,
+            generate_event_tasks,
+            on_event_added=percolate_event,
+            generate_tasks_batch_func=generate_event_tasks_batch
+        )
         
         return {
             "success": True,
             "location": location,
             "count": len(events),
             "scraped": len(events),
+            "known": client.scrape_stats["known"],
             "added": result["added"],
             "skipped": result["skipped"],
             "errors": result["errors"],
@@ -649,6 +858,168 @@ async def get_events(location: str = "Calgary", radius: str = "25km", max_result
             }
         )
 
+@app.get("/api/getNewEvents/stream")
+async def stream_new_events(location: str = "Calgary", radius: str = "25km", max_results: int = 50):
+    """
+    Streaming /api/getNewEvents over Server-Sent Events
+    
+    Events are scraped page by page with the same pooled, concurrent fetcher
+    as /api/getNewEvents, and each one is emitted as soon as it is
+    deduplicated and stored, so only one task-generation batch is held in
+    memory at a time.
+    
+    Query Parameters:
+        - location (str): City name (default: "Calgary")
+        - radius (str): Search radius (default: "25km")
+        - max_results (int): Maximum events to scrape (default: 50)
+    
+    Example: GET /api/getNewEvents/stream?location=Toronto&max_results=100
+    
+    Stream:
+        event: event     data: {"status": "added" | "skipped" | "error", "name": str, "event": {...} | null, "error": str | null}
+        event: complete  data: {"success": bool, "location": str, "scraped": int, "known": int, "added": int, "skipped": int, "errors": int}
+    """
+    async def stream():
+        counts = {"added": 0, "skipped": 0, "error": 0}
+        try:
+            client = EventbriteClient(known_urls=await run_in_threadpool(get_known_event_urls))
+            scraped = client.aiter_events_next_month(
+                location=location,
+                radius=radius,
+                max_results=max_results
+            )
+            async with contextlib.aclosing(scraped):
+                async for batch in _abatched(scraped, EVENT_TASK_BATCH_MAX_EVENTS):
+                    # Deduplication, task generation and DynamoDB writes block,
+                    # so each batch is stored on the threadpool
+                    outcomes = iter_add_scraped_events(
+                        batch,
+                        generate_event_tasks,
+                        on_event_added=percolate_event,
+                        generate_tasks_batch_func=generate_event_tasks_batch
+                    )
+                    async for outcome in iterate_in_threadpool(outcomes):
+                        counts[outcome["status"]] += 1
+                        yield _sse("event", outcome)
+        except Exception as e:
+            yield _sse("error", {"success": False, "error": "Failed to fetch events", "details": str(e)})
+            return
+
+        yield _sse("complete", {
+            "success": True,
+            "location": location,
+            "scraped": sum(counts.values()),
+            "known": client.scrape_stats["known"],
+            "added": counts["added"],
+            "skipped": counts["skipped"],
+            "errors": counts["error"]
+        })
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def _abatched(items, size: int):
+    """Group an async iterable into lists of up to `size` items."""
+    batch = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _admin_tasks_prompt(user: dict) -> str:
+    """Prompt for 10 settling-in tasks, one '- ' line each (the Jsonify format)."""
+    dob = user.get("dob", "Unknown")
+    status = describe_status(user.get("status", "settler"))
+    interests = user.get("interests", [])
+    location = user.get("location", "Calgary")
+    language = user.get("language", ["English"])
+    occupation = user.get("occupation", "Professional")
+
+    prompt = f"""Generate 10 settling-in tasks for a new {status} moving into {location}. Tasks may include but not limited to opening a bank account, 
+        finding housing, obtaining a SIN/provincial ID/health coverage, and exploring important locations in the city.
+        Personalize the tasks based on:
+        interests: {', '.join(interests) if interests else 'general'}
+        languages: {', '.join(language) if language else 'English'}
+        age: {dob}
+        occupation: {occupation}
+        Return a list of 10 tasks, each starting with a '-' on a new line, with no extra text. use UTF-8 encoding."""
+    return prompt
+
+
+def _admin_task_list(user: dict) -> list:
+    """
+    Settling-in tasks for a user.
+
+    In cohort mode (ADMIN_TASKS_MODE) the generic core comes from the shared
+    template library and only interest tasks may need Gemini; otherwise, or if
+    the library has no core, all 10 tasks come from one per-user prompt.
+    """
+    if ADMIN_TASKS_MODE == "cohort":
+        tasks = get_task_library().build_tasks(user)
+        if tasks:
+            return tasks
+    response = gemini(_admin_tasks_prompt(user), call_site="admin_tasks")
+    return json.loads(Jsonify(response) or "[]")
+
+
+def _generate_admin_tasks(username: str):
+    """
+    Generate settling-in tasks for a user and save them to their task list.
+
+    Shared by the synchronous endpoint and the background job.
+
+    Returns:
+        (status_code, response body)
+    """
+    user = get_user_by_username_scan(username)
+
+    if not user:
+        return 404, {"success": False, "error": "User not found"}
+
+    tasks_list = _admin_task_list(user)
+
+    if not tasks_list:
+        return 500, {"success": False, "error": str(http.HTTPStatus.INTERNAL_SERVER_ERROR)}
+
+    task_add_result = add_tasks_to_user(username, tasks_list)
+    return 200, {
+        "success": True,
+        "response": tasks_list,
+        "tasks_added": task_add_result.get("tasks_added", 0),
+        "total_tasks": task_add_result.get("total_tasks", 0),
+        "message": task_add_result.get("message", "")
+    }
+
+
+def _run_admin_tasks_job(username: str):
+    """Job body for GenerateAdminTasks; failures mark the job as failed."""
+    status_code, body = _generate_admin_tasks(username)
+    if status_code != 200:
+        raise RuntimeError(body.get("error", "Task generation failed"))
+    return body
+
+
+def _job_response(job: dict):
+    """Public view of a job (status plus result once finished)."""
+    return {
+        "success": True,
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "result": job["result"],
+        "error": job["error"],
+        "status_url": f"/api/jobs/{job['job_id']}",
+        "events_url": f"/api/jobs/{job['job_id']}/events",
+    }
+
+
 @app.post("/api/GenerateAdminTasks")
 async def GenerateAdminTasks(username: str = Form(...)):
     """
@@ -664,58 +1035,181 @@ async def GenerateAdminTasks(username: str = Form(...)):
         }
     """
     try:
-        user = get_user_by_username_scan(username)
-        
+        status_code, body = await run_in_threadpool(_generate_admin_tasks, username)
+        if status_code != 200:
+            return JSONResponse(status_code=status_code, content=body)
+        return body
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": str(e)}
+        )
+
+
+@app.post("/api/GenerateAdminTasks/async")
+async def GenerateAdminTasksAsync(
+    username: str = Form(...),
+    idempotency_key: str = Header(None, alias="Idempotency-Key"),
+):
+    """
+    Queue settling-in task generation as a background job
+    
+    Form Data:
+        - username (str): Username to generate tasks for
+    
+    Headers:
+        - Idempotency-Key (str, optional): Retries with the same key return the
+          original job; reusing it for another username returns 422. Defaults to
+          one active job per username.
+    
+    Returns (202):
+        {
+            "success": bool,
+            "job_id": str,
+            "status": "queued" | "running" | "succeeded" | "failed",
+            "status_url": str,
+            "events_url": str
+        }
+    """
+    try:
+        user = await run_in_threadpool(get_user_by_username_scan, username)
         if not user:
             return JSONResponse(
                 status_code=404,
                 content={"success": False, "error": "User not found"}
             )
-        
-        dob = user.get("dob", "Unknown")
-        status = user.get("status", "settler")
-        if status == "S":
-            status = "International Stududent with a study permit coming to study"
-        elif status == "R":
-            status = "International refugee person who would need job"
-        elif status == "W":
-            status = "International Person with work permit"
-        interests = user.get("interests", [])
-        location = user.get("location", "Calgary")
-        language = user.get("language", ["English"])
-        occupation = user.get("occupation", "Professional")
-
-        prompt = f"""Generate 10 settling-in tasks for a new {status} moving into {location}. Tasks may include but not limited to opening a bank account, 
-            finding housing, obtaining a SIN/provincial ID/health coverage, and exploring important locations in the city.
-            Personalize the tasks based on:
-            interests: {', '.join(interests) if interests else 'general'}
-            languages: {', '.join(language) if language else 'English'}
-            age: {dob}
-            occupation: {occupation}
-            Return a list of 10 tasks, each starting with a '-' on a new line, with no extra text. use UTF-8 encoding."""
-        response = gemini(prompt)
-        tasks_list = Jsonify(response)
-
-        if tasks_list:
-            task_add_result = add_tasks_to_user(username, tasks_list)
-            
-            return {
+
+        job, created = job_manager.submit(
+            "admin_tasks",
+            _run_admin_tasks_job,
+            username,
+            idempotency_key=idempotency_key or f"user:{username}",
+            reuse_succeeded=bool(idempotency_key),
+        )
+        body = _job_response(job)
+        body["reused"] = not created
+        return JSONResponse(status_code=202, content=body)
+    except IdempotencyConflict as e:
+        return JSONResponse(
+            status_code=422,
+            content={"success": False, "error": str(e)}
+        )
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": str(e)}
+        )
+
+
+@app.post("/api/GenerateAdminTasks/stream")
+async def GenerateAdminTasksStream(username: str = Form(...)):
+    """
+    Streaming /api/GenerateAdminTasks over Server-Sent Events
+    
+    Each task is emitted as soon as Gemini finishes its line; the tasks are
+    saved to the user once the response is complete.
+    
+    Form Data:
+        - username (str): Username to generate tasks for
+    
+    Stream:
+        event: task      data: {"index": int, "task": str}
+        event: complete  data: {"success": true, "response": [...], "tasks_added": int, "total_tasks": int, "message": str}
+        event: error     data: {"success": false, "error": str}
+    """
+    user = await run_in_threadpool(get_user_by_username_scan, username)
+    if not user:
+        return JSONResponse(
+            status_code=404,
+            content={"success": False, "error": "User not found"}
+        )
+
+    async def stream():
+        tasks = []
+        try:
+            if ADMIN_TASKS_MODE == "cohort":
+                # Cached cores return instantly, so there is nothing to stream
+                tasks = await run_in_threadpool(get_task_library().build_tasks, user)
+                for index, task in enumerate(tasks):
+                    yield _sse("task", {"index": index, "task": task})
+
+            if not tasks:
+                chunks = astream_gemini(_admin_tasks_prompt(user), call_site="admin_tasks")
+                async for task in astream_task_lines(chunks):
+                    yield _sse("task", {"index": len(tasks), "task": task})
+                    tasks.append(task)
+
+            if not tasks:
+                yield _sse("error", {"success": False, "error": str(http.HTTPStatus.INTERNAL_SERVER_ERROR)})
+                return
+
+            task_add_result = await run_in_threadpool(add_tasks_to_user, username, tasks)
+            yield _sse("complete", {
                 "success": True,
-                "response": tasks_list,
+                "response": tasks,
                 "tasks_added": task_add_result.get("tasks_added", 0),
                 "total_tasks": task_add_result.get("total_tasks", 0),
                 "message": task_add_result.get("message", "")
-            }
-        else:
-            return JSONResponse(
-                status_code=500,
-                content={"success": False, "error": str(http.HTTPStatus.INTERNAL_SERVER_ERROR)}
-            )
-    except Exception as e:
+            })
+        except Exception as e:
+            yield _sse("error", {"success": False, "error": str(e)})
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Poll the status of a background job
+    
+    Returns:
+        {
+            "success": bool,
+            "job_id": str,
+            "status": str,
+            "result": {...} | null,
+            "error": str | null
+        }
+    """
+    job = job_manager.get(job_id)
+    if not job:
         return JSONResponse(
-            status_code=500,
-            content={"success": False, "error": str(e)}
+            status_code=404,
+            content={"success": False, "error": "Job not found"}
         )
+    return _job_response(job)
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def get_job_events(job_id: str):
+    """
+    Server-Sent Events stream for a background job
+    
+    Sends a "status" event straight away, keep-alive comments while the job
+    runs, and a final "complete" event carrying the job result.
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        return JSONResponse(
+            status_code=404,
+            content={"success": False, "error": "Job not found"}
+        )
+
+    async def stream():
+        current = job
+        yield _sse("status", _job_response(current))
+        while current and current["status"] not in FINISHED_STATES:
+            current = await job_manager.wait(job_id, timeout=JOB_SSE_KEEPALIVE_SECONDS)
+            if current and current["status"] not in FINISHED_STATES:
+                yield ": keep-alive\n\n"
+        if current:
+            yield _sse("complete", _job_response(current))
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
 
 
 @app.post("/api/rsvpEvent")
@@ -782,6 +1276,24 @@ async def rsvp_event(username: str = Form(...), event_name: str = Form(...)):
         )
 
 
+def _verification_prompt(task_description: str) -> str:
+    return (
+        "Analyze the following image and tell me yes if the image completes the task: "
+        f"{task_description} or else no. dont go to deep into logistics if it feels "
+        "like they have completed the task that means they have"
+    )
+
+
+def _read_verdict(response: str):
+    """True for a yes, False for a no, None if the answer is neither."""
+    normalized = response.lower()
+    if "yes" in normalized:
+        return True
+    if "no" in normalized:
+        return False
+    return None
+
+
 @app.post("/api/checkTaskCompletion")
 async def check_task_completion(
     username: str = Form(...),
@@ -811,45 +1323,92 @@ async def check_task_completion(
         print(f"[API] Task: {task_description}")
         print(f"[API] Image: {image.filename}")
         
-        image_bytes = await image.read()
-        if not image_bytes:
+        try:
+            upload = await inspect_upload(image)
+        except UploadTooLargeError as e:
+            return JSONResponse(
+                status_code=413,
+                content={"success": False, "error": str(e)}
+            )
+        if not upload["size"]:
             return JSONResponse(
                 status_code=400,
                 content={"success": False, "error": "Uploaded image is empty"}
             )
 
-        prompt = (
-            "Analyze the following image and tell me yes if the image completes the task: "
-            f"{task_description} or else no. dont go to deep into logistics if it feels "
-            "like they have completed the task that means they have"
+        try:
+            prepared = await apreprocess_image(upload["file"])
+        except ImageProcessingError as e:
+            return JSONResponse(
+                status_code=400,
+                content={"success": False, "error": str(e)}
+            )
+        print(
+            f"[API] Image preprocessed: {prepared['original_format']} {prepared['original_bytes']} bytes "
+            f"-> {prepared['mime_type']} {prepared['width']}x{prepared['height']} {len(prepared['data'])} bytes"
         )
 
-        response = geminiImage(prompt, image_bytes)
+        screen = await run_in_image_pool(
+            screen_image, prepared["data"], prepared["original_size"], task_description
+        )
+        if not screen["passed"]:
+            print(f"[API] Image rejected by local pre-screen: {screen['reason']} {screen['metrics']}")
+            return {
+                "success": True,
+                "task_completed": False,
+                "task_removed": False,
+                "response": screen["message"],
+                "image_filename": image.filename,
+                "verification_source": "screen",
+                "screen": screen
+            }
 
-        print(f"[API] Gemini response: {response}")
+        phash = prepared["dhash"]
+        # Details of earlier submissions stay in the server log; clients only see the flag
+        reuse = verification_cache.find_reuse(task_description, username, phash)
+        if reuse:
+            print(f"[API] Image reused from {len(reuse)} earlier submission(s) for other tasks/users: {reuse}")
 
-        if response is None:
-            return JSONResponse(
-                status_code=503,
-                content={
-                    "success": False,
-                    "error": "Image verification service is temporarily unavailable. Please try again in a moment.",
-                },
+        cached = verification_cache.lookup(task_description, username, phash)
+        if cached:
+            print(f"[API] Verification answered from cache (hash distance {cached['distance']})")
+            response = cached["response"]
+            completed = cached["completed"]
+            verification_source = "cache"
+            verification_cache.record(task_description, username, phash)
+        else:
+            response = await ageminiImage(
+                _verification_prompt(task_description), prepared["data"],
+                mime_type=prepared["mime_type"], call_site="task_verification"
             )
+            verification_source = "gemini"
 
-        if not isinstance(response, str):
-            return JSONResponse(
-                status_code=502,
-                content={
-                    "success": False,
-                    "error": "Image analysis service returned an unexpected response",
-                    "response": response,
-                },
-            )
+            print(f"[API] Gemini response: {response}")
 
-        response_normalized = response.lower()
+            if response is None:
+                return JSONResponse(
+                    status_code=503,
+                    content={
+                        "success": False,
+                        "error": "Image verification service is temporarily unavailable. Please try again in a moment.",
+                    },
+                )
 
-        if "yes" in response_normalized:
+            if not isinstance(response, str):
+                return JSONResponse(
+                    status_code=502,
+                    content={
+                        "success": False,
+                        "error": "Image analysis service returned an unexpected response",
+                        "response": response,
+                    },
+                )
+
+            completed = _read_verdict(response)
+            # Unclear answers (None) are recorded for reuse tracking but never served from cache
+            verification_cache.record(task_description, username, phash, completed=completed, response=response)
+
+        if completed:
             print(f"[API] Task completed! Removing from user's tasks...")
             removal_result = remove_task_from_user(username, task_description)
             print(f"[API] Removal result: {removal_result}")
@@ -860,15 +1419,19 @@ async def check_task_completion(
                 "task_removed": removal_result.get("success", False),
                 "response": response,
                 "image_filename": image.filename,
-                "removal_details": removal_result
+                "removal_details": removal_result,
+                "verification_source": verification_source,
+                "image_reused": bool(reuse)
             }
-        elif "no" in response_normalized:
+        elif completed is False:
             return {
                 "success": True,
                 "task_completed": False,
                 "task_removed": False,
                 "response": response,
-                "image_filename": image.filename
+                "image_filename": image.filename,
+                "verification_source": verification_source,
+                "image_reused": bool(reuse)
             }
         else:
             return JSONResponse(
@@ -881,4 +1444,221 @@ async def check_task_completion(
         return JSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
-        )
\ No newline at end of file
+        )
+
+
+def _batch_verification_prompt(task_descriptions: list) -> str:
+    numbered = "\n".join(f"{i}. {task}" for i, task in enumerate(task_descriptions, start=1))
+    return (
+        f"You will see {len(task_descriptions)} images, in order. Image i is a photo submitted for task i:\n"
+        f"{numbered}\n"
+        "For each image, answer yes if it completes its own task or else no. dont go to deep into logistics "
+        "if it feels like they have completed the task that means they have.\n"
+        "Return only a JSON array with one object per image, like "
+        '[{"index": 1, "completed": true, "reason": "short reason"}], with no extra text.'
+    )
+
+
+async def _verify_image_group(items: list) -> None:
+    """
+    Verify pending batch items with one multimodal request, filling each item's
+    "completed" and "response". Items a parsed answer leaves out are verified
+    singly, concurrently like the group calls; if the whole request fails or
+    its answer is not a JSON list, the items keep no response, so they are
+    reported as errors instead of costing one more request each.
+    """
+    response = await ageminiImages(
+        _batch_verification_prompt([item["task_description"] for item in items]),
+        [(item["prepared"]["data"], item["prepared"]["mime_type"]) for item in items],
+        call_site="task_verification_batch",
+    )
+    parsed = parse_json_response(response)
+    if not isinstance(parsed, list):
+        print(f"[API] Batch verification of {len(items)} image(s) failed: {response!r}")
+        return
+
+    verdicts = {}
+    for entry in parsed:
+        if isinstance(entry, dict) and isinstance(entry.get("completed"), bool):
+            try:
+                verdicts[int(entry.get("index"))] = entry
+            except (TypeError, ValueError):
+                continue
+
+    missing = []
+    for position, item in enumerate(items, start=1):
+        verdict = verdicts.get(position)
+        if verdict is None:
+            missing.append(item)
+            continue
+        reason = str(verdict.get("reason", "")).strip()
+        item["completed"] = verdict["completed"]
+        item["response"] = f"{'Yes' if verdict['completed'] else 'No'}. {reason}".strip()
+
+    async def verify_single(item):
+        single = await ageminiImage(
+            _verification_prompt(item["task_description"]), item["prepared"]["data"],
+            mime_type=item["prepared"]["mime_type"], call_site="task_verification"
+        )
+        item["response"] = single
+        item["completed"] = _read_verdict(single) if isinstance(single, str) else None
+
+    # The rate governor still orders and paces these calls
+    await asyncio.gather(*(verify_single(item) for item in missing))
+
+
+@app.post("/api/checkTaskCompletionBatch")
+async def check_task_completion_batch(
+    username: str = Form(...),
+    task_descriptions: list[str] = Form(...),
+    images: list[UploadFile] = File(...)
+):
+    """
+    Verify several tasks at once, one image per task
+    
+    Images are preprocessed in parallel, checked against the local pre-screen
+    and verification cache, and the rest are sent to Gemini packed several per
+    request. All completed tasks are removed from the user in one write.
+    
+    Form Data:
+        - username (str): Username
+        - task_descriptions (str, repeated): Task for each image, in the same order
+        - images (file, repeated): Images to analyze
+    
+    Returns:
+        {
+            "success": bool,
+            "results": [
+                {
+                    "index": int,
+                    "task_description": str,
+                    "image_filename": str,
+                    "task_completed": bool | null,
+                    "task_removed": bool,
+                    "response": str | null,
+                    "verification_source": "screen" | "cache" | "gemini" | null,
+                    "image_reused": bool,
+                    "error": str | null
+                }
+            ],
+            "tasks_completed": int,
+            "tasks_removed": int,
+            "removal_details": {...}
+        }
+    """
+    try:
+        if len(task_descriptions) != len(images):
+            return JSONResponse(
+                status_code=400,
+                content={"success": False, "error": "Send exactly one task_descriptions value per image"}
+            )
+        if len(images) > VERIFICATION_BATCH_MAX_ITEMS:
+            return JSONResponse(
+                status_code=400,
+                content={"success": False, "error": f"At most {VERIFICATION_BATCH_MAX_ITEMS} images per batch"}
+            )
+
+        items = [
+            {
+                "index": index,
+                "task_description": task,
+                "image_filename": upload.filename,
+                "completed": None,
+                "response": None,
+                "source": None,
+                "reuse": [],
+                "error": None,
+            }
+            for index, (task, upload) in enumerate(zip(task_descriptions, images))
+        ]
+
+        async def prepare(item, image):
+            try:
+                upload = await inspect_upload(image)
+            except UploadTooLargeError as e:
+                item["error"] = str(e)
+                return
+            if not upload["size"]:
+                item["error"] = "Uploaded image is empty"
+                return
+            try:
+                item["prepared"] = await apreprocess_image(upload["file"])
+            except ImageProcessingError as e:
+                item["error"] = str(e)
+                return
+            screen = await run_in_image_pool(
+                screen_image, item["prepared"]["data"], item["prepared"]["original_size"], item["task_description"]
+            )
+            if not screen["passed"]:
+                item.update(completed=False, response=screen["message"], source="screen")
+
+        await asyncio.gather(*(prepare(item, image) for item, image in zip(items, images)))
+
+        pending = []
+        for item in items:
+            if item["error"] or item["source"] == "screen":
+                continue
+            phash = item["prepared"]["dhash"]
+            item["reuse"] = verification_cache.find_reuse(item["task_description"], username, phash)
+            if item["reuse"]:
+                print(f"[API] Batch image {item['index']} reused from earlier submission(s): {item['reuse']}")
+            cached = verification_cache.lookup(item["task_description"], username, phash)
+            if cached:
+                item.update(completed=cached["completed"], response=cached["response"], source="cache")
+                verification_cache.record(item["task_description"], username, phash)
+            else:
+                item["source"] = "gemini"
+                pending.append(item)
+
+        groups = [
+            pending[start:start + VERIFICATION_BATCH_IMAGES_PER_CALL]
+            for start in range(0, len(pending), VERIFICATION_BATCH_IMAGES_PER_CALL)
+        ]
+        await asyncio.gather(*(_verify_image_group(group) for group in groups))
+
+        for item in pending:
+            if item["response"] is None:
+                item["error"] = "Image verification service is temporarily unavailable. Please try again in a moment."
+            verification_cache.record(
+                item["task_description"], username, item["prepared"]["dhash"],
+                completed=item["completed"], response=item["response"]
+            )
+
+        completed_tasks = [item["task_description"] for item in items if item["completed"]]
+        removal_result = {}
+        if completed_tasks:
+            removal_result = await run_in_threadpool(remove_tasks_from_user, username, completed_tasks)
+        removed = set(removal_result.get("removed", []))
+
+        print(
+            f"[API] Batch verification for {username}: {len(items)} images, {len(pending)} sent to Gemini "
+            f"in {len(groups)} request(s), {len(completed_tasks)} completed"
+        )
+
+        return {
+            "success": True,
+            "results": [
+                {
+                    "index": item["index"],
+                    "task_description": item["task_description"],
+                    "image_filename": item["image_filename"],
+                    "task_completed": item["completed"],
+                    "task_removed": item["task_description"] in removed,
+                    "response": item["response"],
+                    "verification_source": item["source"],
+                    "image_reused": bool(item["reuse"]),
+                    "error": item["error"],
+                }
+                for item in items
+            ],
+            "tasks_completed": len(completed_tasks),
+            "tasks_removed": len(removed),
+            "removal_details": removal_result
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": str(e)}
+        )
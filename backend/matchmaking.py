@@ -1,10 +1,18 @@
 """Event matchmaking tuned for a single Gemini round trip."""
 
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
+import hashlib
 import json
-from typing import Dict, Iterable, List, Tuple
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
-from gemini import gemini
+from Databases.event_store import NGRAM_SIZE, EventStore, event_corpus, listify, ngrams
+from gemini import gemini, parse_json_response
+from semantic import score_documents
 
 CORE_WEIGHT = 28
 SECONDARY_WEIGHT = 12
@@ -13,14 +21,41 @@ LANGUAGE_WEIGHT = 10
 NEWCOMER_WEIGHT = 10
 AVOID_PENALTY = 25
 RECENCY_BONUS = 5
-
-
-def _listify(value) -> List[str]:
-    if isinstance(value, list):
-        return [str(item).strip() for item in value if str(item).strip()]
-    if isinstance(value, str) and value.strip():
-        return [part.strip() for part in value.split(",") if part.strip()]
-    return []
+NEWCOMER_TERMS = ["newcomer", "settlement", "immigrant", "international", "welcome"]
+
+# Highest score an event can reach without any core/secondary keyword hit.
+# Above this threshold, keyword postings retrieve every event that can qualify.
+MAX_NON_KEYWORD_SCORE = LOCATION_WEIGHT + LANGUAGE_WEIGHT + NEWCOMER_WEIGHT + RECENCY_BONUS
+NEWCOMER_FALLBACK_LIMIT = 25
+
+# Profile mode: "user" prompts Gemini per user, "cohort" shares one Gemini
+# profile across users with the same status, location, interest bucket and
+# languages, then adjusts it locally per user.
+PROFILE_MODES = ("user", "cohort")
+PROFILE_MODE = os.getenv("MATCHMAKING_PROFILE_MODE", "user").strip().lower()
+COHORT_INTEREST_BUCKET_SIZE = 3
+# Shared cohort profiles expire like per-user ones, and the least recently
+# used cohorts are evicted beyond COHORT_CACHE_MAX_ENTRIES.
+COHORT_CACHE_TTL_SECONDS = float(os.getenv("COHORT_CACHE_TTL_SECONDS", "3600"))
+COHORT_CACHE_MAX_ENTRIES = int(os.getenv("COHORT_CACHE_MAX_ENTRIES", "512"))
+
+# Gemini keyword profiles are cached per user and profile fingerprint, and
+# the hedged recommender waits at most this long for one before answering
+# from the local fallback profile.
+PROFILE_CACHE_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "1800"))
+RECOMMENDATION_LATENCY_BUDGET_MS = float(os.getenv("RECOMMENDATION_LATENCY_BUDGET_MS", "1500"))
+
+# Scoring backends: "keywords" (weighted keyword tiers), "semantic" (local
+# hashed TF-IDF cosine similarity) or "blend" of both. The fallback backend
+# applies whenever the keyword profile is the local fallback, e.g. during
+# Gemini quota cooldowns.
+SCORING_BACKENDS = ("keywords", "semantic", "blend")
+SCORING_BACKEND = os.getenv("MATCHMAKING_SCORING_BACKEND", "keywords").strip().lower()
+FALLBACK_SCORING_BACKEND = os.getenv("MATCHMAKING_FALLBACK_BACKEND", "keywords").strip().lower()
+SEMANTIC_BLEND_WEIGHT = float(os.getenv("MATCHMAKING_SEMANTIC_WEIGHT", "0.4"))
+
+# Percolator settings: how many pushed matches each user keeps.
+PUSHED_RECOMMENDATIONS_LIMIT = 20
 
 
 def _normalize_keywords(keywords: Iterable[str]) -> List[str]:
@@ -34,17 +69,6 @@ def _normalize_keywords(keywords: Iterable[str]) -> List[str]:
     return normalized
 
 
-def _extract_json_block(text: str) -> str:
-    data = text.strip()
-    if data.startswith("```json"):
-        data = data[7:]
-    if data.startswith("```"):
-        data = data[3:]
-    if data.endswith("```"):
-        data = data[:-3]
-    return data.strip()
-
-
 def _status_keywords(status_code: str) -> List[str]:
     mapping = {
         "S": ["international student", "study permit"],
@@ -56,10 +80,10 @@ def _status_keywords(status_code: str) -> List[str]:
 
 
 def _build_fallback_profile(user_profile: Dict) -> Dict:
-    interests = _listify(user_profile.get("interests", []))
+    interests = listify(user_profile.get("interests", []))
     occupation = str(user_profile.get("occupation", "")).strip()
     status = str(user_profile.get("status", "")).strip().upper()
-    languages = _listify(user_profile.get("language") or user_profile.get("languages") or ["english"])
+    languages = listify(user_profile.get("language") or user_profile.get("languages") or ["english"])
     location = str(user_profile.get("location", "")).strip()
 
     core = interests or []
@@ -74,11 +98,30 @@ def _build_fallback_profile(user_profile: Dict) -> Dict:
         "preferred_location": location.lower(),
         "preferred_languages": _normalize_keywords(languages) or ["english"],
         "notes": "fallback profile built from stored attributes",
+        "source": "fallback",
     }
     return fallback
 
 
-def build_user_keyword_profile(user_profile: Dict) -> Dict:
+def build_user_keyword_profile(
+    user_profile: Dict, profile_mode: Optional[str] = None, call_site: str = "keyword_profile"
+) -> Dict:
+    """
+    Build the keyword tiers used to score events for a user.
+
+    `profile_mode` overrides MATCHMAKING_PROFILE_MODE ("user" or "cohort").
+    `call_site` sets the Gemini priority, e.g. "keyword_profile_batch" for
+    background scoring.
+    """
+    mode = (profile_mode or PROFILE_MODE).strip().lower()
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode}")
+    if mode == "cohort":
+        return build_cohort_keyword_profile(user_profile, call_site=call_site)
+    return _request_keyword_profile(user_profile, call_site=call_site)
+
+
+def _request_keyword_profile(user_profile: Dict, call_site: str = "keyword_profile") -> Dict:
     fallback = _build_fallback_profile(user_profile)
 
     prompt = f"""You design matchmaking keyword profiles for newcomers looking for local events.
@@ -103,18 +146,20 @@ Rules:
 PROFILE
 - Status: {user_profile.get('status', 'Unknown')}
 - Occupation: {user_profile.get('occupation', 'Unknown')}
-- Interests: {', '.join(_listify(user_profile.get('interests', []))) or 'None listed'}
+- Interests: {', '.join(listify(user_profile.get('interests', []))) or 'None listed'}
 - Location: {user_profile.get('location', 'Unknown')}
-- Languages: {', '.join(_listify(user_profile.get('language') or user_profile.get('languages') or ['english']))}
+- Languages: {', '.join(listify(user_profile.get('language') or user_profile.get('languages') or ['english']))}
 - Background: {user_profile.get('bio') or user_profile.get('about') or 'N/A'}
 """
 
     try:
-        response = gemini(prompt)
+        response = gemini(prompt, call_site=call_site)
         if not response:
             raise ValueError("Gemini returned no content")
 
-        parsed = json.loads(_extract_json_block(response))
+        parsed = parse_json_response(response)
+        if not isinstance(parsed, dict):
+            raise ValueError("Gemini returned no JSON object")
 
         profile = {
             "core_keywords": _normalize_keywords(parsed.get("core_keywords", [])) or fallback["core_keywords"],
@@ -123,6 +168,7 @@ PROFILE
             "preferred_location": str(parsed.get("preferred_location", fallback["preferred_location"])).strip().lower(),
             "preferred_languages": _normalize_keywords(parsed.get("preferred_languages", fallback["preferred_languages"])) or fallback["preferred_languages"],
             "notes": str(parsed.get("notes", fallback.get("notes", ""))).strip() or fallback.get("notes", ""),
+            "source": "gemini",
         }
         return profile
     except Exception as exc:
@@ -130,22 +176,109 @@ PROFILE
         return fallback
 
 
-def _event_corpus(event: Dict) -> Tuple[str, Dict[str, str]]:
-    fields = {
-        "name": str(event.get("name", "")),
-        "about": str(event.get("about", "")),
-        "venue": str(event.get("venue", "")),
-        "category": str(event.get("category", "")),
-        "tags": " ".join(_listify(event.get("tags", []))),
-        "language": str(event.get("language", "")),
-        "date": str(event.get("date", "")),
+# --- Cohort profiles ---
+
+_cohort_lock = threading.Lock()
+_cohort_profiles: "OrderedDict[Tuple, Tuple[float, Dict]]" = OrderedDict()
+_cohort_futures: Dict[Tuple, Future] = {}
+
+
+def _cohort_key(user_profile: Dict) -> Tuple:
+    """(status, location, sorted interest bucket, sorted languages) for a user."""
+    interests = sorted(_normalize_keywords(listify(user_profile.get("interests", []))))
+    languages = sorted(_normalize_keywords(
+        listify(user_profile.get("language") or user_profile.get("languages") or ["english"])
+    )) or ["english"]
+    return (
+        str(user_profile.get("status", "")).strip().upper(),
+        str(user_profile.get("location", "")).strip().lower(),
+        tuple(interests[:COHORT_INTEREST_BUCKET_SIZE]),
+        tuple(languages),
+    )
+
+
+def _personalize_profile(cohort_profile: Dict, user_profile: Dict) -> Dict:
+    """Cheap local adjustments of a shared cohort profile for one user."""
+    occupation = str(user_profile.get("occupation", "")).strip()
+    interests = listify(user_profile.get("interests", []))
+    core = list(cohort_profile["core_keywords"])
+    if occupation:
+        core.append(occupation)
+    core = _normalize_keywords(core)
+
+    secondary = [
+        kw for kw in _normalize_keywords(cohort_profile["secondary_keywords"] + interests)
+        if kw not in core
+    ]
+
+    location = str(user_profile.get("location", "")).strip().lower()
+    return {
+        "core_keywords": core,
+        "secondary_keywords": secondary,
+        "avoid_keywords": list(cohort_profile["avoid_keywords"]),
+        "preferred_location": location or cohort_profile["preferred_location"],
+        "preferred_languages": list(cohort_profile["preferred_languages"]),
+        "notes": cohort_profile.get("notes", ""),
+        "source": cohort_profile.get("source", "gemini"),
+        "cohort": True,
     }
-    corpus = " ".join(fields.values()).lower()
-    return corpus, fields
+
+
+def build_cohort_keyword_profile(user_profile: Dict, call_site: str = "keyword_profile") -> Dict:
+    """
+    Build a keyword profile from the shared profile of the user's cohort.
+
+    Gemini is prompted once per cohort key: concurrent misses for the same
+    cohort wait on the first request instead of prompting again. Failed
+    (fallback) profiles are not cached so the cohort is retried on the next
+    request.
+    """
+    key = _cohort_key(user_profile)
+    with _cohort_lock:
+        entry = _cohort_profiles.get(key)
+        if entry is not None and time.time() - entry[0] > COHORT_CACHE_TTL_SECONDS:
+            del _cohort_profiles[key]
+            entry = None
+        if entry is not None:
+            _cohort_profiles.move_to_end(key)
+            return _personalize_profile(entry[1], user_profile)
+
+        future = _cohort_futures.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _cohort_futures[key] = future
+
+    if not leader:
+        return _personalize_profile(future.result(), user_profile)
+
+    try:
+        status, location, interests, languages = key
+        cohort_profile = _request_keyword_profile({
+            "status": status,
+            "location": location,
+            "interests": list(interests),
+            "language": list(languages),
+        }, call_site=call_site)
+    except BaseException as exc:
+        with _cohort_lock:
+            _cohort_futures.pop(key, None)
+        future.set_exception(exc)
+        raise
+
+    with _cohort_lock:
+        _cohort_futures.pop(key, None)
+        if cohort_profile.get("source") == "gemini":
+            _cohort_profiles[key] = (time.time(), cohort_profile)
+            while len(_cohort_profiles) > COHORT_CACHE_MAX_ENTRIES:
+                _cohort_profiles.popitem(last=False)
+    future.set_result(cohort_profile)
+
+    return _personalize_profile(cohort_profile, user_profile)
 
 
 def _score_event(event: Dict, user_profile: Dict, keyword_profile: Dict) -> Dict:
-    corpus, fields = _event_corpus(event)
+    corpus, fields = event_corpus(event)
     core_hits = [kw for kw in keyword_profile["core_keywords"] if kw in corpus]
     secondary_hits = [kw for kw in keyword_profile["secondary_keywords"] if kw in corpus and kw not in core_hits]
     avoid_hits = [kw for kw in keyword_profile["avoid_keywords"] if kw in corpus]
@@ -171,13 +304,13 @@ def _score_event(event: Dict, user_profile: Dict, keyword_profile: Dict) -> Dict
         score += LANGUAGE_WEIGHT
         reasons.append("Language alignment")
 
-    newcomer_terms = ["newcomer", "settlement", "immigrant", "international", "welcome"]
-    if any(term in corpus for term in newcomer_terms):
+    if any(term in corpus for term in NEWCOMER_TERMS):
         score += NEWCOMER_WEIGHT
         reasons.append("Newcomer friendly")
 
+    avoid_penalty = min(len(avoid_hits) * AVOID_PENALTY, 50)
     if avoid_hits:
-        score -= min(len(avoid_hits) * AVOID_PENALTY, 50)
+        score -= avoid_penalty
         reasons.append(f"Avoid keywords present: {', '.join(avoid_hits)}")
 
     date_field = fields.get("date") or event.get("date")
@@ -198,20 +331,177 @@ def _score_event(event: Dict, user_profile: Dict, keyword_profile: Dict) -> Dict
         "score": score,
         "reasoning": reasoning,
         "relevance_factors": factors,
+        "avoid_penalty": avoid_penalty,
     }
 
 
-def get_recommended_events_for_user(
+def _retrieve_candidates(
+    event_store: EventStore,
     user_profile: Dict,
-    all_events: List[Dict],
-    min_score: float = 45.0,
-    top_n: int = 5,
+    keyword_profile: Dict,
+    min_score: float,
 ) -> List[Dict]:
-    keyword_profile = build_user_keyword_profile(user_profile)
-    scored_events = []
+    """
+    Pick the events worth scoring from the store's inverted index.
+
+    Candidates are the union of posting lists for the core and secondary
+    keywords plus a small set of newcomer-friendly events. When min_score is
+    low enough for keyword-less events to qualify, the whole catalog is used.
+    """
+    if min_score <= MAX_NON_KEYWORD_SCORE:
+        candidates = event_store.all_events()
+    else:
+        keywords = keyword_profile["core_keywords"] + keyword_profile["secondary_keywords"]
+        candidates = event_store.retrieve(keywords)
+        seen = {id(event) for event in candidates}
+        for event in event_store.retrieve(NEWCOMER_TERMS, limit=NEWCOMER_FALLBACK_LIMIT):
+            if id(event) not in seen:
+                candidates.append(event)
+
+    attending = set(user_profile.get("events_attending", []) or [])
+    return [event for event in candidates if event.get("name") not in attending]
+
+
+# --- Profile cache and hedged recommendations ---
+
+_profile_lock = threading.Lock()
+_profile_cache: Dict[str, Tuple[float, Dict]] = {}
+_profile_futures: Dict[str, Future] = {}
+_profile_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="keyword-profile")
+
+
+def _profile_cache_key(user_profile: Dict, profile_mode: Optional[str]) -> str:
+    """Cache key that changes whenever a field used in the prompt changes."""
+    fields = {
+        "user": _user_key(user_profile),
+        "mode": (profile_mode or PROFILE_MODE).strip().lower(),
+        "status": user_profile.get("status"),
+        "occupation": user_profile.get("occupation"),
+        "interests": listify(user_profile.get("interests", [])),
+        "location": user_profile.get("location"),
+        "languages": listify(user_profile.get("language") or user_profile.get("languages") or []),
+        "bio": user_profile.get("bio") or user_profile.get("about"),
+    }
+    return hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _get_cached_profile(cache_key: str) -> Optional[Dict]:
+    with _profile_lock:
+        entry = _profile_cache.get(cache_key)
+        if entry is None:
+            return None
+        stored_at, profile = entry
+        if time.time() - stored_at > PROFILE_CACHE_TTL_SECONDS:
+            del _profile_cache[cache_key]
+            return None
+        return profile
+
 
-    for event in all_events:
+def _store_profile(cache_key: str, profile: Dict) -> None:
+    # Fallback profiles are cheap to rebuild and would hide a recovered Gemini
+    if profile.get("source") == "fallback":
+        return
+    with _profile_lock:
+        _profile_cache[cache_key] = (time.time(), profile)
+
+
+def get_keyword_profile(
+    user_profile: Dict, profile_mode: Optional[str] = None, call_site: str = "keyword_profile"
+) -> Dict:
+    """Cached build_user_keyword_profile."""
+    cache_key = _profile_cache_key(user_profile, profile_mode)
+    profile = _get_cached_profile(cache_key)
+    if profile is None:
+        profile = build_user_keyword_profile(user_profile, profile_mode=profile_mode, call_site=call_site)
+        _store_profile(cache_key, profile)
+    return profile
+
+
+def _request_profile_async(user_profile: Dict, profile_mode: Optional[str], min_score: float) -> Future:
+    """Start (or join) a background Gemini profile build that fills the cache."""
+    cache_key = _profile_cache_key(user_profile, profile_mode)
+    with _profile_lock:
+        future = _profile_futures.get(cache_key)
+        if future is not None:
+            return future
+        future = _profile_executor.submit(build_user_keyword_profile, user_profile, profile_mode)
+        _profile_futures[cache_key] = future
+
+    def _on_done(done: Future) -> None:
+        with _profile_lock:
+            _profile_futures.pop(cache_key, None)
+        if done.cancelled() or done.exception() is not None:
+            return
+        profile = done.result()
+        _store_profile(cache_key, profile)
+        if profile.get("source") != "fallback":
+            register_standing_query(user_profile, profile, min_score=min_score)
+
+    future.add_done_callback(_on_done)
+    return future
+
+
+def _resolve_backend(scoring_backend: Optional[str], keyword_profile: Dict) -> str:
+    if scoring_backend:
+        backend = scoring_backend.strip().lower()
+    elif keyword_profile.get("source") == "fallback":
+        backend = FALLBACK_SCORING_BACKEND
+    else:
+        backend = SCORING_BACKEND
+    if backend not in SCORING_BACKENDS:
+        raise ValueError(f"Unknown scoring backend: {backend}")
+    return backend
+
+
+def _user_semantic_text(user_profile: Dict, keyword_profile: Dict) -> str:
+    """Query text for the semantic backend: interests, occupation, status and keyword tiers."""
+    parts = listify(user_profile.get("interests", []))
+    parts.append(str(user_profile.get("occupation", "")))
+    parts.extend(_status_keywords(str(user_profile.get("status", "")).strip().upper()))
+    parts.extend(keyword_profile.get("core_keywords", []))
+    parts.extend(keyword_profile.get("secondary_keywords", []))
+    return " ".join(part for part in parts if part)
+
+
+def _semantic_document(event: Dict) -> Tuple[str, str]:
+    return str(event.get("event_id") or event.get("name") or ""), event_corpus(event)[0]
+
+
+def _rank_events(
+    events: Iterable[Dict],
+    user_profile: Dict,
+    keyword_profile: Dict,
+    min_score: float,
+    top_n: int,
+    scoring_backend: Optional[str] = None,
+    catalog: Optional[List[Dict]] = None,
+) -> List[Dict]:
+    events = list(events)
+    backend = _resolve_backend(scoring_backend, keyword_profile)
+    semantic_scores: List[float] = []
+    if backend != "keywords":
+        corpus = [_semantic_document(event) for event in catalog] if catalog is not None else None
+        semantic_scores = score_documents(
+            [_semantic_document(event) for event in events],
+            _user_semantic_text(user_profile, keyword_profile),
+            corpus=corpus,
+        )
+
+    scored_events = []
+    for position, event in enumerate(events):
         match = _score_event(event, user_profile, keyword_profile)
+        if backend != "keywords":
+            semantic_score = semantic_scores[position]
+            if backend == "semantic":
+                # Avoid keywords penalize semantic matches as they do keyword ones
+                match["score"] = max(0.0, semantic_score - match["avoid_penalty"])
+            else:
+                match["score"] = round(
+                    (1 - SEMANTIC_BLEND_WEIGHT) * match["score"] + SEMANTIC_BLEND_WEIGHT * semantic_score, 1
+                )
+            match["relevance_factors"] = match["relevance_factors"] + [f"Semantic similarity: {semantic_score:.0f}/100"]
+            match["reasoning"] = "; ".join(match["relevance_factors"])
+
         if match["score"] >= min_score:
             enriched = event.copy()
             enriched["match_score"] = match["score"]
@@ -224,8 +514,131 @@ def get_recommended_events_for_user(
     return scored_events[:top_n]
 
 
-def batch_score_events(user_profile: Dict, events: List[Dict]) -> List[Dict]:
-    keyword_profile = build_user_keyword_profile(user_profile)
+def _candidate_events(
+    user_profile: Dict,
+    keyword_profile: Dict,
+    all_events: Optional[List[Dict]],
+    event_store: Optional[EventStore],
+    min_score: float,
+    scoring_backend: Optional[str] = None,
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Events to score and the catalog they come from.
+
+    Semantic backends can match events without any keyword overlap, so they
+    score the whole catalog instead of the keyword postings.
+    """
+    if event_store is None:
+        catalog = all_events or []
+        return catalog, catalog
+
+    catalog = event_store.all_events()
+    if _resolve_backend(scoring_backend, keyword_profile) == "keywords":
+        return _retrieve_candidates(event_store, user_profile, keyword_profile, min_score), catalog
+
+    attending = set(user_profile.get("events_attending", []) or [])
+    return [event for event in catalog if event.get("name") not in attending], catalog
+
+
+def _recommend_with_profile(
+    user_profile: Dict,
+    keyword_profile: Dict,
+    all_events: Optional[List[Dict]],
+    event_store: Optional[EventStore],
+    min_score: float,
+    top_n: int,
+    scoring_backend: Optional[str],
+) -> List[Dict]:
+    candidates, catalog = _candidate_events(
+        user_profile, keyword_profile, all_events, event_store, min_score, scoring_backend
+    )
+    register_standing_query(user_profile, keyword_profile, min_score=min_score)
+    return _rank_events(candidates, user_profile, keyword_profile, min_score, top_n, scoring_backend, catalog)
+
+
+def get_recommended_events_for_user(
+    user_profile: Dict,
+    all_events: Optional[List[Dict]] = None,
+    min_score: float = 45.0,
+    top_n: int = 5,
+    event_store: Optional[EventStore] = None,
+    profile_mode: Optional[str] = None,
+    scoring_backend: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Score events for a user and return the best matches.
+
+    Pass `all_events` to score an explicit list, or `event_store` to retrieve
+    candidates from its inverted index instead of scoring the whole catalog
+    (events the user already attends are skipped). `scoring_backend` is one
+    of SCORING_BACKENDS and defaults to MATCHMAKING_SCORING_BACKEND.
+    """
+    keyword_profile = get_keyword_profile(user_profile, profile_mode=profile_mode)
+    return _recommend_with_profile(
+        user_profile, keyword_profile, all_events, event_store, min_score, top_n, scoring_backend
+    )
+
+
+def get_recommended_events_hedged(
+    user_profile: Dict,
+    all_events: Optional[List[Dict]] = None,
+    min_score: float = 45.0,
+    top_n: int = 5,
+    event_store: Optional[EventStore] = None,
+    profile_mode: Optional[str] = None,
+    latency_budget_ms: Optional[float] = None,
+    scoring_backend: Optional[str] = None,
+) -> Tuple[List[Dict], str]:
+    """
+    Deadline-aware variant of get_recommended_events_for_user.
+
+    Scores with the local fallback profile right away while the Gemini profile
+    is requested in the background, and returns the Gemini-scored result only
+    if it arrives within the latency budget. A late Gemini profile still lands
+    in the profile cache for the next call.
+
+    Returns:
+        (events, profile_source) where profile_source is "cache", "gemini" or "fallback"
+    """
+    cache_key = _profile_cache_key(user_profile, profile_mode)
+    cached = _get_cached_profile(cache_key)
+    if cached is not None:
+        return _recommend_with_profile(
+            user_profile, cached, all_events, event_store, min_score, top_n, scoring_backend
+        ), "cache"
+
+    budget = (RECOMMENDATION_LATENCY_BUDGET_MS if latency_budget_ms is None else latency_budget_ms) / 1000.0
+    deadline = time.monotonic() + max(0.0, budget)
+    future = _request_profile_async(user_profile, profile_mode, min_score)
+
+    fallback = _build_fallback_profile(user_profile)
+    candidates, catalog = _candidate_events(
+        user_profile, fallback, all_events, event_store, min_score, scoring_backend
+    )
+    fallback_events = _rank_events(
+        candidates, user_profile, fallback, min_score, top_n, scoring_backend, catalog
+    )
+
+    try:
+        profile = future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        profile = None
+    except Exception as exc:
+        print(f"Keyword profile request failed: {exc}")
+        profile = None
+
+    if profile is None or profile.get("source") == "fallback":
+        register_standing_query(user_profile, fallback, min_score=min_score)
+        return fallback_events, "fallback"
+
+    return _recommend_with_profile(
+        user_profile, profile, all_events, event_store, min_score, top_n, scoring_backend
+    ), "gemini"
+
+
+def batch_score_events(user_profile: Dict, events: List[Dict], profile_mode: Optional[str] = None) -> List[Dict]:
+    # Offline scoring yields Gemini capacity to interactive requests
+    keyword_profile = get_keyword_profile(user_profile, profile_mode=profile_mode, call_site="keyword_profile_batch")
     scored = []
 
     for event in events:
@@ -244,3 +657,153 @@ def batch_score_events(user_profile: Dict, events: List[Dict]) -> List[Dict]:
 def fallback_matching(user_profile: Dict, event: Dict) -> Dict:
     keyword_profile = _build_fallback_profile(user_profile)
     return _score_event(event, user_profile, keyword_profile)
+
+
+# --- Standing queries (percolator) ---
+#
+# Every keyword profile built for a user is kept as a standing query. The
+# scorer matches keywords as substrings of the event text, so the reverse
+# index maps one character trigram of each core/secondary keyword to the
+# users holding it: every keyword found in an event has all of its trigrams
+# in the event text, and users indexed under none of the event's trigrams
+# cannot match. Users with a keyword shorter than a trigram, or a threshold
+# low enough for keyword-less events, are scored for every event.
+
+_percolator_lock = threading.Lock()
+_standing_queries: Dict[str, Dict] = {}
+_keyword_index: Dict[str, Set[str]] = {}
+_always_scored: Set[str] = set()
+_pushed_recommendations: Dict[str, List[Dict]] = {}
+
+
+def _user_key(user_profile: Dict) -> str:
+    return str(user_profile.get("username") or user_profile.get("user_id") or "").strip()
+
+
+def _query_keys(keyword_profile: Dict, min_score: float) -> Optional[Set[str]]:
+    """Index trigrams for a standing query, or None if it must be scored against every event."""
+    if min_score <= MAX_NON_KEYWORD_SCORE:
+        return None
+    keys = set()
+    for keyword in keyword_profile.get("core_keywords", []) + keyword_profile.get("secondary_keywords", []):
+        if len(keyword) < NGRAM_SIZE:
+            return None
+        keys.add(keyword[:NGRAM_SIZE])
+    return keys
+
+
+def _unindex_locked(user_key: str) -> None:
+    query = _standing_queries.pop(user_key, None)
+    _always_scored.discard(user_key)
+    if not query:
+        return
+    for key in query["keys"] or ():
+        users = _keyword_index.get(key)
+        if users:
+            users.discard(user_key)
+            if not users:
+                del _keyword_index[key]
+
+
+def register_standing_query(user_profile: Dict, keyword_profile: Dict, min_score: float = 45.0) -> None:
+    """
+    Store (or replace) the user's keyword profile as a standing query.
+
+    A fallback profile never replaces a Gemini one: a hedged request that
+    timed out can finish after the late Gemini profile registered itself.
+    remove_standing_query() clears the way after a profile change.
+    """
+    user_key = _user_key(user_profile)
+    if not user_key:
+        return
+
+    keys = _query_keys(keyword_profile, min_score)
+    with _percolator_lock:
+        current = _standing_queries.get(user_key)
+        if (
+            current is not None
+            and keyword_profile.get("source") == "fallback"
+            and current["keyword_profile"].get("source") != "fallback"
+        ):
+            return
+        _unindex_locked(user_key)
+        # Only what percolation needs; the full user record stays out of memory
+        _standing_queries[user_key] = {
+            "events_attending": list(user_profile.get("events_attending", []) or []),
+            "keyword_profile": keyword_profile,
+            "min_score": min_score,
+            "keys": keys,
+        }
+        if keys is None:
+            _always_scored.add(user_key)
+        else:
+            for key in keys:
+                _keyword_index.setdefault(key, set()).add(user_key)
+
+
+def remove_standing_query(user_profile: Dict) -> None:
+    """Drop the user's standing query, e.g. after their profile changed; the next recommendation request registers a new one."""
+    user_key = _user_key(user_profile)
+    with _percolator_lock:
+        _unindex_locked(user_key)
+
+
+def percolate_event(event: Dict) -> List[Tuple[str, str, float]]:
+    """
+    Match a newly stored event against all standing queries.
+
+    Only users whose indexed trigrams appear in the event are scored, so the
+    cost is proportional to the number of candidate users. Matches that clear
+    the user's threshold are pushed onto their recommendation list.
+
+    Returns:
+        List of (user_key, event_name, score) tuples for pushed matches.
+    """
+    corpus = event_corpus(event)[0]
+    with _percolator_lock:
+        candidates = set(_always_scored)
+        for gram in ngrams(corpus):
+            users = _keyword_index.get(gram)
+            if users:
+                candidates.update(users)
+        queries = {user_key: _standing_queries[user_key] for user_key in candidates}
+
+    matches = []
+    for user_key, query in queries.items():
+        if event.get("name") in query["events_attending"]:
+            continue
+
+        match = _score_event(event, {"username": user_key}, query["keyword_profile"])
+        if match["score"] < query["min_score"]:
+            continue
+
+        enriched = event.copy()
+        enriched["match_score"] = match["score"]
+        enriched["match_reasoning"] = match["reasoning"]
+        enriched["relevance_factors"] = match["relevance_factors"]
+        enriched["match_notes"] = query["keyword_profile"].get("notes", "")
+        _push_recommendation(user_key, enriched)
+        matches.append((user_key, event.get("name", ""), match["score"]))
+
+    return matches
+
+
+def _push_recommendation(user_key: str, enriched_event: Dict) -> None:
+    identity = enriched_event.get("event_id") or enriched_event.get("name")
+    with _percolator_lock:
+        pushed = [
+            evt for evt in _pushed_recommendations.get(user_key, [])
+            if (evt.get("event_id") or evt.get("name")) != identity
+        ]
+        pushed.append(enriched_event)
+        pushed.sort(key=lambda evt: evt.get("match_score", 0), reverse=True)
+        _pushed_recommendations[user_key] = pushed[:PUSHED_RECOMMENDATIONS_LIMIT]
+
+
+def get_pushed_recommendations(user_profile: Dict, clear: bool = False) -> List[Dict]:
+    """Return events pushed to the user by the percolator since the last clear."""
+    user_key = _user_key(user_profile)
+    with _percolator_lock:
+        if clear:
+            return _pushed_recommendations.pop(user_key, [])
+        return list(_pushed_recommendations.get(user_key, []))
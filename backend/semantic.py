@@ -0,0 +1,158 @@
+"""Local semantic event matching with hashed TF-IDF vectors (no network calls)."""
+
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from Databases.event_store import tokenize
+
+N_FEATURES = int(os.getenv("SEMANTIC_N_FEATURES", "4096"))
+# Document vectors are cached by content hash, so an edited event is
+# re-vectorized; least recently used vectors are evicted beyond this many.
+VECTOR_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_VECTOR_CACHE_SIZE", "20000"))
+
+# Cosine similarity that maps to a full 100 score; short profile texts rarely
+# get much closer to event descriptions than this.
+SEMANTIC_SATURATION = 0.35
+
+
+def _features(text: str, n_features: int) -> np.ndarray:
+    """Hashed bucket ids for the unigrams and bigrams of a text."""
+    tokens = tokenize(text)
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return np.fromiter(
+        (zlib.crc32(gram.encode("utf-8")) % n_features for gram in grams),
+        dtype=np.int64,
+        count=len(grams),
+    )
+
+
+class SemanticMatcher:
+    """Hashing vectorizer with IDF weights fitted on the event corpus"""
+
+    def __init__(self, n_features: int = N_FEATURES, max_vectors: int = VECTOR_CACHE_MAX_ENTRIES):
+        self.n_features = n_features
+        self.n_docs = 0
+        self.max_vectors = max_vectors
+        self._lock = threading.Lock()
+        self._idf = np.ones(n_features, dtype=np.float32)
+        self._vectors: "OrderedDict[bytes, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+
+    def fit(self, documents: Iterable[Tuple[str, str]]) -> None:
+        """
+        Fit IDF weights on (doc_id, text) pairs; drops cached vectors.
+
+        Args:
+            documents: Iterable of (doc_id, text) pairs
+        """
+        docs = list(documents)
+        features = [np.unique(_features(text, self.n_features)) for _, text in docs]
+        df = np.zeros(self.n_features, dtype=np.float32)
+        for buckets in features:
+            df[buckets] += 1
+
+        idf = (np.log((1 + len(docs)) / (1 + df)) + 1).astype(np.float32)
+        with self._lock:
+            self._idf = idf
+            self.n_docs = len(docs)
+            self._vectors = OrderedDict()
+
+    def needs_fit(self, corpus_size: int) -> bool:
+        """True when unfitted or the corpus size drifted by more than 20%."""
+        if self.n_docs == 0:
+            return corpus_size > 0
+        return abs(corpus_size - self.n_docs) > 0.2 * self.n_docs
+
+    def _sparse_vector(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        buckets, counts = np.unique(_features(text, self.n_features), return_counts=True)
+        weights = (1 + np.log(counts)).astype(np.float32) * self._idf[buckets]
+        norm = float(np.linalg.norm(weights))
+        if norm:
+            weights /= norm
+        return buckets, weights
+
+    def _doc_vector(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            cached = self._vectors.get(key)
+            if cached is not None:
+                self._vectors.move_to_end(key)
+                return cached
+        cached = self._sparse_vector(text)
+        with self._lock:
+            self._vectors[key] = cached
+            while len(self._vectors) > self.max_vectors:
+                self._vectors.popitem(last=False)
+        return cached
+
+    def vectorize(self, text: str) -> np.ndarray:
+        """Dense, L2-normalized query vector."""
+        buckets, weights = self._sparse_vector(text)
+        dense = np.zeros(self.n_features, dtype=np.float32)
+        dense[buckets] = weights
+        return dense
+
+    def similarities(self, documents: List[Tuple[str, str]], query_text: str) -> np.ndarray:
+        """
+        Cosine similarity of each (doc_id, text) pair against the query text.
+
+        Returns:
+            Array of similarities in [0, 1], aligned with `documents`
+        """
+        if not documents:
+            return np.zeros(0, dtype=np.float32)
+
+        query = self.vectorize(query_text)
+        vectors = [self._doc_vector(text) for _, text in documents]
+        lengths = np.fromiter((len(b) for b, _ in vectors), dtype=np.int64, count=len(vectors))
+        sims = np.zeros(len(vectors), dtype=np.float32)
+        non_empty = lengths > 0
+        if not non_empty.any():
+            return sims
+
+        buckets = np.concatenate([b for b, _ in vectors])
+        weights = np.concatenate([w for _, w in vectors])
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        sums = np.add.reduceat(query[buckets] * weights, offsets[non_empty])
+        sims[non_empty] = np.clip(sums, 0.0, 1.0)
+        return sims
+
+
+def similarity_to_score(similarity: float) -> float:
+    """Map a cosine similarity onto the 0-100 match score scale."""
+    return round(100 * min(1.0, similarity / SEMANTIC_SATURATION), 1)
+
+
+_default_matcher: Optional[SemanticMatcher] = None
+_default_lock = threading.Lock()
+
+
+def get_semantic_matcher() -> SemanticMatcher:
+    global _default_matcher
+    with _default_lock:
+        if _default_matcher is None:
+            _default_matcher = SemanticMatcher()
+        return _default_matcher
+
+
+def score_documents(
+    documents: List[Tuple[str, str]],
+    query_text: str,
+    corpus: Optional[List[Tuple[str, str]]] = None,
+) -> List[float]:
+    """
+    Scores (0-100) for (doc_id, text) pairs against a query.
+
+    IDF weights are refitted on `corpus` (defaults to `documents`) when the
+    corpus size has drifted since the last fit.
+    """
+    corpus = documents if corpus is None else corpus
+    matcher = get_semantic_matcher()
+    if matcher.needs_fit(len(corpus)):
+        matcher.fit(corpus)
+    return [similarity_to_score(float(sim)) for sim in matcher.similarities(documents, query_text)]
@@ -0,0 +1,190 @@
+"""Settling-in task templates shared across user cohorts."""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from Databases.event_store import tokenize
+from gemini import gemini, parse_task_line
+
+STATUS_DESCRIPTIONS = {
+    "S": "International Stududent with a study permit coming to study",
+    "R": "International refugee person who would need job",
+    "W": "International Person with work permit",
+}
+
+# Task mode: "user" prompts Gemini for all 10 tasks per user, "cohort" reuses
+# one generic core per (status, location) and only fills the interest tasks.
+ADMIN_TASKS_MODE = os.getenv("ADMIN_TASKS_MODE", "cohort").strip().lower()
+ADMIN_TASK_COUNT = 10
+CORE_TASK_COUNT = int(os.getenv("ADMIN_TASKS_CORE_COUNT", "7"))
+TASK_TEMPLATE_TTL_SECONDS = float(os.getenv("TASK_TEMPLATE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Interest tasks kept per (location, interest) in the local pool
+INTEREST_POOL_LIMIT = 30
+GENERAL_INTEREST = "general"
+
+
+def describe_status(status: str) -> str:
+    return STATUS_DESCRIPTIONS.get(status, status)
+
+
+def _interest_key(interest: str) -> str:
+    return " ".join(tokenize(interest)) or GENERAL_INTEREST
+
+
+def _core_prompt(status: str, location: str, count: int) -> str:
+    return f"""Generate {count} settling-in tasks for a new {describe_status(status)} moving into {location}. Tasks may include but not limited to opening a bank account,
+        finding housing, obtaining a SIN/provincial ID/health coverage, and exploring important locations in the city.
+        Only include tasks every newcomer with this status needs; do not mention hobbies, interests or personal details.
+        Return a list of {count} tasks, each starting with a '-' on a new line, with no extra text. use UTF-8 encoding."""
+
+
+def _interest_prompt(location: str, interests: List[str], per_interest: int) -> str:
+    return f"""Generate {per_interest} settling-in tasks for each of these interests to help a newcomer in {location} build a social life and community around them:
+        {', '.join(interests)}
+        Each task should name a concrete kind of place, club or activity in {location}.
+        Return each task on a new line as '- <interest>: <task>', using the interest exactly as written above, with no extra text. use UTF-8 encoding."""
+
+
+def _parse_tasks(response: Optional[str]) -> List[str]:
+    if not response:
+        return []
+    return [task for task in map(parse_task_line, response.split("\n")) if task]
+
+
+class TaskTemplateLibrary:
+    """
+    Generic core tasks per (status, location) plus a pool of interest tasks.
+
+    Cores are generated once per cohort and reused until they expire. Interest
+    tasks are indexed by (location, interest) as they are generated, so later
+    users with the same interests are served from the pool without a Gemini call.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[..., Optional[str]] = None,
+        ttl_seconds: float = TASK_TEMPLATE_TTL_SECONDS,
+        core_count: int = CORE_TASK_COUNT,
+    ):
+        self._generate = generate
+        self.ttl_seconds = ttl_seconds
+        self.core_count = core_count
+        self._lock = threading.Lock()
+        self._cores: Dict[Tuple[str, str], Tuple[List[str], float]] = {}
+        self._core_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._pool: Dict[Tuple[str, str], List[str]] = {}
+
+    def _call(self, prompt: str) -> Optional[str]:
+        generate = self._generate or gemini
+        return generate(prompt, call_site="admin_tasks")
+
+    def core_tasks(self, status: str, location: str) -> List[str]:
+        """Generic tasks for a cohort; generated at most once per key at a time."""
+        key = (str(status).strip().upper(), str(location).strip().lower())
+        with self._lock:
+            cached = self._cores.get(key)
+            if cached and time.time() - cached[1] < self.ttl_seconds:
+                return list(cached[0])
+            key_lock = self._core_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                cached = self._cores.get(key)
+                if cached and time.time() - cached[1] < self.ttl_seconds:
+                    return list(cached[0])
+
+            tasks = _parse_tasks(self._call(_core_prompt(key[0], location, self.core_count)))[:self.core_count]
+            # A short or failed response is not cached so the cohort is retried
+            if len(tasks) >= self.core_count // 2:
+                with self._lock:
+                    self._cores[key] = (tasks, time.time())
+            return tasks
+
+    def add_interest_tasks(self, location: str, interest: str, tasks: Iterable[str]) -> None:
+        key = (str(location).strip().lower(), _interest_key(interest))
+        with self._lock:
+            pool = self._pool.setdefault(key, [])
+            for task in tasks:
+                if task not in pool:
+                    pool.append(task)
+            del pool[:-INTEREST_POOL_LIMIT]
+
+    def pooled_tasks(self, location: str, interest: str) -> List[str]:
+        with self._lock:
+            return list(self._pool.get((str(location).strip().lower(), _interest_key(interest)), []))
+
+    def interest_tasks(
+        self, location: str, interests: List[str], count: int, exclude: Iterable[str] = ()
+    ) -> List[str]:
+        """
+        `count` interest tasks, spread round-robin over the interests.
+
+        Pooled tasks the user does not already have are used first; Gemini is
+        only asked for the interests whose pool runs short, and its answers
+        are added to the pool.
+        """
+        interests = [i for i in dict.fromkeys(str(i).strip() for i in interests) if i] or [GENERAL_INTEREST]
+        excluded = set(exclude)
+        available = {
+            interest: [t for t in self.pooled_tasks(location, interest) if t not in excluded]
+            for interest in interests
+        }
+        needed = {interest: 0 for interest in interests}
+        for position in range(count):
+            needed[interests[position % len(interests)]] += 1
+
+        short = [i for i in interests if len(available[i]) < needed[i]]
+        if short:
+            per_interest = max(needed[i] for i in short)
+            by_interest = {_interest_key(i): i for i in short}
+            for line in _parse_tasks(self._call(_interest_prompt(location, short, per_interest))):
+                label, _, task = line.partition(":")
+                interest = by_interest.get(_interest_key(label))
+                if interest is None or not task.strip():
+                    continue
+                self.add_interest_tasks(location, interest, [task.strip()])
+                if task.strip() not in excluded and task.strip() not in available[interest]:
+                    available[interest].append(task.strip())
+
+        selected = []
+        for position in range(count):
+            for offset in range(len(interests)):
+                interest = interests[(position + offset) % len(interests)]
+                if available[interest]:
+                    selected.append(available[interest].pop(0))
+                    break
+        return selected
+
+    def build_tasks(self, user: Dict, total: int = ADMIN_TASK_COUNT) -> List[str]:
+        """
+        Core tasks for the user's cohort followed by their interest tasks.
+
+        Returns [] if no core could be generated, so callers can fall back to
+        a full per-user prompt.
+        """
+        location = user.get("location", "Calgary")
+        core = self.core_tasks(user.get("status", "settler"), location)
+        if not core:
+            return []
+        interest = self.interest_tasks(
+            location,
+            user.get("interests", []),
+            max(0, total - len(core)),
+            exclude=list(user.get("tasks", [])) + core,
+        )
+        return core + interest
+
+
+_library: Optional[TaskTemplateLibrary] = None
+_library_lock = threading.Lock()
+
+
+def get_task_library() -> TaskTemplateLibrary:
+    global _library
+    with _library_lock:
+        if _library is None:
+            _library = TaskTemplateLibrary()
+        return _library
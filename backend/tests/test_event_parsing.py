@@ -0,0 +1,132 @@
+import json
+from datetime import datetime
+
+import pytest
+from bs4 import BeautifulSoup
+
+from event import EventbriteClient
+
+
+def _soup_event_details(html: str) -> dict:
+    """Reference: the BeautifulSoup implementation the regex-based parser replaced."""
+    soup = BeautifulSoup(html, 'html.parser')
+    details = {}
+    for selector in ['div.eds-text--left', 'div[class*="description"]', 'div[class*="summary"]']:
+        elem = soup.select_one(selector)
+        if elem and len(elem.get_text(strip=True)) > 50:
+            details['description'] = elem.get_text(strip=True)
+            break
+    if 'description' not in details:
+        elem = soup.find('meta', attrs={'name': 'description'}) or \
+               soup.find('meta', attrs={'property': 'og:description'})
+        if elem and elem.get('content'):
+            details['description'] = elem.get('content', '')
+
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string)
+        except Exception:
+            continue
+        if isinstance(data, dict) and data.get('@type') == 'Event':
+            details['start_time'] = data.get('startDate', '')
+            details['end_time'] = data.get('endDate', '')
+            if details['start_time']:
+                try:
+                    dt = datetime.fromisoformat(details['start_time'].replace('Z', '+00:00'))
+                    hour = dt.strftime('%I').lstrip('0')
+                    details['date_display'] = f"{dt.strftime('%a, %b %d, %Y')} at {hour}:{dt.strftime('%M %p')}"
+                except ValueError:
+                    pass
+            break
+
+    if not details.get('start_time'):
+        time_elem = soup.find('time', {'datetime': True})
+        if time_elem:
+            details['start_time'] = time_elem.get('datetime', '')
+            details['date_display'] = time_elem.get_text(strip=True)
+    return details
+
+
+FILLER = ''.join(
+    f'<div class="row r{i}"><span>Item {i} &amp; more</span><a href="/x/{i}">link</a><img src="a.png"></div>'
+    for i in range(50)
+)
+SCRIPT_BLOB = '<script>window.__DATA__=' + json.dumps({"k": '<div class="description">fake</div>' * 5}) + '</script>'
+LD_EVENT = (
+    '<script type="application/ld+json">'
+    '{"@type":"Event","startDate":"2030-03-04T19:30:00-07:00","endDate":"2030-03-04T22:00:00-07:00"}'
+    '</script>'
+)
+LONG_TEXT = 'Join us for an evening of &quot;networking&quot; &amp; talks about things that matter.'
+
+PAGES = {
+    'full': (
+        '<html><head><meta name="description" content="Meta desc"><meta property="og:description" content="OG">'
+        + LD_EVENT + '</head><body>' + SCRIPT_BLOB + FILLER
+        + '<div class="eds-text--left structured"><p>' + LONG_TEXT + '</p><div><b>Agenda</b><ul><li>Intro</li></ul></div>'
+        '<style>.a{}</style><!-- note --></div></body></html>'
+    ),
+    'short_div_then_description': (
+        '<html><head>' + LD_EVENT + '</head><body><div class="eds-text--left">short</div>'
+        '<div class="event-description__x">' + 'Long text ' * 10 + '<div>inner</div> tail</div>' + FILLER + '</body></html>'
+    ),
+    'meta_only': (
+        "<html><head><meta content='Only og &amp; stuff' property='og:description'/></head><body>" + FILLER
+        + '<time datetime="2030-01-01T10:00">Jan 1 <b>10am</b></time></body></html>'
+    ),
+    'summary': (
+        '<html><body><div class="card-summary">' + 'Summary words ' * 6 + '</div>'
+        '<time class="t">no</time><time datetime="2030-02-02">Feb 2</time></body></html>'
+    ),
+    'empty': '',
+    'bad_json': (
+        '<script type="application/ld+json">{bad</script>'
+        '<script type="application/ld+json">[{"@type":"Event"}]</script>'
+        '<script type="application/ld+json">{"@type":"Event","startDate":"x"}</script>'
+    ),
+    'quoted_gt_in_div': '<div data-x="a>b" class="description">' + LONG_TEXT + '</div>',
+    'quoted_gt_in_meta_and_time': (
+        '<meta data-note=\'x > y\' name="description" content="A > B, described">'
+        '<time title="5 > 4" datetime="2030-05-05T09:00">May 5</time>'
+    ),
+    'quoted_gt_in_script': (
+        '<script data-x="a>b" type="application/ld+json">'
+        '{"@type":"Event","startDate":"2030-06-01T18:00:00Z","endDate":""}</script>'
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(PAGES))
+def test_event_details_match_beautifulsoup(name):
+    html = PAGES[name]
+
+    assert EventbriteClient()._parse_event_details(html) == _soup_event_details(html)
+
+
+def test_quoted_gt_does_not_end_the_tag():
+    details = EventbriteClient()._parse_event_details(PAGES['quoted_gt_in_div'])
+
+    assert details['description'].startswith('Join us for an evening')
+
+
+def test_listing_json_ld_matches_beautifulsoup():
+    client = EventbriteClient()
+    items = [
+        {"@type": "Event", "name": f"E{i}", "url": f"https://www.eventbrite.com/e/e-{i}",
+         "startDate": "2030-01-01T10:00:00Z", "description": "d"}
+        for i in range(5)
+    ]
+    page = (
+        '<html><head><script type="application/ld+json">' + json.dumps(items) + '</script>'
+        '<script type=\'application/ld+json\' data-x="a>b">' + json.dumps(dict(items[0], name="Single")) + '</script>'
+        '</head><body>' + SCRIPT_BLOB + FILLER + '</body></html>'
+    )
+
+    expected = []
+    for script in BeautifulSoup(page, 'html.parser').find_all('script', type='application/ld+json'):
+        data = json.loads(script.string)
+        for item in data if isinstance(data, list) else [data]:
+            if item.get('@type') == 'Event':
+                expected.append(client._parse_json_ld_event(item))
+
+    assert client._parse_listing_html(page)["events"] == expected
@@ -0,0 +1,93 @@
+import pytest
+
+from Databases import event_service
+from Databases.event_store import EventStore
+from matchmaking import _retrieve_candidates, _score_event
+
+
+EVENTS = [
+    {"event_id": "e-1", "name": "Technology Startups Meetup", "about": "Founders talk shop, then go hiking", "date": "2030-01-10"},
+    {"event_id": "e-2", "name": "Tech Talk", "about": "Lightning talks", "tags": ["startup", "pitch"], "date": "2030-01-11"},
+    {"event_id": "e-3", "name": "Pottery Night", "about": "Wheel throwing for beginners", "date": "2030-01-12"},
+    {"event_id": "e-4", "name": "Newcomer Welcome Brunch", "about": "Meet your neighbours", "date": "2030-01-13"},
+    {"event_id": "e-5", "name": "AI Hack Day", "about": "Build with machine learning", "venue": "Techspace", "date": "2030-01-14"},
+    {"event_id": "e-6", "name": "Trail Run", "about": "5k along the river", "tags": "outdoors, running", "date": "2030-01-15"},
+]
+
+USER = {"username": "tester", "events_attending": ["Pottery Night"]}
+
+
+def _profile(core, secondary=(), avoid=()):
+    return {"core_keywords": list(core), "secondary_keywords": list(secondary), "avoid_keywords": list(avoid)}
+
+
+def _matches(events, keyword_profile, min_score):
+    scores = {event["name"]: _score_event(event, USER, keyword_profile)["score"] for event in events}
+    return {
+        name: score
+        for name, score in scores.items()
+        if score >= min_score and name not in USER["events_attending"]
+    }
+
+
+@pytest.fixture
+def store():
+    event_store = EventStore()
+    event_store.load(EVENTS)
+    return event_store
+
+
+@pytest.mark.parametrize(
+    "keyword_profile, min_score",
+    [
+        (_profile(["tech", "startup"]), 50),
+        (_profile(["hiking"], ["ai", "running"]), 45),
+        (_profile(["machine learning"], ["tech"], ["pitch"]), 45),
+        (_profile(["pottery"]), 45),
+        (_profile(["newcomer"]), 30),
+    ],
+)
+def test_indexed_retrieval_matches_full_scan(store, keyword_profile, min_score):
+    candidates = _retrieve_candidates(store, USER, keyword_profile, min_score)
+
+    assert _matches(candidates, keyword_profile, min_score) == _matches(EVENTS, keyword_profile, min_score)
+
+
+def test_retrieve_matches_substrings(store):
+    names = {event["name"] for event in store.retrieve(["tech"])}
+
+    assert names == {"Technology Startups Meetup", "Tech Talk", "AI Hack Day"}
+
+
+def test_retrieve_follows_updates(store):
+    store.add({"event_id": "e-3", "name": "Pottery Night", "about": "Now with a tech demo"})
+    store.remove("e-2")
+
+    names = {event["name"] for event in store.retrieve(["tech"])}
+
+    assert names == {"Technology Startups Meetup", "Pottery Night", "AI Hack Day"}
+
+
+def test_failed_reload_keeps_previous_catalog(monkeypatch):
+    event_store = EventStore()
+    event_store.load(EVENTS)
+    event_store.loaded_at -= event_service.EVENT_STORE_TTL_SECONDS + 1
+    loaded_at = event_store.loaded_at
+    scans = []
+
+    def failing_scan():
+        scans.append(1)
+        raise RuntimeError("ProvisionedThroughputExceededException")
+
+    monkeypatch.setattr(event_service, "_event_store", event_store)
+    monkeypatch.setattr(event_service, "_event_store_failed_at", 0.0)
+    monkeypatch.setattr(event_service, "_scan_all_events", failing_scan)
+
+    assert len(event_service.get_event_store()) == len(EVENTS)
+    assert event_store.loaded_at == loaded_at
+    # Within the retry delay the stale catalog is served without scanning again
+    event_service.get_event_store()
+    assert len(scans) == 1
+
+    monkeypatch.setattr(event_service, "_scan_all_events", lambda: EVENTS[:2])
+    assert len(event_service.get_event_store(refresh=True)) == 2
@@ -0,0 +1,284 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import gemini
+from gemini import (
+    BREAKER_CLOSED, BREAKER_HALF_OPEN, BREAKER_OPEN,
+    CircuitBreaker, CircuitBreakerBoard, GeminiGateway, MemoryCacheBackend, RateGovernor, SingleFlight, cache_key,
+)
+
+
+class StubModel:
+    """Stands in for a GenerativeModel: answers from a script and counts calls."""
+
+    def __init__(self, name, answers, release=None):
+        self.name = name
+        self.answers = answers
+        self.release = release
+        self.calls = 0
+
+    def _answer(self):
+        self.calls += 1
+        answer = self.answers(self.calls) if callable(self.answers) else self.answers
+        if isinstance(answer, Exception):
+            raise answer
+        return type("Response", (), {"text": answer})()
+
+    def generate_content(self, prompt):
+        return self._answer()
+
+    async def generate_content_async(self, prompt):
+        if self.release is not None:
+            await self.release.wait()
+        return self._answer()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(gemini, "_backoff_until", {})
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    def build(models, fallbacks=None):
+        gateway = GeminiGateway(api_key="test", cache=MemoryCacheBackend(max_entries=16))
+        gateway.governor = RateGovernor({})
+        gateway.breakers = CircuitBreakerBoard(fallbacks or {})
+        monkeypatch.setattr(gateway, "_text_model", lambda name: models[name])
+        return gateway
+    return build
+
+
+# --- Single-flight ---
+
+def test_single_flight_shares_a_result_and_remembers_failures():
+    flights = SingleFlight(negative_ttl=60)
+    future, leader = flights.begin("k")
+    follower, second = flights.begin("k")
+
+    assert leader and not second and follower is future
+    flights.finish("k", future, None)
+    assert future.result() is None
+    assert flights.recent_failure("k")
+    assert flights.snapshot() == {"leaders": 1, "coalesced": 1, "negative_hits": 1, "in_flight": 0}
+
+
+def test_abandoned_flight_releases_followers_without_a_failure():
+    flights = SingleFlight(negative_ttl=60)
+    future, _ = flights.begin("k")
+
+    flights.abandon("k", future)
+
+    assert future.result() is None
+    assert not flights.recent_failure("k")
+    assert flights.begin("k")[1]
+
+
+def test_concurrent_identical_requests_make_one_call(gateway):
+    async def scenario():
+        release = asyncio.Event()
+        model = StubModel("m", "answer", release)
+        gw = gateway({"m": model})
+        calls = [asyncio.create_task(gw.agenerate_text("hello", model="m")) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        return model, await asyncio.gather(*calls), gw
+
+    model, answers, gw = asyncio.run(scenario())
+
+    assert model.calls == 1
+    assert answers == ["answer"] * 5
+    # Served from the cache afterwards
+    assert gw.generate_text("hello", model="m") == "answer"
+    assert model.calls == 1
+
+
+def test_cancelled_leader_hands_followers_none(gateway):
+    async def scenario():
+        release = asyncio.Event()
+        gw = gateway({"m": StubModel("m", "answer", release)})
+        leader = asyncio.create_task(gw.agenerate_text("hello", model="m"))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(gw.agenerate_text("hello", model="m"))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower, gw
+
+    answer, gw = asyncio.run(scenario())
+
+    assert answer is None
+    assert not gw.flights.recent_failure(cache_key("m", "hello"))
+
+
+# --- Response cache ---
+
+def test_memory_cache_expires_and_evicts_least_recently_used(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(gemini.time, "time", lambda: now[0])
+    cache = MemoryCacheBackend(max_entries=2)
+    cache.set("a", "A", ttl=10)
+    cache.set("b", "B", ttl=100)
+    cache.get("a")
+    cache.set("c", "C", ttl=100)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.get("c") == "C"
+
+
+def test_zero_ttl_call_site_is_not_cached(gateway):
+    model = StubModel("m", "answer")
+    gw = gateway({"m": model})
+
+    gw.generate_text("hello", model="m", cache_ttl=0)
+    gw.generate_text("hello", model="m", cache_ttl=0)
+
+    assert model.calls == 2
+
+
+# --- Rate governor ---
+
+def _drained_governor():
+    governor = RateGovernor({"m": (60, 1e9)})
+    governor._lanes["m"].requests.level = 0
+    return governor
+
+
+def _grant(governor, requests):
+    """Top up the request bucket and wake the queue, as a refill would."""
+    lane = governor._lanes["m"]
+    with lane.condition:
+        lane.requests.level = requests
+        lane.condition.notify_all()
+        for ticket in list(lane.wakers):
+            gemini._wake(lane.wakers[ticket][1])
+
+
+def _wait_for_queue(governor, length):
+    deadline = time.monotonic() + 5
+    while len(governor._lanes["m"].queue) != length:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_governor_admits_by_priority_then_arrival():
+    governor = _drained_governor()
+    order = []
+
+    def wait(priority, name):
+        if governor.acquire("m", 1, priority, timeout=10):
+            order.append(name)
+
+    threads = []
+    for priority, name in [(10, "background"), (5, "normal-1"), (0, "interactive"), (5, "normal-2")]:
+        thread = threading.Thread(target=wait, args=(priority, name))
+        thread.start()
+        threads.append(thread)
+        _wait_for_queue(governor, len(threads))
+    _grant(governor, 4)
+    for thread in threads:
+        thread.join()
+
+    assert order == ["interactive", "normal-1", "normal-2", "background"]
+
+
+def test_governor_gives_up_at_the_queue_deadline():
+    governor = _drained_governor()
+
+    assert not governor.acquire("m", 1, 0, timeout=0.05)
+    assert governor.snapshot()["m"]["expired"] == 1
+    assert governor.snapshot()["m"]["waiting"] == 0
+
+
+def test_async_waiters_share_the_queue_and_leave_it_when_cancelled():
+    governor = _drained_governor()
+
+    async def scenario():
+        order = []
+
+        async def wait(priority, name):
+            if await governor.aacquire("m", 1, priority, timeout=10):
+                order.append(name)
+
+        background = asyncio.create_task(wait(10, "background"))
+        cancelled = asyncio.create_task(wait(0, "cancelled"))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(wait(0, "interactive"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert len(governor._lanes["m"].queue) == 2
+        _grant(governor, 2)
+        await asyncio.gather(background, interactive)
+        return order
+
+    assert asyncio.run(scenario()) == ["interactive", "background"]
+    lane = governor._lanes["m"]
+    assert lane.queue == [] and lane.wakers == {}
+    assert lane.stats["admitted"] == 2
+
+
+# --- Circuit breakers ---
+
+def test_breaker_opens_probes_once_and_closes():
+    breaker = CircuitBreaker("m", min_calls=2, failure_rate=0.5, open_seconds=30)
+    breaker.record(False, 0.1)
+    breaker.record(True, 0.1)
+    assert breaker.snapshot()["state"] == BREAKER_OPEN
+    assert not breaker.allow()
+
+    breaker._opened_at -= 31
+    assert breaker.allow()
+    assert breaker.snapshot()["state"] == BREAKER_HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record(True, 0.1)
+    assert breaker.snapshot()["state"] == BREAKER_CLOSED
+    assert breaker.allow()
+
+
+def test_failed_or_released_probe():
+    breaker = CircuitBreaker("m", min_calls=1, open_seconds=30)
+    breaker.record(False, 0.1)
+    breaker._opened_at -= 31
+
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record(True, breaker.slow_call_seconds + 1)
+    assert breaker.snapshot()["state"] == BREAKER_OPEN
+
+
+# --- Fallback models and per-model backoff ---
+
+def test_failure_falls_over_and_caches_under_the_serving_model(gateway):
+    primary = StubModel("a", Exception("429 RESOURCE_EXHAUSTED, retry in 30s"))
+    fallback = StubModel("b", "from b")
+    gw = gateway({"a": primary, "b": fallback}, fallbacks={"a": ["b"]})
+
+    assert gw.generate_text("hello", model="a") == "from b"
+    assert gemini._should_backoff("a") and not gemini._should_backoff("b")
+    assert gw.cache.get(cache_key("b", "hello")) == "from b"
+    assert gw.cache.get(cache_key("a", "hello")) is None
+
+    # The primary is skipped while it cools down
+    assert gw.generate_text("other", model="a") == "from b"
+    assert primary.calls == 1
+
+
+def test_open_breaker_routes_to_fallback_and_none_when_all_fail(gateway):
+    gw = gateway(
+        {"a": StubModel("a", "from a"), "b": StubModel("b", ValueError("boom"))},
+        fallbacks={"a": ["b"]},
+    )
+    breaker = gw.breakers.get("a")
+    for _ in range(breaker.min_calls):
+        breaker.record(False, 0.1)
+
+    assert asyncio.run(gw.agenerate_text("hello", model="a")) is None
+    assert gw.breakers.get("b").snapshot()["failures"] == 1
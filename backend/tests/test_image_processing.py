@@ -0,0 +1,65 @@
+import io
+
+import pytest
+from PIL import Image
+
+from image_processing import ImageProcessingError, preprocess_image
+from verification_cache import hamming_distance
+
+
+def _encode(image, fmt, **params):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **params)
+    return buffer.getvalue()
+
+
+def _photo(size=(400, 300)):
+    image = Image.new("RGB", size)
+    image.putdata([((x * 7) % 256, (y * 5) % 256, (x + y) % 256) for y in range(size[1]) for x in range(size[0])])
+    return image
+
+
+def test_format_is_sniffed_from_the_bytes():
+    result = preprocess_image(_encode(_photo(), "PNG"))
+
+    assert result["original_format"] == "PNG"
+    assert result["mime_type"] == "image/jpeg"
+    assert Image.open(io.BytesIO(result["data"])).format == "JPEG"
+
+
+def test_unreadable_and_unsupported_uploads_are_rejected():
+    with pytest.raises(ImageProcessingError, match="Could not read image"):
+        preprocess_image(b"%PDF-1.4 not an image")
+    with pytest.raises(ImageProcessingError, match="Unsupported image format: ICO"):
+        preprocess_image(_encode(_photo((64, 64)), "ICO"))
+
+
+def test_downsizes_to_the_max_edge_and_applies_exif_orientation():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotate 90 degrees clockwise on display
+    data = _encode(_photo((800, 400)), "JPEG", exif=exif)
+
+    result = preprocess_image(io.BytesIO(data), max_edge=200)
+
+    assert (result["width"], result["height"]) == (100, 200)
+    assert result["original_size"] == (800, 400)
+    assert result["original_bytes"] == len(data)
+    assert "exif" not in Image.open(io.BytesIO(result["data"])).info
+
+
+def test_transparency_is_flattened_for_jpeg_and_kept_for_webp():
+    transparent = Image.new("RGBA", (50, 50), (255, 0, 0, 0))
+
+    assert Image.open(io.BytesIO(preprocess_image(_encode(transparent, "PNG"))["data"])).mode == "RGB"
+    webp = preprocess_image(_encode(transparent, "PNG"), output_format="WEBP")
+    assert webp["mime_type"] == "image/webp"
+
+
+def test_perceptual_hash_survives_reencoding_and_resizing():
+    photo = _photo()
+    original = preprocess_image(_encode(photo, "PNG"))["dhash"]
+    resized = preprocess_image(_encode(photo.resize((200, 150)), "JPEG", quality=60))["dhash"]
+    different = preprocess_image(_encode(photo.transpose(Image.Transpose.FLIP_LEFT_RIGHT), "PNG"))["dhash"]
+
+    assert hamming_distance(original, resized) <= 6
+    assert hamming_distance(original, different) > 6
@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+import pytest
+
+import image_screening
+from image_screening import screen_image
+
+
+def _jpeg(gray):
+    ok, encoded = cv2.imencode(".jpg", gray.astype(np.uint8), [cv2.IMWRITE_JPEG_QUALITY, 95])
+    assert ok
+    return encoded.tobytes()
+
+
+def _checkerboard(size=400, square=80):
+    y, x = np.mgrid[0:size, 0:size]
+    return ((x // square + y // square) % 2 * 200 + 30).astype(np.uint8)
+
+
+def _textured(size=400):
+    rng = np.random.default_rng(7)
+    return rng.integers(0, 256, (size, size))
+
+
+def test_sharp_textured_photo_passes():
+    result = screen_image(_jpeg(_textured()))
+
+    assert result["passed"] and result["reason"] is None
+    assert screen_image(_jpeg(_checkerboard()))["passed"]
+    assert set(result["metrics"]) == {"width", "height", "brightness", "contrast", "sharpness"}
+
+
+@pytest.mark.parametrize("image, original_size, reason", [
+    (_textured(64), None, "too_small"),
+    (_textured(), (80, 1000), "too_small"),
+    (np.full((400, 400), 3), None, "too_dark"),
+    (np.full((400, 400), 128), None, "blank"),
+    (cv2.GaussianBlur(_checkerboard(), (0, 0), 6), None, "blurry"),
+])
+def test_rejections(image, original_size, reason):
+    result = screen_image(_jpeg(image), original_size=original_size)
+
+    assert not result["passed"]
+    assert result["reason"] == reason
+    assert result["message"] == image_screening.REJECTION_MESSAGES[reason]
+
+
+def test_people_check_only_runs_for_people_tasks(monkeypatch):
+    counts = []
+    monkeypatch.setattr(image_screening, "_count_people", lambda gray: counts.append(1) or 0)
+    data = _jpeg(_textured())
+
+    assert screen_image(data, task_description="Visit the library", detect_people=True)["passed"]
+    assert counts == []
+    rejected = screen_image(data, task_description="Meet your neighbours", detect_people=True)
+    assert rejected["reason"] == "no_people" and rejected["metrics"]["people"] == 0
+    assert screen_image(data, task_description="Meet your neighbours", detect_people=False)["passed"]
+
+
+def test_undecodable_bytes_are_left_to_gemini():
+    assert screen_image(b"not an image")["passed"]
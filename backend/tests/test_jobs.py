@@ -0,0 +1,113 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import jobs
+import main
+from jobs import FAILED, IdempotencyConflict, JobManager, SUCCEEDED
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=2, retention_seconds=60)
+    yield manager
+    manager._executor.shutdown(wait=True)
+
+
+def _finish(manager, job):
+    return asyncio.run(manager.wait(job["job_id"], timeout=5))
+
+
+def test_same_key_and_arguments_reuse_the_job(manager):
+    release = threading.Event()
+    calls = []
+
+    def work(username):
+        calls.append(username)
+        release.wait(5)
+        return {"tasks": [username]}
+
+    first, created = manager.submit("admin_tasks", work, "alice", idempotency_key="k")
+    again, created_again = manager.submit("admin_tasks", work, "alice", idempotency_key="k")
+    release.set()
+
+    assert created and not created_again
+    assert again["job_id"] == first["job_id"]
+    assert "fingerprint" not in again
+    assert _finish(manager, first)["result"] == {"tasks": ["alice"]}
+    # Succeeded jobs are reused too, unless reuse_succeeded is off
+    assert manager.submit("admin_tasks", work, "alice", idempotency_key="k")[1] is False
+    rerun, created_rerun = manager.submit("admin_tasks", work, "alice", idempotency_key="k", reuse_succeeded=False)
+    assert created_rerun
+    _finish(manager, rerun)
+    assert calls == ["alice", "alice"]
+
+
+def test_failed_job_can_be_retried_with_its_key(manager):
+    def fail(username):
+        raise RuntimeError("gemini unavailable")
+
+    job, _ = manager.submit("admin_tasks", fail, "alice", idempotency_key="k")
+    finished = _finish(manager, job)
+    retry, created = manager.submit("admin_tasks", lambda username: {}, "alice", idempotency_key="k")
+
+    assert finished["status"] == FAILED and finished["error"] == "gemini unavailable"
+    assert created and retry["job_id"] != job["job_id"]
+
+
+def test_key_reused_with_other_arguments_conflicts(manager):
+    manager.submit("admin_tasks", lambda username: {}, "alice", idempotency_key="k")
+
+    with pytest.raises(IdempotencyConflict):
+        manager.submit("admin_tasks", lambda username: {}, "bob", idempotency_key="k")
+    # Keys are scoped per kind
+    assert manager.submit("other", lambda username: {}, "bob", idempotency_key="k")[1]
+
+
+def test_finished_jobs_are_pruned_after_retention(manager, monkeypatch):
+    job, _ = manager.submit("admin_tasks", lambda username: {}, "alice", idempotency_key="k")
+    _finish(manager, job)
+    finished_at = manager._finished_at[job["job_id"]]
+
+    monkeypatch.setattr(jobs.time, "time", lambda: finished_at + 61)
+    manager.submit("admin_tasks", lambda username: {}, "bob", idempotency_key="other")
+
+    assert manager.get(job["job_id"]) is None
+    # The pruned job's key is free again, even for other arguments
+    assert manager.submit("admin_tasks", lambda username: {}, "carol", idempotency_key="k")[1]
+
+
+def test_wait_returns_on_completion_or_timeout(manager):
+    release = threading.Event()
+    job, _ = manager.submit("admin_tasks", lambda username: release.wait(5) and {"ok": True}, "alice")
+
+    async def scenario():
+        pending = await manager.wait(job["job_id"], timeout=0.05)
+        release.set()
+        done = await manager.wait(job["job_id"], timeout=5)
+        return pending, done
+
+    pending, done = asyncio.run(scenario())
+
+    assert pending["status"] in ("queued", "running")
+    assert done["status"] == SUCCEEDED and done["result"] == {"ok": True}
+    assert asyncio.run(manager.wait("j-missing")) is None
+
+
+def test_conflicting_key_returns_422(manager, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(main, "job_manager", manager)
+    monkeypatch.setattr(main, "get_user_by_username_scan", lambda username: {"username": username})
+    monkeypatch.setattr(main, "_run_admin_tasks_job", lambda username: release.wait(5) and {})
+
+    with TestClient(main.app) as client:
+        first = client.post("/api/GenerateAdminTasks/async", data={"username": "alice"}, headers={"Idempotency-Key": "k"})
+        retry = client.post("/api/GenerateAdminTasks/async", data={"username": "alice"}, headers={"Idempotency-Key": "k"})
+        other = client.post("/api/GenerateAdminTasks/async", data={"username": "bob"}, headers={"Idempotency-Key": "k"})
+    release.set()
+
+    assert first.status_code == 202 and retry.status_code == 202
+    assert retry.json()["reused"] is True and retry.json()["job_id"] == first.json()["job_id"]
+    assert other.status_code == 422 and other.json()["success"] is False
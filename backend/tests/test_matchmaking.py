@@ -0,0 +1,223 @@
+import threading
+import time
+
+import pytest
+
+import matchmaking
+
+
+USER = {"username": "tester", "interests": ["hiking"], "events_attending": []}
+GEMINI_PROFILE = {
+    "core_keywords": ["technology"], "secondary_keywords": ["startup"], "avoid_keywords": [],
+    "preferred_location": "calgary", "preferred_languages": ["english"], "notes": "", "source": "gemini",
+}
+
+
+@pytest.fixture(autouse=True)
+def percolator(monkeypatch):
+    monkeypatch.setattr(matchmaking, "_standing_queries", {})
+    monkeypatch.setattr(matchmaking, "_keyword_index", {})
+    monkeypatch.setattr(matchmaking, "_always_scored", set())
+    monkeypatch.setattr(matchmaking, "_pushed_recommendations", {})
+
+
+def test_fallback_query_does_not_replace_gemini_query():
+    matchmaking.register_standing_query(USER, GEMINI_PROFILE, min_score=45)
+    # A hedged request that timed out registers its fallback after the late Gemini profile
+    matchmaking.register_standing_query(USER, matchmaking._build_fallback_profile(USER), min_score=45)
+
+    assert matchmaking._standing_queries["tester"]["keyword_profile"] is GEMINI_PROFILE
+
+    matchmaking.remove_standing_query(USER)
+    matchmaking.register_standing_query(USER, matchmaking._build_fallback_profile(USER), min_score=45)
+    assert matchmaking._standing_queries["tester"]["keyword_profile"]["source"] == "fallback"
+
+    matchmaking.register_standing_query(USER, GEMINI_PROFILE, min_score=45)
+    assert matchmaking._standing_queries["tester"]["keyword_profile"] is GEMINI_PROFILE
+
+
+# --- Cohort profiles ---
+
+COHORT_USER = {"username": "ana", "status": "S", "location": "Calgary", "interests": ["hiking"], "language": ["english"]}
+
+
+@pytest.fixture
+def cohort_requests(monkeypatch):
+    monkeypatch.setattr(matchmaking, "_cohort_profiles", matchmaking.OrderedDict())
+    monkeypatch.setattr(matchmaking, "_cohort_futures", {})
+    requests = []
+
+    def request(profile, call_site="keyword_profile"):
+        requests.append(profile)
+        gate = getattr(request, "gate", None)
+        if gate is not None:
+            gate.wait(5)
+        return dict(GEMINI_PROFILE, source=getattr(request, "source", "gemini"))
+
+    monkeypatch.setattr(matchmaking, "_request_keyword_profile", request)
+    return request, requests
+
+
+def test_concurrent_cohort_misses_prompt_once(cohort_requests):
+    request, requests = cohort_requests
+    request.gate = threading.Event()
+    results = []
+    threads = [
+        threading.Thread(target=lambda i=i: results.append(
+            matchmaking.build_cohort_keyword_profile(dict(COHORT_USER, username=f"user{i}", occupation=f"job{i}"))
+        ))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    while not requests:
+        time.sleep(0.001)
+    request.gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(requests) == 1
+    assert len(results) == 8
+    assert {tuple(profile["core_keywords"]) for profile in results} == {("technology", f"job{i}") for i in range(8)}
+
+
+def test_cohort_cache_expires_and_evicts(cohort_requests, monkeypatch):
+    _, requests = cohort_requests
+    monkeypatch.setattr(matchmaking, "COHORT_CACHE_MAX_ENTRIES", 2)
+    now = [1000.0]
+    monkeypatch.setattr(matchmaking.time, "time", lambda: now[0])
+    calgary, toronto, ottawa = (dict(COHORT_USER, location=city) for city in ("Calgary", "Toronto", "Ottawa"))
+
+    for user in (calgary, toronto, calgary, ottawa):
+        matchmaking.build_cohort_keyword_profile(user)
+    assert len(requests) == 3
+    # Toronto was least recently used, so Ottawa evicted it
+    matchmaking.build_cohort_keyword_profile(calgary)
+    assert len(requests) == 3
+    matchmaking.build_cohort_keyword_profile(toronto)
+    assert len(requests) == 4
+
+    now[0] += matchmaking.COHORT_CACHE_TTL_SECONDS + 1
+    matchmaking.build_cohort_keyword_profile(toronto)
+    assert len(requests) == 5
+
+
+def test_fallback_cohort_profiles_are_not_cached(cohort_requests):
+    request, requests = cohort_requests
+    request.source = "fallback"
+
+    matchmaking.build_cohort_keyword_profile(COHORT_USER)
+    matchmaking.build_cohort_keyword_profile(COHORT_USER)
+
+    assert len(requests) == 2
+
+
+def test_unknown_profile_mode_is_rejected():
+    with pytest.raises(ValueError):
+        matchmaking.build_user_keyword_profile(COHORT_USER, profile_mode="team")
+
+
+# --- Hedged recommendations ---
+
+EVENTS = [
+    {"event_id": "e-1", "name": "Technology Startup Night", "about": "Pitches and demos"},
+    {"event_id": "e-2", "name": "Hiking Club", "about": "Trail day for students with a study permit"},
+]
+
+
+@pytest.fixture
+def profile_builds(monkeypatch):
+    monkeypatch.setattr(matchmaking, "_profile_cache", {})
+    monkeypatch.setattr(matchmaking, "_profile_futures", {})
+    gate = threading.Event()
+    gate.set()
+    result = {"profile": GEMINI_PROFILE}
+
+    def build(user_profile, profile_mode=None, call_site="keyword_profile"):
+        gate.wait(5)
+        return result["profile"]
+
+    monkeypatch.setattr(matchmaking, "build_user_keyword_profile", build)
+    return gate, result
+
+
+def _hedged(budget_ms):
+    return matchmaking.get_recommended_events_hedged(
+        COHORT_USER, all_events=EVENTS, min_score=20, latency_budget_ms=budget_ms, scoring_backend="keywords"
+    )
+
+
+def test_hedged_uses_gemini_within_budget_then_the_cache(profile_builds):
+    events, source = _hedged(2000)
+
+    assert source == "gemini"
+    assert [event["name"] for event in events] == ["Technology Startup Night"]
+    assert _hedged(0)[1] == "cache"
+
+
+def test_hedged_answers_from_fallback_when_gemini_is_late(profile_builds):
+    gate, _ = profile_builds
+    gate.clear()
+
+    events, source = _hedged(0)
+
+    assert source == "fallback"
+    assert [event["name"] for event in events] == ["Hiking Club"]
+    assert matchmaking._standing_queries["ana"]["keyword_profile"]["source"] == "fallback"
+
+    # The late profile still lands in the cache and replaces the fallback query
+    future = matchmaking._profile_futures[matchmaking._profile_cache_key(COHORT_USER, None)]
+    gate.set()
+    future.result(5)
+    deadline = time.monotonic() + 5
+    while matchmaking._standing_queries["ana"]["keyword_profile"]["source"] != "gemini":
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    assert _hedged(0)[1] == "cache"
+
+
+def test_hedged_reports_fallback_when_gemini_fails(profile_builds):
+    _, result = profile_builds
+    result["profile"] = matchmaking._build_fallback_profile(COHORT_USER)
+
+    assert _hedged(2000)[1] == "fallback"
+    assert matchmaking._profile_cache == {}
+
+
+# --- Percolator ---
+
+def test_query_keys():
+    profile = {"core_keywords": ["technology"], "secondary_keywords": ["ai"]}
+
+    assert matchmaking._query_keys(profile, min_score=matchmaking.MAX_NON_KEYWORD_SCORE) is None
+    assert matchmaking._query_keys(profile, min_score=50) is None
+    assert matchmaking._query_keys({"core_keywords": ["technology"], "secondary_keywords": ["startup"]}, 50) == {"tec", "sta"}
+
+
+def test_percolate_event_pushes_substring_matches_only():
+    tech = {"username": "tech", "events_attending": ["Biotechnology Startup Expo"]}
+    tech_fan = {"username": "fan", "events_attending": []}
+    hiker = {"username": "hiker", "events_attending": []}
+    matchmaking.register_standing_query(tech, dict(GEMINI_PROFILE, core_keywords=["tech", "startup"]), min_score=50)
+    matchmaking.register_standing_query(tech_fan, dict(GEMINI_PROFILE, core_keywords=["tech", "startup"]), min_score=50)
+    matchmaking.register_standing_query(hiker, dict(GEMINI_PROFILE, core_keywords=["hiking", "trail"]), min_score=50)
+
+    matches = matchmaking.percolate_event({"event_id": "e-9", "name": "Biotechnology Startup Expo"})
+
+    # "tech" matches inside "Biotechnology", like the scorer; attendees are skipped
+    assert [(user, name) for user, name, _ in matches] == [("fan", "Biotechnology Startup Expo")]
+    assert matchmaking.get_pushed_recommendations(tech_fan)[0]["event_id"] == "e-9"
+    assert matchmaking.get_pushed_recommendations(hiker) == []
+    assert "password_hash" not in matchmaking._standing_queries["fan"]
+
+
+def test_pushed_recommendations_are_capped_and_deduplicated(monkeypatch):
+    monkeypatch.setattr(matchmaking, "PUSHED_RECOMMENDATIONS_LIMIT", 3)
+    for score in (50, 90, 60, 70, 80):
+        matchmaking._push_recommendation("tester", {"event_id": f"e-{score}", "match_score": score})
+    matchmaking._push_recommendation("tester", {"event_id": "e-50", "match_score": 95})
+
+    pushed = matchmaking.get_pushed_recommendations(USER, clear=True)
+
+    assert [event["event_id"] for event in pushed] == ["e-50", "e-90", "e-80"]
+    assert matchmaking.get_pushed_recommendations(USER) == []
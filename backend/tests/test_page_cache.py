@@ -0,0 +1,32 @@
+import pytest
+
+from event import PageCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PageCache(directory=str(tmp_path))
+
+
+def test_store_keeps_digest_validators_and_parse_but_not_the_body(cache):
+    body = "<html>" + "x" * 10000 + "</html>"
+    cache.store("https://example.com/e/1", body, {"etag": '"v1"'}, {"description": "d"})
+
+    entry = cache.load("https://example.com/e/1")
+    assert "body" not in entry
+    assert entry["parsed"] == {"description": "d"}
+    assert PageCache.conditional_headers(entry) == {"If-None-Match": '"v1"'}
+    assert cache.same_body(entry, body)
+    assert not cache.same_body(entry, body + " ")
+
+
+def test_revalidated_entry_reuses_the_stored_parse(cache):
+    cache.store("https://example.com/e/1", "<html></html>", {}, {"start_time": "2030-01-01"})
+    entry = cache.load("https://example.com/e/1")
+
+    parsed = cache.revalidate("https://example.com/e/1", entry, {"last-modified": "Tue, 01 Jan 2030 00:00:00 GMT"}, "not_modified")
+
+    assert parsed == {"start_time": "2030-01-01"}
+    assert cache.load("https://example.com/e/1")["last_modified"] == "Tue, 01 Jan 2030 00:00:00 GMT"
+    assert cache.is_fresh(cache.load("https://example.com/e/1"), ttl=60)
+    assert cache.snapshot()["not_modified"] == 1
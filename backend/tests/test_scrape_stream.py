@@ -0,0 +1,76 @@
+import json
+
+import pytest
+import requests
+from fastapi.testclient import TestClient
+
+import event
+import main
+
+
+def _listing(page, count=3):
+    return {
+        "events": [
+            {"name": f"Event {page}-{i}", "url": f"https://www.eventbrite.com/e/event-{page}-{i}", "start_time": ""}
+            for i in range(count)
+        ],
+        "cards": [],
+    }
+
+
+@pytest.fixture
+def scrape(monkeypatch):
+    fetched = []
+    batches = []
+
+    async def fake_listing(self, url):
+        fetched.append(url)
+        page = int(url.rsplit("page=", 1)[1]) if "page=" in url else 1
+        return _listing(page) if page <= 2 else {"events": [], "cards": []}
+
+    def fake_add(events, *args, **kwargs):
+        batches.append([e["name"] for e in events])
+        for e in events:
+            yield {"status": "added", "name": e["name"], "event": e, "error": None}
+
+    def no_sync_requests(*args, **kwargs):
+        raise AssertionError("the stream must not use the blocking requests client")
+
+    monkeypatch.setattr(event.EventbriteClient, "_aget_listing", fake_listing)
+    monkeypatch.setattr(event.requests, "get", no_sync_requests)
+    monkeypatch.setattr(main, "get_known_event_urls", lambda: {"https://www.eventbrite.com/e/event-1-0"})
+    monkeypatch.setattr(main, "iter_add_scraped_events", fake_add)
+    monkeypatch.setattr(main, "EVENT_TASK_BATCH_MAX_EVENTS", 2)
+    return fetched, batches
+
+
+def _messages(body):
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        yield name.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+def test_stream_scrapes_with_the_async_fetcher(scrape):
+    fetched, batches = scrape
+
+    with TestClient(main.app) as client:
+        response = client.get("/api/getNewEvents/stream", params={"max_results": 50})
+
+    messages = list(_messages(response.text))
+    assert [name for name, _ in messages] == ["event"] * 5 + ["complete"]
+    assert messages[-1][1]["added"] == 5
+    assert messages[-1][1]["known"] == 1
+    # Known events are left out, and events are stored in task-generation batches
+    assert batches == [["Event 1-1", "Event 1-2"], ["Event 2-0", "Event 2-1"], ["Event 2-2"]]
+    assert len(fetched) == 3
+
+
+def test_stream_stops_at_max_results(scrape):
+    _, batches = scrape
+
+    with TestClient(main.app) as client:
+        response = client.get("/api/getNewEvents/stream", params={"max_results": 3})
+
+    messages = list(_messages(response.text))
+    assert messages[-1][1]["added"] == 3
+    assert sum(len(batch) for batch in batches) == 3
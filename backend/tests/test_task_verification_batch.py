@@ -0,0 +1,68 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_batch_body_is_capped_as_a_whole(monkeypatch):
+    assert main.UPLOAD_LIMITS["/api/checkTaskCompletionBatch"] == main.VERIFICATION_BATCH_MAX_BYTES
+    monkeypatch.setitem(main.UPLOAD_LIMITS, "/api/checkTaskCompletionBatch", 1024)
+    images = [("images", (f"{i}.jpg", b"\xff" * 40 * 1024, "image/jpeg")) for i in range(3)]
+
+    with TestClient(main.app) as client:
+        response = client.post(
+            "/api/checkTaskCompletionBatch",
+            data={"username": "tester", "task_descriptions": ["a", "b", "c"]},
+            files=images,
+        )
+
+    assert response.status_code == 413
+    assert response.json()["success"] is False
+
+
+def test_items_missing_from_a_group_answer_are_verified_concurrently(monkeypatch):
+    items = [
+        {"task_description": f"task {i}", "prepared": {"data": bytes([i]), "mime_type": "image/jpeg"},
+         "completed": None, "response": None}
+        for i in range(4)
+    ]
+    in_flight = {"now": 0, "peak": 0}
+
+    async def group_answer(prompt, images, call_site):
+        return '[{"index": 1, "completed": true, "reason": "ok"}]'
+
+    async def single_answer(prompt, data, mime_type, call_site):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return "No. not shown"
+
+    monkeypatch.setattr(main, "ageminiImages", group_answer)
+    monkeypatch.setattr(main, "ageminiImage", single_answer)
+
+    asyncio.run(main._verify_image_group(items))
+
+    assert [item["completed"] for item in items] == [True, False, False, False]
+    assert in_flight["peak"] == 3
+
+
+def test_failed_group_call_is_not_fanned_out(monkeypatch):
+    items = [
+        {"task_description": "task", "prepared": {"data": b"x", "mime_type": "image/jpeg"},
+         "completed": None, "response": None}
+    ]
+
+    async def group_answer(prompt, images, call_site):
+        return None
+
+    async def single_answer(*args, **kwargs):
+        raise AssertionError("a failed group call must not retry per item")
+
+    monkeypatch.setattr(main, "ageminiImages", group_answer)
+    monkeypatch.setattr(main, "ageminiImage", single_answer)
+
+    asyncio.run(main._verify_image_group(items))
+
+    assert items[0]["response"] is None
@@ -0,0 +1,94 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import FastAPI, Request, UploadFile
+from fastapi.testclient import TestClient
+
+from uploads import MULTIPART_OVERHEAD_BYTES, UploadLimitMiddleware, UploadTooLargeError, inspect_upload
+
+LIMIT = 1024
+OVER_LIMIT = LIMIT + MULTIPART_OVERHEAD_BYTES + 1
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.state.handled = []
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        body = await request.body()
+        app.state.handled.append(len(body))
+        return {"size": len(body)}
+
+    @app.post("/other")
+    async def other(request: Request):
+        return {"size": len(await request.body())}
+
+    app.add_middleware(UploadLimitMiddleware, limits={"/upload": LIMIT})
+    return app
+
+
+def test_declared_length_over_the_limit_is_rejected_unread(app):
+    with TestClient(app) as client:
+        response = client.post("/upload", content=b"x" * OVER_LIMIT)
+
+    assert response.status_code == 413
+    assert response.json() == {"success": False, "error": str(UploadTooLargeError(LIMIT))}
+    assert app.state.handled == []
+
+
+def test_chunked_body_is_cut_off_once_over_the_limit(app):
+    def chunks():
+        for _ in range(50):
+            yield b"x" * 16 * 1024
+
+    with TestClient(app) as client:
+        response = client.post("/upload", content=chunks())
+
+    assert response.status_code == 413
+    assert app.state.handled == []
+
+
+def test_chunked_body_stops_being_read_at_the_limit(app):
+    received = []
+    sent = []
+
+    async def receive():
+        received.append(1)
+        return {"type": "http.request", "body": b"x" * 16 * 1024, "more_body": len(received) < 50}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/upload", "raw_path": b"/upload", "root_path": "", "query_string": b"",
+        "headers": [(b"transfer-encoding", b"chunked")], "client": ("test", 1), "server": ("test", 80),
+    }
+    asyncio.run(UploadLimitMiddleware(app, limits={"/upload": LIMIT})(scope, receive, send))
+
+    assert sent[0]["status"] == 413
+    assert len(received) == OVER_LIMIT // (16 * 1024) + 1
+    assert app.state.handled == []
+
+
+def test_bodies_within_the_limit_and_other_paths_pass(app):
+    with TestClient(app) as client:
+        small = client.post("/upload", content=b"x" * 100)
+        other = client.post("/other", content=b"x" * OVER_LIMIT)
+
+    assert small.json() == {"size": 100}
+    assert other.json() == {"size": OVER_LIMIT}
+
+
+def test_inspect_upload_counts_and_rewinds():
+    upload = UploadFile(io.BytesIO(b"x" * 3000), filename="a.jpg")
+
+    inspected = asyncio.run(inspect_upload(upload, max_bytes=4000))
+
+    assert inspected["size"] == 3000
+    assert inspected["file"].read() == b"x" * 3000
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(inspect_upload(upload, max_bytes=2999))
@@ -0,0 +1,117 @@
+import io
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+import verification_cache as vc
+from verification_cache import VerificationCache, hamming_distance
+
+PHOTO = 0x0F0F_F0F0_1234_ABCD
+
+
+def _flip(phash, *bits):
+    for bit in bits:
+        phash ^= 1 << bit
+    return phash
+
+
+@pytest.fixture
+def cache():
+    return VerificationCache(max_distance=6, ttl_seconds=3600, max_entries=100)
+
+
+def test_verdicts_are_served_only_to_the_same_user_and_task(cache):
+    cache.record("Visit the  Library", "alice", PHOTO, completed=True, response="Yes. A library card")
+
+    hit = cache.lookup("visit the library", "alice", _flip(PHOTO, 3, 40))
+    assert hit["completed"] is True and hit["distance"] == 2
+    assert cache.lookup("visit the library", "bob", PHOTO) is None
+    assert cache.lookup("open a bank account", "alice", PHOTO) is None
+    assert cache.snapshot()["hits"] == 1 and cache.snapshot()["misses"] == 2
+
+
+def test_unclear_verdicts_are_never_served(cache):
+    cache.record("visit the library", "alice", PHOTO, completed=None)
+
+    assert cache.lookup("visit the library", "alice", PHOTO) is None
+
+
+def test_reuse_reports_other_users_and_tasks(cache):
+    cache.record("visit the library", "alice", PHOTO, completed=True)
+    cache.record("open a bank account", "alice", _flip(PHOTO, 1), completed=False)
+
+    reuse = cache.find_reuse("visit the library", "bob", PHOTO)
+
+    assert [(r["username"], r["task_description"], r["same_user"]) for r in reuse] == [
+        ("alice", "visit the library", False),
+        ("alice", "open a bank account", False),
+    ]
+    assert cache.find_reuse("visit the library", "alice", PHOTO)[0]["same_user"] is True
+
+
+def test_banded_lookup_finds_every_hash_within_the_distance(cache):
+    # Six flipped bits spread over six of the eight bands still share two bands
+    near = _flip(PHOTO, 0, 9, 18, 27, 36, 45)
+    far = _flip(near, 54)
+    cache.record("task", "alice", PHOTO, completed=True)
+
+    assert hamming_distance(PHOTO, near) == 6
+    assert cache.lookup("task", "alice", near) is not None
+    assert cache.lookup("task", "alice", far) is None
+
+
+def test_distance_is_capped_below_the_band_count():
+    assert VerificationCache(max_distance=12).max_distance == vc.BAND_COUNT - 1
+
+
+def test_prune_drops_expired_and_oldest_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(vc.time, "time", lambda: now[0])
+    cache = VerificationCache(ttl_seconds=60, max_entries=2)
+
+    cache.record("a", "alice", 1, completed=True)
+    cache.record("b", "alice", 2, completed=True)
+    cache.record("c", "alice", 3, completed=True)
+    assert cache.snapshot()["entries"] == 2
+    assert cache.lookup("a", "alice", 1) is None
+    assert cache._bands and all(ids for ids in cache._bands.values())
+
+    now[0] += 61
+    assert cache.lookup("b", "alice", 2) is None
+    cache.record("d", "alice", 4, completed=True)
+    assert cache.snapshot()["entries"] == 1
+
+
+def test_endpoint_reuses_verdicts_per_user_and_only_flags_reuse(monkeypatch):
+    calls = []
+
+    async def verify(prompt, data, mime_type, call_site):
+        calls.append(call_site)
+        return "Yes. The task is shown"
+
+    monkeypatch.setattr(main, "verification_cache", VerificationCache())
+    monkeypatch.setattr(main, "ageminiImage", verify)
+    monkeypatch.setattr(main, "remove_task_from_user", lambda username, task: {"success": True})
+    buffer = io.BytesIO()
+    Image.fromarray(np.random.default_rng(3).integers(0, 256, (300, 300), dtype=np.uint8)).save(buffer, format="PNG")
+
+    def submit(client, username):
+        return client.post(
+            "/api/checkTaskCompletion",
+            data={"username": username, "task_description": "Visit the library"},
+            files={"image": ("photo.png", buffer.getvalue(), "image/png")},
+        ).json()
+
+    with TestClient(main.app) as client:
+        first = submit(client, "alice")
+        repeat = submit(client, "alice")
+        other_user = submit(client, "bob")
+
+    assert (first["verification_source"], first["image_reused"]) == ("gemini", False)
+    assert (repeat["verification_source"], repeat["image_reused"]) == ("cache", False)
+    assert (other_user["verification_source"], other_user["image_reused"]) == ("gemini", True)
+    assert all("reuse_details" not in body for body in (first, repeat, other_user))
+    assert len(calls) == 2
@@ -0,0 +1,118 @@
+"""Size-capped, streaming handling of uploaded files."""
+
+import os
+from typing import BinaryIO, Dict
+
+from fastapi import UploadFile
+from fastapi.responses import JSONResponse
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 256 * 1024
+
+# Multipart boundaries and form fields on top of the files themselves
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """The upload exceeds the configured size limit."""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Upload exceeds the {round(limit / (1024 * 1024), 1):g} MB limit")
+        self.limit = limit
+
+
+async def inspect_upload(upload: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> Dict:
+    """
+    Size-check an upload by reading it in chunks.
+
+    The multipart parser has already spooled the body (to disk above 1 MB),
+    so nothing is copied: the file is read once in fixed-size chunks and
+    rewound, and callers decode straight from `file`.
+
+    Raises:
+        UploadTooLargeError: as soon as more than `max_bytes` have been read
+
+    Returns:
+        {"file": file-like object at position 0, "size": int}
+    """
+    size = 0
+    await upload.seek(0)
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+    await upload.seek(0)
+
+    file: BinaryIO = upload.file
+    return {"file": file, "size": size}
+
+
+def declared_body_too_large(content_length: str, max_bytes: int) -> bool:
+    """True when a Content-Length header already announces a body over the limit."""
+    try:
+        return int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES
+    except (TypeError, ValueError):
+        return False
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware capping request bodies on upload endpoints.
+
+    A Content-Length over the limit is rejected before anything is read. Bodies
+    without one (chunked uploads) are counted as they arrive, and the request
+    is answered with 413 as soon as the limit is passed instead of after the
+    whole body has been spooled.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if not limit:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if declared_body_too_large(content_length.decode("latin-1") if content_length else None, limit):
+            await self._reject(scope, receive, send, limit)
+            return
+
+        max_body = limit + MULTIPART_OVERHEAD_BYTES
+        state = {"received": 0, "exceeded": False, "started": False}
+
+        async def limited_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                state["received"] += len(message.get("body", b""))
+                if state["received"] > max_body:
+                    state["exceeded"] = True
+                    raise UploadTooLargeError(limit)
+            return message
+
+        async def guarded_send(message):
+            # Once over the limit, the 413 below replaces whatever the app answers
+            if state["exceeded"]:
+                return
+            if message["type"] == "http.response.start":
+                state["started"] = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not state["exceeded"]:
+                raise
+        if state["exceeded"] and not state["started"]:
+            await self._reject(scope, receive, send, limit)
+
+    @staticmethod
+    async def _reject(scope, receive, send, limit: int) -> None:
+        response = JSONResponse(status_code=413, content={"success": False, "error": str(UploadTooLargeError(limit))})
+        await response(scope, receive, send)
@@ -0,0 +1,153 @@
+"""Task verification results cached by perceptual image hash."""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+# Two dHashes within this many bits are treated as the same photo
+VERIFICATION_HASH_DISTANCE = int(os.getenv("VERIFICATION_HASH_DISTANCE", "6"))
+VERIFICATION_CACHE_TTL_SECONDS = float(os.getenv("VERIFICATION_CACHE_TTL_SECONDS", str(24 * 3600)))
+VERIFICATION_CACHE_MAX_ENTRIES = int(os.getenv("VERIFICATION_CACHE_MAX_ENTRIES", "20000"))
+
+# 64-bit hashes are split into bands for the neighbourhood index; two hashes
+# within VERIFICATION_HASH_DISTANCE bits always share at least one band when
+# there are more bands than allowed differing bits.
+HASH_BITS = 64
+BAND_COUNT = 8
+BAND_BITS = HASH_BITS // BAND_COUNT
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _task_key(task_description: str) -> str:
+    return " ".join(str(task_description).lower().split())
+
+
+def _bands(phash: int) -> List[tuple]:
+    return [(band, (phash >> (band * BAND_BITS)) & BAND_MASK) for band in range(BAND_COUNT)]
+
+
+class VerificationCache:
+    """
+    Every verification submission, indexed by perceptual hash.
+
+    `lookup` answers a user's repeat of a photo already judged for the same
+    task; `find_reuse` reports near-identical photos submitted for other tasks
+    or by other users, which are never answered from the cache.
+    """
+
+    def __init__(
+        self,
+        max_distance: int = VERIFICATION_HASH_DISTANCE,
+        ttl_seconds: float = VERIFICATION_CACHE_TTL_SECONDS,
+        max_entries: int = VERIFICATION_CACHE_MAX_ENTRIES,
+    ):
+        if max_distance >= BAND_COUNT:
+            print(f"[Verification] Hash distance {max_distance} exceeds band index guarantee; using {BAND_COUNT - 1}")
+            max_distance = BAND_COUNT - 1
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._bands: Dict[tuple, set] = {}
+        self._next_id = 0
+        self.stats = {"hits": 0, "misses": 0, "reuse_flags": 0}
+
+    def _drop(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for band in _bands(entry["hash"]):
+            ids = self._bands.get(band)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._bands[band]
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        while self._entries:
+            entry_id, entry = next(iter(self._entries.items()))
+            if entry["at"] >= cutoff and len(self._entries) <= self.max_entries:
+                break
+            self._drop(entry_id)
+
+    def _neighbours(self, phash: int) -> List[Dict]:
+        candidates = set()
+        for band in _bands(phash):
+            candidates |= self._bands.get(band, set())
+        cutoff = time.time() - self.ttl_seconds
+        matches = []
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            distance = hamming_distance(phash, entry["hash"])
+            if distance <= self.max_distance and entry["at"] >= cutoff:
+                matches.append({**entry, "distance": distance})
+        return sorted(matches, key=lambda e: (e["distance"], -e["at"]))
+
+    def lookup(self, task_description: str, username: str, phash: int) -> Optional[Dict]:
+        """Closest earlier verdict for a near-identical photo the same user submitted for the same task."""
+        task = _task_key(task_description)
+        with self._lock:
+            for entry in self._neighbours(phash):
+                if entry["task"] == task and entry["username"] == username and entry["completed"] is not None:
+                    self.stats["hits"] += 1
+                    return entry
+            self.stats["misses"] += 1
+            return None
+
+    def find_reuse(self, task_description: str, username: str, phash: int) -> List[Dict]:
+        """Earlier submissions of a near-identical photo for another task or by another user."""
+        task = _task_key(task_description)
+        with self._lock:
+            reused = [
+                {
+                    "username": entry["username"],
+                    "task_description": entry["task_description"],
+                    "distance": entry["distance"],
+                    "same_user": entry["username"] == username,
+                }
+                for entry in self._neighbours(phash)
+                if entry["task"] != task or entry["username"] != username
+            ]
+            if reused:
+                self.stats["reuse_flags"] += 1
+            return reused
+
+    def record(
+        self,
+        task_description: str,
+        username: str,
+        phash: int,
+        completed: Optional[bool] = None,
+        response: Optional[str] = None,
+    ) -> None:
+        """Store a submission; `completed` is None when there is no verdict to reuse."""
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                "hash": phash,
+                "task": _task_key(task_description),
+                "task_description": task_description,
+                "username": username,
+                "completed": completed,
+                "response": response,
+                "at": time.time(),
+            }
+            for band in _bands(phash):
+                self._bands.setdefault(band, set()).add(entry_id)
+            self._prune()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries)}
+
+
+verification_cache = VerificationCache()